@@ -0,0 +1,97 @@
+"""
+Benchmark for agent_memory reads - query plan and latency of get_memory's query
+Builds a throwaway database with 1M rows (10k users) and compares the covering
+index against the old (user_id, timestamp DESC) index
+Run: python benchmark_agent_memory.py [rows]
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from src.database.db import get_db_connection, ensure_agent_memory_schema
+
+RECENT_QUERY = (
+    "SELECT user_message, ai_response, context, timestamp, id FROM agent_memory "
+    "WHERE user_id = ? ORDER BY id DESC LIMIT ?"
+)
+OLD_QUERY = (
+    "SELECT user_message, ai_response, context, timestamp, id FROM agent_memory "
+    "WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?"
+)
+USERS = 10000
+LOOKUPS = 2000
+
+
+def populate(conn: sqlite3.Connection, rows: int):
+    """Insert `rows` turns spread round-robin over USERS users"""
+    start = datetime(2024, 1, 1)
+    batch = []
+    for i in range(rows):
+        batch.append((
+            f"user_{i % USERS}", f"question {i}", f"answer {i}", None,
+            (start + timedelta(seconds=i)).isoformat()
+        ))
+        if len(batch) == 50000:
+            conn.executemany(
+                "INSERT INTO agent_memory (user_id, user_message, ai_response, context, timestamp) VALUES (?, ?, ?, ?, ?)",
+                batch
+            )
+            batch = []
+    if batch:
+        conn.executemany(
+            "INSERT INTO agent_memory (user_id, user_message, ai_response, context, timestamp) VALUES (?, ?, ?, ?, ?)",
+            batch
+        )
+    conn.commit()
+
+
+def show_plan(conn: sqlite3.Connection, query: str):
+    """Print EXPLAIN QUERY PLAN for a get_memory-style query"""
+    for row in conn.execute("EXPLAIN QUERY PLAN " + query, ("user_42", 5)).fetchall():
+        print(f"  {row[3]}")
+
+
+def time_lookups(conn: sqlite3.Connection, query: str) -> float:
+    """Average milliseconds per lookup of the 5 most recent turns"""
+    started = time.perf_counter()
+    for i in range(LOOKUPS):
+        conn.execute(query, (f"user_{(i * 7919) % USERS}", 5)).fetchall()
+    return (time.perf_counter() - started) * 1000 / LOOKUPS
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "agent_memory_bench.db")
+        conn = get_db_connection(db_path)
+        ensure_agent_memory_schema(conn)
+
+        print("=" * 80)
+        print(f"agent_memory benchmark - {rows:,} rows, {USERS:,} users")
+        print("=" * 80)
+        started = time.perf_counter()
+        populate(conn, rows)
+        print(f"Inserted in {time.perf_counter() - started:.1f}s")
+        conn.execute("ANALYZE")
+
+        print("\nCovering index (user_id, id DESC, ...):")
+        show_plan(conn, RECENT_QUERY)
+        print(f"  {time_lookups(conn, RECENT_QUERY):.3f} ms per lookup")
+
+        conn.execute("DROP INDEX idx_agent_memory_user_recent")
+        conn.execute("CREATE INDEX idx_user_timestamp ON agent_memory(user_id, timestamp DESC)")
+        conn.execute("ANALYZE")
+        print("\nOld index (user_id, timestamp DESC), ordered by timestamp:")
+        show_plan(conn, OLD_QUERY)
+        print(f"  {time_lookups(conn, OLD_QUERY):.3f} ms per lookup")
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
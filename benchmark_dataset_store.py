@@ -0,0 +1,104 @@
+"""
+Benchmark for the compact dataset record store on a large synthetic dataset
+Compares memory and search time of plain item dicts with DatasetIndex records
+Run: python benchmark_dataset_store.py [items]
+"""
+
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from src.services.data_service import DatasetIndex
+
+WORDS = ["neural", "network", "learning", "graph", "sorting", "tree", "probability", "matrix",
+         "calculus", "database", "protocol", "compiler", "vector", "optimization", "statistics"]
+CATEGORIES = ["AI", "Mathematics", "Computer Science", "Data Science", "Networking"]
+DIFFICULTIES = ["Beginner", "Intermediate", "Advanced"]
+QUERIES = ["neural", "Graph Tree", "optim", "zzz", "statistics"]
+
+
+def synthetic_json(items: int) -> str:
+    random.seed(7)
+    data = []
+    for i in range(items):
+        data.append({
+            "id": i + 1,
+            "topic": f"{random.choice(WORDS).title()} {random.choice(WORDS).title()} {i}",
+            "description": " ".join(random.choices(WORDS, k=12)),
+            "category": random.choice(CATEGORIES),
+            "difficulty": random.choice(DIFFICULTIES),
+            "tags": random.sample(WORDS, 4),
+            "key_concepts": [f"{a} {b}" for a, b in zip(random.sample(WORDS, 3), random.sample(WORDS, 3))],
+        })
+    return json.dumps(data)
+
+
+def dict_search(data, query, limit=20):
+    """The previous approach: lower-case every field of every item on each query"""
+    query_lower = query.lower()
+    results = []
+    for item in data:
+        if query_lower in item.get("topic", "").lower():
+            results.append(item)
+            continue
+        if query_lower in item.get("description", "").lower():
+            results.append(item)
+            continue
+        if any(query_lower in tag.lower() for tag in item.get("tags", [])):
+            results.append(item)
+            continue
+        if any(query_lower in concept.lower() for concept in item.get("key_concepts", [])):
+            results.append(item)
+    return results[:limit]
+
+
+def measure(build):
+    """(result, bytes still allocated after building it)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(label: str, fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:40} {best * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = synthetic_json(items)
+    print("=" * 60)
+    print(f"Dataset store benchmark - {items:,} items ({len(text) / 1e6:.1f} MB JSON)")
+    print("=" * 60)
+
+    dicts, dict_bytes = measure(lambda: json.loads(text))
+    index, index_bytes = measure(lambda: DatasetIndex(json.loads(text)))
+    print(f"{'list of dicts':40} {dict_bytes / 1e6:9.1f} MB ({dict_bytes / items:.0f} B/item)")
+    print(f"{'DatasetIndex (records + indexes)':40} {index_bytes / 1e6:9.1f} MB ({index_bytes / items:.0f} B/item)")
+    print(f"Vocabulary: {len(index.vocab):,} terms\n")
+
+    for query in QUERIES:
+        # Default API limit; the dict scan still visits every item
+        old = timed(f"dict search '{query}'", lambda: dict_search(dicts, query))
+        new = timed(f"record search '{query}'", lambda: index.items(index.search_positions(query, 20)))
+        every = dict_search(dicts, query, items) == index.items(index.search_positions(query, items))
+        print(f"{'':40} same results: {old == new and every}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark for topic query parsing and prompt rendering
+Run: python benchmark_intent_parser.py [iterations]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from src.utils.intent_parser import parse_query, build_explanation_prompt
+
+QUERIES = [
+    "Machine Learning",
+    "Provide an introduction and background context for Machine Learning. Focus on history",
+    "Provide a clear definition of Neural Networks. Do NOT include examples",
+    "Provide real-world applications of Natural Language Processing.",
+    "Provide practice problems and exercises related to Reinforcement Learning.",
+    "Provide advanced concepts for Transformers. Focus on cutting-edge developments",
+    "Provide research papers related to Computer Vision. Include key researchers",
+    "Provide a detailed explanation of Python with exactly 5 comprehensive paragraphs",
+    "Deep Learning - Backpropagation",
+]
+
+
+def bench(label: str, fn, iterations: int):
+    """Print microseconds per query for fn over QUERIES"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for query in QUERIES:
+            fn(query)
+    elapsed = time.perf_counter() - started
+    print(f"{label:32} {elapsed * 1e6 / (iterations * len(QUERIES)):8.2f} us/query")
+
+
+def parse_and_render(query: str):
+    content_type, base_topic = parse_query(query)
+    return build_explanation_prompt(content_type, base_topic, query)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print("=" * 60)
+    print(f"Intent parser benchmark - {iterations:,} x {len(QUERIES)} queries")
+    print("=" * 60)
+    bench("parse_query", parse_query, iterations)
+    bench("parse_query + prompt", parse_and_render, iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for LLM output parsing over large synthetic responses
+Compares the shared precompiled parsers with the previous per-line inline regex
+Run: python benchmark_llm_parsing.py [lines]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from src.utils.llm_parsing import parse_numbered_questions, parse_marks_feedback, get_parse_stats
+
+PREFIXES = ["{n}. ", "{n}) ", "Q{n}: ", "Question {n} - ", ""]
+BODIES = [
+    "What is the role of the activation function in a neural network?",
+    "How does gradient descent find a minimum of the loss function?",
+    "Explain the difference between supervised and unsupervised learning.",
+    "Why do deep networks suffer from vanishing gradients during training?",
+    "",
+]
+
+
+def synthetic_questions(lines: int) -> str:
+    random.seed(42)
+    return "\n".join(
+        random.choice(PREFIXES).format(n=i + 1) + random.choice(BODIES) for i in range(lines)
+    )
+
+
+def inline_parse(text: str):
+    """The previous approach: split lines and re.sub with an inline pattern on each"""
+    questions = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        cleaned = re.sub(r'^(\d+[\.\)\-\s]+|Q\d+[\.\)\-\s:]+|Question\s+\d+[\.\)\-\s:]+)', '', line, flags=re.IGNORECASE)
+        cleaned = cleaned.strip()
+        if '?' in cleaned and len(cleaned) > 20:
+            if cleaned.startswith(':'):
+                cleaned = cleaned[1:].strip()
+            questions.append(cleaned)
+    return questions
+
+
+def inline_marks(text: str):
+    marks_match = re.search(r'marks:\s*(\d+(?:\.\d+)?)', text, re.IGNORECASE)
+    if not marks_match:
+        return None
+    feedback_match = re.search(r'feedback:\s*(.+?)(?:\n|$)', text, re.IGNORECASE | re.DOTALL)
+    return float(marks_match.group(1)), feedback_match.group(1).strip() if feedback_match else None
+
+
+def timed(label: str, fn, *args, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:40} {best * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    text = synthetic_questions(lines)
+    print("=" * 60)
+    print(f"LLM parsing benchmark - {lines:,} lines ({len(text) / 1e6:.1f} MB)")
+    print("=" * 60)
+    old = timed("inline re.sub per line", inline_parse, text)
+    new = timed("parse_numbered_questions", parse_numbered_questions, text)
+    print(f"Same output: {old == new} ({len(new):,} questions)")
+
+    replies = [f"Marks: {i % 11}\nFeedback: Answer {i} covers the main idea" for i in range(20000)]
+    timed("inline marks/feedback x20k", lambda: [inline_marks(r) for r in replies])
+    timed("parse_marks_feedback x20k", lambda: [parse_marks_feedback(r) for r in replies])
+    print("\nParse stats:", get_parse_stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Benchmark for the extractive TextRank summarizer on large synthetic documents
+Compares ReasoningService.summarize with the previous first-three-sentences cut
+Run: python benchmark_summarizer.py [kilobytes]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from src.reasoning import ReasoningService
+from src.utils.text_rank import split_sentences, rank_sentences
+
+SUBJECTS = ["Gradient descent", "The learning rate", "A neural network", "Backpropagation",
+            "Regularization", "The loss function", "Batch normalization", "Overfitting"]
+VERBS = ["updates", "controls", "stabilizes", "reduces", "depends on", "changes", "improves", "measures"]
+OBJECTS = ["the model weights", "training speed", "the validation error", "each gradient step",
+           "generalization on new data", "the error surface", "hidden layer activations", "convergence"]
+FILLER = ["Thanks for reading this far into the notes today.", "Please remember to bring a laptop next week.",
+          "The room will change for the lab session on Friday."]
+
+
+def synthetic_document(kilobytes: int) -> str:
+    random.seed(11)
+    sentences = []
+    size = 0
+    while size < kilobytes * 1024:
+        if random.random() < 0.2:
+            sentence = random.choice(FILLER)
+        else:
+            sentence = f"{random.choice(SUBJECTS)} {random.choice(VERBS)} {random.choice(OBJECTS)} during training."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+        if random.random() < 0.05:
+            sentences.append("\n\n")
+    return " ".join(sentences)
+
+
+def first_three(content: str, max_length: int = 200) -> str:
+    """The previous summarize: split on '.' and keep the first three long sentences"""
+    sentences = [s.strip() for s in content.split('.') if len(s.strip()) > 20]
+    if not sentences:
+        return content[:max_length] + "..."
+    summary = '. '.join(sentences[:3])
+    return summary[:max_length] + "..." if len(summary) > max_length else summary
+
+
+def timed(label: str, fn, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:40} {best * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    kilobytes = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    document = synthetic_document(kilobytes)
+    service = ReasoningService(db_path=":memory:")
+    sentences = split_sentences(document)
+    print("=" * 60)
+    print(f"Summarizer benchmark - {len(document) / 1024:.0f} KB, {len(sentences):,} sentences")
+    print("=" * 60)
+    old = timed("first three sentences", lambda: first_three(document))
+    timed("split_sentences", lambda: split_sentences(document))
+    timed("rank_sentences", lambda: rank_sentences(sentences))
+    new = timed("ReasoningService.summarize (TextRank)", lambda: service.summarize(document, 200))
+    print(f"\nPrevious: {old}\nTextRank: {new}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -411,7 +411,8 @@ async function showConceptDescription(concept, fullExplanation, index) {
                 'Content-Type': 'application/json',
             },
             body: JSON.stringify({
-                topic_name: queryTopic
+                topic_name: queryTopic,
+                length: 'short'
             })
         });
         
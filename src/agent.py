@@ -24,11 +24,8 @@ GEMINI_API_KEY = "[enter api here]"
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-try:
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+# Longest previous answer (in characters) repeated verbatim in a chat prompt
+RECENT_TURN_MAX_CHARS = 1200
 
 
 
@@ -40,6 +37,26 @@ from src.database.db import get_db_connection
 
 from src.services.data_service import DataService
 
+from src.services.question_bank import QuestionBank
+
+from src.utils.question_dedup import dedupe_questions, dedupe_questions_with_embeddings
+
+from src.utils.single_flight import SingleFlight, fingerprint
+
+from src.services.model_router import ModelRouter
+
+from src.services.resource_links import get_resource_link_index
+
+from src.services.topic_retriever import TopicRetriever
+
+from src.utils.intent_parser import parse_query, build_explanation_prompt
+
+from src.utils.token_budget import get_quiz_output_tokens
+
+from src.utils.llm_parsing import parse_numbered_questions, parse_marks_feedback
+
+from src.services.adaptive_difficulty import AdaptiveDifficultyEngine, recommend_level, INITIAL_RATING
+
 
 
 class AIAgent:
@@ -51,33 +68,41 @@ class AIAgent:
         self.memory = AgentMemory(db_path)
         self.reasoning = ReasoningService(db_path)
         self.data_service = DataService()
+        # Hybrid semantic + keyword search over the dataset, built in the background
+        self.topic_retriever = TopicRetriever(self.data_service)
+        self.topic_retriever.ensure_index_async()
+        self.question_bank = QuestionBank(db_path)
+        self.adaptive_difficulty = AdaptiveDifficultyEngine(student_db_path) if student_db_path else None
+        self.resource_links = get_resource_link_index()
+        # Identical concurrent prompts share one upstream LLM call
+        self.llm_flight = SingleFlight()
         
-        # Initialize LangChain LLM with Google Gemini
+        # Initialize LangChain LLMs with Google Gemini - one model tier per task type
+        self.models = ModelRouter(GEMINI_API_KEY)
+        # Large-tier client; also tells callers whether any LLM is available
         self.llm = None
-        api_key = GEMINI_API_KEY
-        if api_key and LANGCHAIN_AVAILABLE:
-            try:
-                self.llm = ChatGoogleGenerativeAI(
-                    model="gemini-pro",
-                    temperature=0.7,
-                    google_api_key=api_key
-                )
-            except Exception as e:
-                print(f"Gemini initialization error: {e}")
-                pass
+        try:
+            self.llm = self.models.get_llm("explanation")
+        except Exception as e:
+            print(f"Gemini initialization error: {e}")
+        
+        # Let memory compact long histories with the LLM
+        if self.llm:
+            self.memory.summarizer = self._summarize_conversation
     
-    def explain_topic(self, topic: str) -> Dict:
+    def _invoke_llm(self, prompt: str, task: str = "chat", max_output_tokens: int = None, label: str = None):
+        """Invoke the model routed for a task, coalescing concurrent identical prompts"""
+        return self.llm_flight.do(
+            fingerprint(task, str(max_output_tokens or ""), prompt),
+            lambda: self.models.invoke(task, prompt, max_output_tokens=max_output_tokens, label=label)
+        )
+    
+    def explain_topic(self, topic: str, length: str = None) -> Dict:
         """Explain a topic with comprehensive resources - returns content based on query type"""
         # Store original topic for Wikipedia link (exact as searched)
         original_topic = topic.strip()
         
-        # Extract base topic and detect content type from query
-        base_topic = topic.strip()
-        content_type = None
-        
-        # Detect content type from the query and extract base topic
         topic_lower = topic.lower()
-        base_topic = topic.strip()
         
         # #region agent log
         import json
@@ -87,100 +112,8 @@ class AIAgent:
         except: pass
         # #endregion
         
-        # Try to extract base topic from common patterns - simplified detection (order matters)
-        # Check content type first (most specific patterns first to avoid false matches)
-        if 'research papers' in topic_lower or ('research' in topic_lower and 'papers' in topic_lower):
-            content_type = 'research_papers'
-            if 'related to ' in topic_lower:
-                after_related = topic.split('related to ', 1)[1]
-                base_topic = after_related.split('.')[0].strip()
-        elif 'advanced' in topic_lower and 'problems' in topic_lower:
-            content_type = 'advanced_problems'
-            if 'related to ' in topic_lower:
-                after_related = topic.split('related to ', 1)[1]
-                base_topic = after_related.split('.')[0].strip()
-        elif 'advanced' in topic_lower and 'concepts' in topic_lower:
-            content_type = 'advanced_concepts'
-            if 'for ' in topic_lower:
-                after_for = topic.split('for ', 1)[1]
-                base_topic = after_for.split('.')[0].strip()
-        elif 'problems' in topic_lower and ('practice' in topic_lower or 'exercises' in topic_lower):
-            content_type = 'problems'
-            if 'related to ' in topic_lower:
-                after_related = topic.split('related to ', 1)[1]
-                base_topic = after_related.split('.')[0].strip()
-            elif 'of ' in topic_lower:
-                after_of = topic.split('of ', 1)[1]
-                base_topic = after_of.split('.')[0].strip()
-        elif 'applications' in topic_lower:
-            content_type = 'applications'
-            if 'of ' in topic_lower:
-                after_of = topic.split('of ', 1)[1]
-                base_topic = after_of.split('.')[0].strip()
-        elif 'examples' in topic_lower:
-            content_type = 'examples'
-            if 'of ' in topic_lower:
-                after_of = topic.split('of ', 1)[1]
-                base_topic = after_of.split('.')[0].strip()
-        elif 'definition' in topic_lower:
-            content_type = 'definition'
-            if 'of ' in topic_lower:
-                after_of = topic.split('of ', 1)[1]
-                base_topic = after_of.split('.')[0].strip()
-        elif 'introduction' in topic_lower:
-            content_type = 'introduction'
-            if 'for ' in topic_lower:
-                after_for = topic.split('for ', 1)[1]
-                base_topic = after_for.split('.')[0].strip()
-        elif 'detailed explanation' in topic_lower or 'comprehensive explanation' in topic_lower:
-            content_type = 'explanation'
-            if 'of ' in topic_lower:
-                # Extract topic after "of "
-                parts = topic.split('of ', 1)[1].split()
-                base_topic = parts[0].strip() if parts else topic.strip()
-        
-        # Clean up base topic - remove any trailing punctuation or extra words
-        base_topic = base_topic.strip('.,;:!?')
-        # Remove any trailing text after the topic name (common patterns)
-        if base_topic:
-            # Remove common trailing phrases
-            for phrase in [' focus on', ' do not', ' include', ' explain', ' provide']:
-                if phrase in base_topic.lower():
-                    base_topic = base_topic.split(phrase, 1)[0].strip()
-            # Take only first word or first few words (topic name is usually first)
-            words = base_topic.split()
-            if len(words) > 3:  # If too many words, likely got extra text
-                # Try to find where the topic name ends (usually 1-3 words)
-                base_topic = ' '.join(words[:3]).strip()
-        
-        # Fallback: remove any concept-specific suffixes
-        if ' - ' in base_topic:
-            parts = base_topic.split(' - ', 1)
-            base_topic = parts[0].strip()
-        
-        # Final cleanup
-        base_topic = base_topic.strip('.,;:!?').strip()
-        
-        # Fallback: If content_type is still None, try to infer from keywords
-        if content_type is None:
-            if 'introduction' in topic_lower:
-                content_type = 'introduction'
-            elif 'definition' in topic_lower and 'clear' in topic_lower:
-                content_type = 'definition'
-            elif 'examples' in topic_lower:
-                content_type = 'examples'
-            elif 'applications' in topic_lower:
-                content_type = 'applications'
-            elif 'problems' in topic_lower and 'practice' in topic_lower:
-                content_type = 'problems'
-            elif 'advanced' in topic_lower and 'concepts' in topic_lower:
-                content_type = 'advanced_concepts'
-            elif 'advanced' in topic_lower and 'problems' in topic_lower:
-                content_type = 'advanced_problems'
-            elif 'research' in topic_lower and 'papers' in topic_lower:
-                content_type = 'research_papers'
-            elif 'explanation' in topic_lower:
-                content_type = 'explanation'
+        # Detect content type and base topic with the compiled rule table
+        content_type, base_topic = parse_query(topic)
         
         # #region agent log
         import json
@@ -195,204 +128,13 @@ class AIAgent:
             except: pass
         # #endregion
         
+        # Prompt and output budget for this content type and requested length
+        prompt, budget = build_explanation_prompt(content_type, base_topic, topic, length)
+        
         # Generate content using LLM if available
         if self.llm:
             print(f"Using LLM to generate {content_type or 'comprehensive'} content for: {base_topic}")
             try:
-                # Generate different prompts based on content type
-                if content_type == 'introduction':
-                    prompt = f"""Provide ONLY an introduction and background context for {base_topic}. 
-
-Focus on:
-- What {base_topic} is and its purpose
-- Historical development and origins
-- Why it was created or developed
-- Its significance and importance
-- Context and background information
-
-Do NOT include definitions, examples, applications, or detailed explanations. ONLY provide introduction and background context.
-
-Write 3-5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'definition':
-                    prompt = f"""Provide ONLY a clear, precise definition of {base_topic}.
-
-Focus on:
-- What {base_topic} means exactly
-- Core meaning and fundamental characteristics
-- Essential properties and key attributes
-- What distinguishes {base_topic} from similar concepts
-
-Do NOT include examples, applications, explanations, or background. ONLY provide the definition.
-
-Write 2-4 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'examples':
-                    prompt = f"""Provide ONLY specific examples and use cases of {base_topic}.
-
-Focus on:
-- Concrete examples of {base_topic}
-- Real-world use cases
-- Code snippets if applicable
-- Practical illustrations
-- Specific scenarios where {base_topic} is used
-
-Do NOT include definitions, explanations, or applications. ONLY provide examples.
-
-Write 3-5 well-structured paragraphs with examples, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'applications':
-                    prompt = f"""Provide ONLY real-world applications and practical uses of {base_topic}.
-
-Focus on:
-- Where {base_topic} is used in industry
-- Applications in research and academia
-- Practical uses in daily life
-- Various domains and fields where it's applied
-- Real-world impact and benefits
-
-Do NOT include examples, definitions, or explanations. ONLY provide applications.
-
-Write 3-5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'problems':
-                    prompt = f"""Provide ONLY practice problems, exercises, and questions related to {base_topic}.
-
-Focus on:
-- Problem statements and exercises
-- Practice questions for students
-- Hands-on exercises
-- Problems to solve and practice
-
-Do NOT include solutions, definitions, or explanations. ONLY provide problems and exercises.
-
-Write 3-5 well-structured paragraphs with problems, each containing multiple practice questions. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'advanced_concepts':
-                    prompt = f"""Provide ONLY advanced related concepts, theories, and topics connected to {base_topic}.
-
-Focus on:
-- Cutting-edge developments in {base_topic}
-- Advanced theories and concepts
-- Related research areas
-- Complex and advanced topics
-- State-of-the-art developments
-
-Do NOT include basic explanations. ONLY provide advanced concepts.
-
-Write 4-6 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'advanced_problems':
-                    prompt = f"""Provide ONLY advanced problems, challenges, and complex exercises related to {base_topic}.
-
-Focus on:
-- Difficult and challenging problems
-- Research-level questions
-- Complex scenarios and exercises
-- Advanced problem-solving challenges
-
-Do NOT include solutions or basic problems. ONLY provide advanced problems.
-
-Write 3-5 well-structured paragraphs with advanced problems, each containing challenging questions. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'research_papers':
-                    prompt = f"""Provide ONLY information about research papers, academic resources, and scholarly work related to {base_topic}.
-
-Focus on:
-- Important research papers on {base_topic}
-- Key researchers and their contributions
-- Academic journals and publications
-- Research directions and trends
-- Scholarly resources and references
-
-Do NOT include explanations or definitions. ONLY provide research paper information and academic resources.
-
-Write 3-5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                elif content_type == 'explanation':
-                    # Check if it's intermediate level (5 paragraphs)
-                    if 'exactly 5' in topic_lower or '5 comprehensive paragraphs' in topic_lower:
-                        prompt = f"""Provide a detailed explanation of {base_topic} with EXACTLY 5 comprehensive paragraphs.
-
-Each paragraph should be 8-12 sentences and cover:
-1) How {base_topic} works - mechanisms and processes
-2) Key principles and fundamental mechanisms
-3) Important concepts and relationships
-4) Technical details and processes
-5) Why understanding {base_topic} matters
-
-Do NOT include examples or applications. ONLY provide explanation.
-
-Write EXACTLY 5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                    else:
-                        prompt = f"""Provide a comprehensive explanation of {base_topic} covering how it works.
-
-Focus on:
-- How {base_topic} functions and operates
-- Key principles and mechanisms
-- Technical details and processes
-- Important concepts and relationships
-
-Do NOT include examples, applications, or definitions. ONLY provide explanation of how {base_topic} works.
-
-Write 4-6 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines."""
-                
-                else:
-                    # Default comprehensive explanation
-                    prompt = f"""Explain {base_topic} comprehensively for students. Provide a detailed explanation that includes:
-
-
-
-1. A clear definition and overview of {base_topic}
-
-2. Fundamental principles and basic concepts
-
-3. Core concepts and key ideas
-
-4. Real-world applications and examples
-
-5. Why {base_topic} is important
-
-
-
-IMPORTANT FORMATTING REQUIREMENTS:
-
-- Write EXACTLY 6-10 well-structured paragraphs
-
-- Each paragraph should be 8-12 sentences long (significantly longer and more detailed)
-
-- Separate each paragraph with a blank line (double newline)
-
-- Each paragraph should cover a distinct aspect of {base_topic} in depth
-
-- Make the explanation comprehensive, educational, and clear with substantial detail
-
-- Use proper paragraph breaks - do NOT write as one continuous block of text
-
-- Each paragraph should be substantial (at least 150-200 words per paragraph)
-
-
-
-Format your response with clear paragraph breaks like this:
-
-[First paragraph about definition - 8-12 sentences, 150-200 words]
-
-
-
-[Second paragraph about principles - 8-12 sentences, 150-200 words]
-
-
-
-[Third paragraph about core concepts - 8-12 sentences, 150-200 words]
-
-
-
-[Continue with 3-7 more paragraphs covering applications, importance, etc. - each 8-12 sentences long]
-
-
-
-Now provide a comprehensive explanation of {base_topic} with 6-10 well-separated paragraphs, each being 8-12 sentences long (150-200 words per paragraph)."""
-                
                 # #region agent log
                 import json
                 try:
@@ -401,7 +143,10 @@ Now provide a comprehensive explanation of {base_topic} with 6-10 well-separated
                 except: pass
                 # #endregion
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(
+                    prompt, task="explanation",
+                    max_output_tokens=budget["max_output_tokens"], label=budget["length"]
+                )
                 explanation = response.content
                 
                 # Log the explanation length for debugging
@@ -450,10 +195,8 @@ Now provide a comprehensive explanation of {base_topic} with 6-10 well-separated
         # Use original_topic for Wikipedia link (exact topic as searched)
         topic_for_wikipedia = original_topic
         
-        # Generate comprehensive resources using LLM
-        youtube_links = []
-        website_references = []
-        
+        # Video title from the LLM (optional); links come from the in-memory resource index
+        video_title = None
         if self.llm:
             try:
                 # Get a single specific YouTube video recommendation
@@ -471,7 +214,7 @@ Example: "Machine Learning Full Course - Learn Machine Learning 10 Hours | Machi
 
 Provide only the video title, nothing else."""
                 
-                youtube_response = self.llm.invoke(youtube_prompt)
+                youtube_response = self._invoke_llm(youtube_prompt, task="title")
                 youtube_title = youtube_response.content.strip()
                 
                 # Clean up the title (remove quotes, numbers, etc.)
@@ -480,149 +223,14 @@ Provide only the video title, nothing else."""
                     youtube_title = youtube_title[1:-1]
                 if youtube_title.startswith("'") and youtube_title.endswith("'"):
                     youtube_title = youtube_title[1:-1]
-                
-                # Get the 2nd video from YouTube search results
-                try:
-                    import requests
-                    import re
-                    search_query = f"{topic_for_resources} tutorial"
-                    # Search YouTube and extract video IDs from the page
-                    search_url = f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}&sp=EgIQAQ%3D%3D"
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    }
-                    response = requests.get(search_url, headers=headers, timeout=5)
-                    
-                    if response.status_code == 200:
-                        # Extract video IDs from the page (YouTube embeds video IDs in the HTML)
-                        video_ids = re.findall(r'"videoId":"([^"]{11})"', response.text)
-                        if len(video_ids) >= 2:
-                            # Get the 2nd video ID (index 1)
-                            video_id = video_ids[1]
-                            youtube_url = f"https://www.youtube.com/watch?v={video_id}"
-                            video_title = youtube_title if youtube_title else f"{topic_for_resources} - Tutorial"
-                            print(f"[DEBUG] Found 2nd video ID: {video_id}")
-                        else:
-                            # Fallback: Use search URL if not enough videos found
-                            youtube_url = search_url
-                            video_title = youtube_title if youtube_title else f"{topic_for_resources} - Complete Tutorial"
-                            print(f"[DEBUG] Could not find 2nd video, using search URL")
-                    else:
-                        # Fallback: Use search URL
-                        youtube_url = search_url
-                        video_title = youtube_title if youtube_title else f"{topic_for_resources} - Complete Tutorial"
-                        print(f"[DEBUG] YouTube request failed, using search URL")
-                except Exception as e:
-                    # Fallback: Use search URL
-                    print(f"[DEBUG] Error getting 2nd video: {e}, using search URL")
-                    search_query_encoded = f"{topic_for_resources} tutorial".replace(' ', '+')
-                    youtube_url = f"https://www.youtube.com/results?search_query={search_query_encoded}&sp=EgIQAQ%3D%3D"
-                    video_title = youtube_title if youtube_title else f"{topic_for_resources} - Complete Tutorial"
-                
-                youtube_links = [{
-                    "title": video_title,
-                    "url": youtube_url
-                }]
-                
-                # Generate Wikipedia link for the exact topic searched (use original topic name)
-                # Format topic name for Wikipedia URL (replace spaces with underscores, preserve capitalization)
-                # Wikipedia URLs are case-sensitive and use underscores
-                wiki_topic = topic_for_wikipedia.replace(' ', '_')
-                # Remove any special characters that might cause issues, but keep underscores and hyphens
-                wiki_topic = ''.join(c if c.isalnum() or c in ['_', '-'] else '' for c in wiki_topic)
-                # Ensure it's a direct Wikipedia page link, not a search
-                wiki_url = f"https://en.wikipedia.org/wiki/{wiki_topic}"
-                print(f"[DEBUG] Generated Wikipedia URL: {wiki_url} for topic: {topic_for_wikipedia}")
-                website_references = [{
-                    "title": f"{topic_for_wikipedia} - Wikipedia",
-                    "url": wiki_url
-                }]
-                    
+                video_title = youtube_title or None
             except Exception as e:
                 print(f"Error generating resources: {e}")
-                # Fallback: Get 2nd video from YouTube search
-                try:
-                    import requests
-                    import re
-                    search_query = f"{topic_for_resources} tutorial"
-                    search_url = f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}&sp=EgIQAQ%3D%3D"
-                    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                    response = requests.get(search_url, headers=headers, timeout=5)
-                    
-                    if response.status_code == 200:
-                        video_ids = re.findall(r'"videoId":"([^"]{11})"', response.text)
-                        if len(video_ids) >= 2:
-                            video_id = video_ids[1]
-                            youtube_url = f"https://www.youtube.com/watch?v={video_id}"
-                            video_title = f"{topic_for_resources} - Tutorial"
-                            print(f"[DEBUG] Fallback: Found 2nd video ID: {video_id}")
-                        else:
-                            youtube_url = search_url
-                            video_title = f"{topic_for_resources} - Complete Tutorial"
-                    else:
-                        youtube_url = search_url
-                        video_title = f"{topic_for_resources} - Complete Tutorial"
-                except Exception as e:
-                    print(f"[DEBUG] Fallback error: {e}")
-                    search_query_encoded = f"{topic_for_resources} tutorial".replace(' ', '+')
-                    youtube_url = f"https://www.youtube.com/results?search_query={search_query_encoded}&sp=EgIQAQ%3D%3D"
-                    video_title = f"{topic_for_resources} - Complete Tutorial"
-                
-                youtube_links = [{
-                    "title": video_title,
-                    "url": youtube_url
-                }]
-                # Generate Wikipedia link for the exact topic searched (use original topic name)
-                wiki_topic = topic_for_wikipedia.replace(' ', '_')
-                # Remove any special characters that might cause issues, but keep underscores and hyphens
-                wiki_topic = ''.join(c if c.isalnum() or c in ['_', '-'] else '' for c in wiki_topic)
-                # Ensure it's a direct Wikipedia page link, not a search
-                wiki_url = f"https://en.wikipedia.org/wiki/{wiki_topic}"
-                print(f"[DEBUG] Generated Wikipedia URL (fallback): {wiki_url} for topic: {topic_for_wikipedia}")
-                website_references = [
-                    {"title": f"{topic_for_wikipedia} - Wikipedia", "url": wiki_url}
-                ]
-        else:
-            # Fallback without LLM: Get 2nd video from YouTube search
-            try:
-                import requests
-                import re
-                search_query = f"{topic_for_resources} tutorial"
-                search_url = f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}&sp=EgIQAQ%3D%3D"
-                headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                response = requests.get(search_url, headers=headers, timeout=5)
-                
-                if response.status_code == 200:
-                    video_ids = re.findall(r'"videoId":"([^"]{11})"', response.text)
-                    if len(video_ids) >= 2:
-                        video_id = video_ids[1]
-                        youtube_url = f"https://www.youtube.com/watch?v={video_id}"
-                        video_title = f"{topic_for_resources} - Tutorial"
-                        print(f"[DEBUG] No LLM: Found 2nd video ID: {video_id}")
-                    else:
-                        youtube_url = search_url
-                        video_title = f"{topic_for_resources} - Complete Tutorial"
-                else:
-                    youtube_url = search_url
-                    video_title = f"{topic_for_resources} - Complete Tutorial"
-            except Exception as e:
-                print(f"[DEBUG] No LLM error: {e}")
-                search_query_encoded = f"{topic_for_resources} tutorial".replace(' ', '+')
-                youtube_url = f"https://www.youtube.com/results?search_query={search_query_encoded}&sp=EgIQAQ%3D%3D"
-                video_title = f"{topic_for_resources} - Complete Tutorial"
-            
-            youtube_links = [{
-                "title": video_title,
-                "url": youtube_url
-            }]
-            # Generate Wikipedia link for the exact topic searched (use original topic name)
-            wiki_topic = topic_for_wikipedia.replace(' ', '_')
-            # Remove any special characters that might cause issues, but keep underscores and hyphens
-            wiki_topic = ''.join(c if c.isalnum() or c in ['_', '-'] else '' for c in wiki_topic)
-            wiki_url = f"https://en.wikipedia.org/wiki/{wiki_topic}"
-            website_references = [
-                {"title": f"{topic_for_wikipedia} - Wikipedia", "url": wiki_url}
-            ]
+        
+        youtube_links, website_references = self.resource_links.get_links(
+            topic_for_resources, topic_for_wikipedia, video_title
+        )
+        print(f"[DEBUG] Resource links for {topic_for_resources}: {youtube_links[0]['url']}")
         
         # Ensure only one YouTube video link
         youtube_links = youtube_links[:1]
@@ -667,8 +275,8 @@ Provide only the video title, nothing else."""
     
     def _generate_explanation_from_data(self, topic: str) -> str:
         """Generate explanation using dataset information when LLM is not available"""
-        # Try to get information from dataset
-        dataset_results = self.data_service.search(topic, limit=1)
+        # Try to get information from dataset - exact topic match first, then related topics
+        dataset_results = self.data_service.search(topic, limit=1) or self.topic_retriever.search(topic, limit=1)
         
         paragraphs = []
         
@@ -855,11 +463,78 @@ Provide only the video title, nothing else."""
         # Generate 2x the requested questions so user can select
         questions_to_generate = num_questions * 2
         
+        # Serve from the question bank when the pool already holds enough questions
+        banked_questions = None
+        try:
+            banked_questions = self.question_bank.draw(topic, difficulty, questions_to_generate)
+        except Exception as e:
+            print(f"Warning: Question bank unavailable: {e}")
+        
+        if banked_questions:
+            print(f"[QuestionBank] Serving {len(banked_questions)} banked questions for {topic}")
+            questions = [
+                {"id": i, "question": q, "type": "short_answer", "marks": marks_per_question}
+                for i, q in enumerate(banked_questions, start=1)
+            ]
+            # Refill the pool off the request path before it runs dry
+            if self.llm:
+                try:
+                    self.question_bank.top_up_async(
+                        topic, difficulty, questions_to_generate * 2, self._generate_questions_with_llm
+                    )
+                except Exception as e:
+                    print(f"Warning: Could not schedule question bank top-up: {e}")
         # Use LLM to generate real questions if available
-        if self.llm:
+        elif self.llm:
             try:
-                # Better prompt for diverse, real questions
-                prompt = f"""You are an expert educator creating a quiz about {topic} at {difficulty} difficulty level.
+                generated, embeddings = self._generate_questions_with_llm(topic, difficulty, questions_to_generate)
+                
+                # If we got some questions but not enough, that's okay - we'll use what we have
+                if len(generated) == 0:
+                    raise Exception("No questions parsed from LLM response")
+                
+                questions = [
+                    {"id": i, "question": q, "type": "short_answer", "marks": marks_per_question}
+                    for i, q in enumerate(generated, start=1)
+                ]
+                
+                # Keep the questions for later requests on the same topic and difficulty
+                try:
+                    self.question_bank.add_questions(topic, difficulty, generated, times_served=1, embeddings=embeddings)
+                except Exception as e:
+                    print(f"Warning: Could not store questions in question bank: {e}")
+                    
+            except Exception as e:
+                print(f"Error generating quiz with AI: {e}")
+                # Fallback to diverse template questions
+                questions = self._generate_fallback_questions(topic, difficulty, questions_to_generate, marks_per_question)
+                questions = self._dedupe_question_dicts(questions)
+        else:
+            # No LLM available - use diverse fallback questions
+            questions = self._generate_fallback_questions(topic, difficulty, questions_to_generate, marks_per_question)
+            # Drop repeated questions (fallback templates cycle when asked for many)
+            questions = self._dedupe_question_dicts(questions)
+        # Banked questions were deduped when stored and LLM questions when parsed
+
+        # Ensure we have at least the requested number
+        if len(questions) < num_questions:
+            additional = self._generate_fallback_questions(topic, difficulty, num_questions - len(questions), marks_per_question, start_id=len(questions) + 1)
+            questions.extend(additional)
+        
+        return {
+            "quiz_id": f"quiz_{datetime.now().timestamp()}",
+            "topic": topic,
+            "difficulty": difficulty,
+            "questions": questions,
+            "total_marks": len(questions) * marks_per_question,
+            "completeness_score": round(min(len(questions) / questions_to_generate, 1.0), 2),
+            "confidence_score": round(0.9 if self.llm else 0.7, 2)
+        }
+    
+    def _generate_questions_with_llm(self, topic: str, difficulty: str, questions_to_generate: int):
+        """Ask the LLM for quiz questions about a topic - distinct question strings and their embeddings"""
+        # Better prompt for diverse, real questions
+        prompt = f"""You are an expert educator creating a quiz about {topic} at {difficulty} difficulty level.
 
 
 
@@ -894,68 +569,16 @@ Example format:
 
 
 Now generate {questions_to_generate} unique questions about {topic}:"""
-                
-                response = self.llm.invoke(prompt)
-                ai_content = response.content
-                
-                # Better parsing - handle various formats
-                lines = ai_content.split('\n')
-                question_num = 1
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Remove numbering patterns (1., 1), Q1, Question 1, etc.)
-                    # Remove leading numbers, dots, dashes, Q, Question prefixes
-                    cleaned = re.sub(r'^(\d+[\.\)\-\s]+|Q\d+[\.\)\-\s:]+|Question\s+\d+[\.\)\-\s:]+)', '', line, flags=re.IGNORECASE)
-                    cleaned = cleaned.strip()
-                    
-                    # Must contain a question mark and be substantial
-                    if '?' in cleaned and len(cleaned) > 20:
-                        # Remove any remaining prefixes
-                        if cleaned.startswith(':'):
-                            cleaned = cleaned[1:].strip()
-                        
-                        questions.append({
-                            "id": question_num,
-                            "question": cleaned,
-                            "type": "short_answer",
-                            "marks": marks_per_question
-                        })
-                        question_num += 1
-                        
-                        if question_num > questions_to_generate:
-                            break
-                
-                # If we got some questions but not enough, that's okay - we'll use what we have
-                if len(questions) == 0:
-                    raise Exception("No questions parsed from LLM response")
-                    
-            except Exception as e:
-                print(f"Error generating quiz with AI: {e}")
-                # Fallback to diverse template questions
-                questions = self._generate_fallback_questions(topic, difficulty, questions_to_generate, marks_per_question)
-        else:
-            # No LLM available - use diverse fallback questions
-            questions = self._generate_fallback_questions(topic, difficulty, questions_to_generate, marks_per_question)
-
-
-        # Ensure we have at least the requested number
-        if len(questions) < num_questions:
-            additional = self._generate_fallback_questions(topic, difficulty, num_questions - len(questions), marks_per_question, start_id=len(questions) + 1)
-            questions.extend(additional)
         
-        return {
-            "quiz_id": f"quiz_{datetime.now().timestamp()}",
-            "topic": topic,
-            "difficulty": difficulty,
-            "questions": questions,
-            "total_marks": len(questions) * marks_per_question,
-            "completeness_score": round(min(len(questions) / questions_to_generate, 1.0), 2),
-            "confidence_score": round(0.9 if self.llm else 0.7, 2)
-        }
+        response = self._invoke_llm(
+            prompt, task="quiz_generation", max_output_tokens=get_quiz_output_tokens(questions_to_generate)
+        )
+        ai_content = response.content
+        
+        questions = parse_numbered_questions(ai_content, limit=questions_to_generate)
+        
+        # The LLM often repeats itself in different words; the embeddings are kept for the question bank
+        return dedupe_questions_with_embeddings(questions)
     
     def generate_quiz_from_pdf(self, pdf_text: str, num_questions: int, difficulty: str, marks_per_question: int) -> Dict:
         """Generate quiz questions from PDF content"""
@@ -989,37 +612,21 @@ Make each question specific to the document content and educational.
 
 Now generate {questions_to_generate} unique questions based on the document:"""
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(
+                    prompt, task="quiz_generation", max_output_tokens=get_quiz_output_tokens(questions_to_generate)
+                )
                 ai_content = response.content
                 
-                # Parse questions (same logic as generate_quiz)
-                lines = ai_content.split('\n')
-                question_num = 1
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Remove numbering patterns
-                    cleaned = re.sub(r'^(\d+[\.\)\-\s]+|Q\d+[\.\)\-\s:]+|Question\s+\d+[\.\)\-\s:]+)', '', line, flags=re.IGNORECASE)
-                    cleaned = cleaned.strip()
-                    
-                    # Must contain a question mark and be substantial
-                    if '?' in cleaned and len(cleaned) > 20:
-                        if cleaned.startswith(':'):
-                            cleaned = cleaned[1:].strip()
-                        
-                        questions.append({
-                            "id": question_num,
-                            "question": cleaned,
-                            "type": "short_answer",
-                            "marks": marks_per_question
-                        })
-                        question_num += 1
-                        
-                        if question_num > questions_to_generate:
-                            break
+                # Parse questions (same parser as generate_quiz)
+                questions = [
+                    {
+                        "id": i,
+                        "question": question,
+                        "type": "short_answer",
+                        "marks": marks_per_question
+                    }
+                    for i, question in enumerate(parse_numbered_questions(ai_content, limit=questions_to_generate), start=1)
+                ]
                 
                 if len(questions) == 0:
                     raise Exception("No questions parsed from LLM response")
@@ -1032,6 +639,9 @@ Now generate {questions_to_generate} unique questions based on the document:"""
             # No LLM available - generate from PDF text
             questions = self._generate_questions_from_text(pdf_text, difficulty, questions_to_generate, marks_per_question)
 
+        # Drop paraphrased and repeated questions in a single embedding pass
+        questions = self._dedupe_question_dicts(questions)
+
         # Ensure we have at least the requested number
         if len(questions) < num_questions:
             additional = self._generate_questions_from_text(pdf_text, difficulty, num_questions - len(questions), marks_per_question, start_id=len(questions) + 1)
@@ -1097,6 +707,20 @@ Now generate {questions_to_generate} unique questions based on the document:"""
         
         return questions[:num_questions]
     
+    def _dedupe_question_dicts(self, questions: List[Dict]) -> List[Dict]:
+        """Remove near-duplicate questions and renumber the rest from 1"""
+        try:
+            distinct = set(dedupe_questions([q["question"] for q in questions]))
+        except Exception as e:
+            print(f"Warning: Question dedup failed: {e}")
+            return questions
+        result = []
+        for q in questions:
+            if q["question"] in distinct:
+                distinct.discard(q["question"])
+                result.append(dict(q, id=len(result) + 1))
+        return result
+    
     def _generate_fallback_questions(self, topic: str, difficulty: str, num_questions: int, marks_per_question: int, start_id: int = 1) -> List[Dict]:
         """Generate diverse fallback questions when LLM is not available"""
         # More diverse question templates based on difficulty
@@ -1169,13 +793,23 @@ Now generate {questions_to_generate} unique questions based on the document:"""
     
     def chat(self, message: str, user_id: str) -> Dict:
         """Chat with agent using memory and context"""
-        # Get context from memory (recent conversation history) - returns list of dicts
-        context = self.memory.get_memory(user_id, limit=5)
+        # Get context from memory (recent conversation history) - returns list of dicts, newest first
+        context = self.memory.get_memory(user_id, limit=3)
+        
+        # Earlier turns relevant to this message, beyond the recent ones (bounded by a token budget)
+        relevant_context = []
+        try:
+            relevant_context = self.memory.get_relevant_memory(
+                user_id, message, k=3, token_budget=600,
+                exclude_ids=[conv.get('id') for conv in context]
+            )
+        except Exception as e:
+            print(f"[DEBUG] Chat - Semantic memory retrieval failed: {e}")
         
         # Try to get relevant information from dataset first
         dataset_info = None
         try:
-            search_results = self.data_service.search(message, limit=1)
+            search_results = self.topic_retriever.search(message, limit=1)
             if search_results:
                 dataset_info = search_results[0]
         except:
@@ -1183,11 +817,26 @@ Now generate {questions_to_generate} unique questions based on the document:"""
         
         # Build conversation context string
         context_str = ""
-        if context:
-            context_str = "\n\nRecent conversation history:\n"
-            for conv in context[-3:]:  # Use last 3 conversations for context
+        conversation_summary = ""
+        try:
+            conversation_summary = self.memory.get_summary(user_id)
+        except Exception as e:
+            print(f"[DEBUG] Chat - Could not read conversation summary: {e}")
+        if conversation_summary:
+            context_str += f"\n\nSummary of earlier conversation:\n{conversation_summary}\n"
+        if relevant_context:
+            context_str += "\n\nRelevant earlier conversation:\n"
+            for conv in relevant_context:
                 context_str += f"Student: {conv.get('user_message', '')}\n"
                 context_str += f"Assistant: {conv.get('ai_response', '')}\n"
+        if context:
+            context_str += "\n\nRecent conversation history:\n"
+            for conv in reversed(context):  # Last 3 conversations, oldest first
+                ai_text = conv.get('ai_response', '')
+                if len(ai_text) > RECENT_TURN_MAX_CHARS:
+                    ai_text = ai_text[:RECENT_TURN_MAX_CHARS] + "..."
+                context_str += f"Student: {conv.get('user_message', '')}\n"
+                context_str += f"Assistant: {ai_text}\n"
         
         # Build enhanced prompt with dataset information if available
         if self.llm:
@@ -1249,7 +898,7 @@ DO NOT:
                 print(f"[DEBUG] Chat - Full prompt length: {len(full_prompt)} characters")
                 print(f"[DEBUG] Chat - Prompt preview: {full_prompt[:300]}...")
                 
-                response = self.llm.invoke(full_prompt)
+                response = self._invoke_llm(full_prompt, task="chat")
                 ai_response = response.content.strip()
                 
                 print(f"[DEBUG] Chat - Raw LLM response (first 300 chars): {ai_response[:300]}...")
@@ -1384,6 +1033,36 @@ DO NOT:
             "timestamp": datetime.now().isoformat()
         }
     
+    def _summarize_conversation(self, previous_summary: str, turns_text: str) -> str:
+        """Fold older chat turns into the running conversation summary (used by AgentMemory)"""
+        prompt = f"""Update the running summary of a tutoring conversation between a student and an AI teacher.
+
+Current summary:
+{previous_summary or "(none)"}
+
+New conversation turns:
+{turns_text[:12000]}
+
+Write the updated summary in at most 150 words. Keep the topics the student asked about, what was already explained, and any misunderstandings or preferences the student showed. Provide only the summary."""
+        response = self._invoke_llm(prompt, task="summary")
+        return response.content.strip()
+    
+    def recommend_difficulty(self, user_id: str, topic: str) -> Dict:
+        """Recommend a quiz difficulty from the student's ability on the topic"""
+        if self.adaptive_difficulty:
+            try:
+                return self.adaptive_difficulty.recommend(user_id, topic)
+            except Exception as e:
+                print(f"Warning: Could not read student ability: {e}")
+        # No ability data available - recommend for a new student
+        return {
+            "student_id": user_id,
+            "topic": topic,
+            "recommended_difficulty": recommend_level(INITIAL_RATING),
+            "rating": INITIAL_RATING,
+            "answers_seen": 0
+        }
+    
     def get_memory(self, user_id: str, limit: int) -> Dict:
         """Get conversation memory"""
         conversations = self.memory.get_memory(user_id, limit)
@@ -1442,24 +1121,22 @@ DO NOT:
             "data_source": source_used
         }
     
-    def summarize(self, content: str) -> Dict:
-        """Summarize content"""
-        summary = self.reasoning.summarize(content)
-        
-        # Log decision
+    def _log_decision(self, decision_type: str, context: str, decision: str, confidence: float):
+        """Write one agent_decisions row"""
         conn = get_db_connection(self.db_path)
         conn.execute(
             """INSERT INTO agent_decisions (decision_type, context, decision, confidence, timestamp)
             VALUES (?, ?, ?, ?, ?)""",
-            ("summarization", content[:100], summary[:200], 0.85, datetime.now().isoformat())
+            (decision_type, context, decision, confidence, datetime.now().isoformat())
         )
         conn.commit()
         conn.close()
-        
-        # Calculate completeness and confidence scores
+    
+    @staticmethod
+    def _summary_result(content: str, summary: str) -> Dict:
+        """Summary plus length, completeness and confidence scores"""
         completeness = min(len(summary) / max(len(content) * 0.3, 1), 1.0)
         confidence = 0.85
-        
         return {
             "summary": summary,
             "original_length": len(content),
@@ -1468,26 +1145,49 @@ DO NOT:
             "confidence_score": round(confidence, 2)
         }
     
-    def classify(self, content: str, categories: List[str]) -> Dict:
-        """Classify content"""
-        result = self.reasoning.classify(content, categories)
-        
-        # Log decision
-        conn = get_db_connection(self.db_path)
-        conn.execute(
-            """INSERT INTO agent_decisions (decision_type, context, decision, confidence, timestamp)
-            VALUES (?, ?, ?, ?, ?)""",
-            ("classification", content[:100], result["category"], result.get("confidence", 0.8),
-             datetime.now().isoformat())
+    def summarize(self, content: str) -> Dict:
+        """Summarize content"""
+        summary = self.reasoning.summarize(content)
+        self._log_decision("summarization", content[:100], summary[:200], 0.85)
+        return self._summary_result(content, summary)
+    
+    def summarize_many(self, contents: List[str], max_length: int = 200) -> List[Dict]:
+        """Summarize several documents (in order) with one audit row for the batch"""
+        summaries = self.reasoning.summarize_many(contents, max_length)
+        results = [self._summary_result(c, s) for c, s in zip(contents, summaries)]
+        total_chars = sum(len(c) for c in contents)
+        self._log_decision(
+            "batch_summarization", f"{len(contents)} documents ({total_chars} chars)",
+            f"Summarized {len(results)} documents to {sum(r['summary_length'] for r in results)} chars", 0.85
         )
-        conn.commit()
-        conn.close()
+        return results
+    
+    def classify(self, content: str, categories: List[str],
+                 keywords: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """Classify content (keywords: optional category -> keyword list)"""
+        result = self.reasoning.classify(content, categories, keywords)
+        self._log_decision("classification", content[:100], result["category"], result.get("confidence", 0.8))
         
         # Add completeness score
         result["completeness_score"] = round(1.0 if result.get("category") else 0.0, 2)
         
         return result
     
+    def classify_many(self, contents: List[str], categories: List[str],
+                      keywords: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        """Classify several documents (in order) with one audit row for the batch"""
+        results = self.reasoning.classify_many(contents, categories, keywords)
+        counts: Dict[str, int] = {}
+        for result in results:
+            result["completeness_score"] = round(1.0 if result.get("category") else 0.0, 2)
+            counts[result["category"]] = counts.get(result["category"], 0) + 1
+        mean_confidence = sum(r["confidence"] for r in results) / max(len(results), 1)
+        self._log_decision(
+            "batch_classification", f"{len(contents)} documents into {', '.join(categories)}",
+            ", ".join(f"{category}: {count}" for category, count in counts.items()), round(mean_confidence, 2)
+        )
+        return results
+    
     def evaluate_quiz(self, quiz_id: str, answers: Dict, questions: List[Dict] = None,
                       topic: str = None, difficulty: str = None, marks_per_question: int = 10,
                       user_id: str = "default", time_taken_seconds: int = 0) -> Dict:
@@ -1586,23 +1286,17 @@ Marks: 0
 Feedback: Incorrect or irrelevant answer
 
 Now evaluate:"""
-                    response = self.llm.invoke(evaluation_prompt)
+                    response = self._invoke_llm(evaluation_prompt, task="grading")
                     eval_text = response.content
                     
                     print(f"[DEBUG] LLM Evaluation Response for Q{q_id}: {eval_text[:200]}...")
                     
-                    # Parse LLM response - look for marks
-                    marks_match = re.search(r'marks:\s*(\d+(?:\.\d+)?)', eval_text, re.IGNORECASE)
-                    if marks_match:
-                        marks_awarded = min(max(float(marks_match.group(1)), 0), question_marks)
+                    # Parse LLM response - look for marks and feedback
+                    parsed = parse_marks_feedback(eval_text)
+                    if parsed:
+                        marks_awarded = min(max(parsed[0], 0), question_marks)
                         is_correct = marks_awarded > 0
-                        
-                        # Extract feedback
-                        feedback_match = re.search(r'feedback:\s*(.+?)(?:\n|$)', eval_text, re.IGNORECASE | re.DOTALL)
-                        if feedback_match:
-                            evaluation_feedback = feedback_match.group(1).strip()
-                        else:
-                            evaluation_feedback = f"Awarded {marks_awarded} marks based on answer quality"
+                        evaluation_feedback = parsed[1] or f"Awarded {marks_awarded} marks based on answer quality"
                     else:
                         # If marks not found, try to infer from response
                         eval_lower = eval_text.lower()
@@ -1777,6 +1471,14 @@ Now evaluate:"""
                 print(f"Warning: Error accessing student database: {e}")
                 print(f"Traceback: {traceback.format_exc()}")
         
+        # Update the student's ability estimate for this topic (adaptive difficulty)
+        if self.adaptive_difficulty and topic:
+            try:
+                ability = self.adaptive_difficulty.record_quiz(user_id, topic, difficulty, feedback)
+                print(f"[Adaptive] Updated ability for {user_id} on '{topic}': {ability}")
+            except Exception as e:
+                print(f"Warning: Could not update student ability: {e}")
+        
         # Calculate completeness and confidence
         completeness = 1.0 if len(feedback) == total_questions else (len(feedback) / total_questions if total_questions > 0 else 0.0)
         confidence = 0.9 if self.llm else 0.6
@@ -10,6 +10,7 @@ from pathlib import Path
 import io
 import hashlib
 import secrets
+from typing import List
 
 import sys
 
@@ -25,17 +26,22 @@ from src.models.pydantic_models import (
     ChatRequest, ChatResponse, QueryRequest,
     QuizEvaluationRequest, QuizEvaluationResponse,
     SummaryResponse, ClassificationResponse,
+    BatchSummaryRequest, BatchSummaryResponse,
+    BatchClassificationRequest, BatchClassificationResponse,
     YouTubeProcessRequest, YouTubeProcessResponse,
     YouTubeQuestionRequest, YouTubeQuestionResponse,
-    SignUpRequest, SignInRequest, AuthResponse
+    SignUpRequest, SignInRequest, AuthResponse,
+    DifficultyRecommendationResponse
 )
 from src.agent import AIAgent
+from src.utils.llm_parsing import get_parse_stats
 
 # Setup - Use your own database file
 try:
     from config import DB_PATH, STUDENT_DB_PATH
 except ImportError:
     from src.config import DB_PATH, STUDENT_DB_PATH
+from src.config import REASONING_BATCH_MAX_DOCUMENTS
 
 # Ensure STUDENT_DB_PATH is defined
 try:
@@ -43,26 +49,31 @@ try:
 except NameError:
     STUDENT_DB_PATH = None
 
-init_db(DB_PATH)
+# Reasoning batch workers are spawned processes that re-import this file as
+# __mp_main__ - they only run src.reasoning, so none of the setup below
+IS_WORKER_PROCESS = __name__ == "__mp_main__"
 
-# Initialize student database if path is configured
-try:
-    from src.database.student_db import init_student_db
-    from pathlib import Path
-    if STUDENT_DB_PATH:
-        # Ensure directory exists
-        Path(STUDENT_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-        # Initialize student database
-        init_student_db(STUDENT_DB_PATH)
-        print(f"Student database initialized at: {STUDENT_DB_PATH}")
-    else:
-        print("Warning: STUDENT_DB_PATH not configured, student database features disabled")
-except Exception as e:
-    print(f"Warning: Could not initialize student database: {e}")
-    STUDENT_DB_PATH = None
+if not IS_WORKER_PROCESS:
+    init_db(DB_PATH)
+
+    # Initialize student database if path is configured
+    try:
+        from src.database.student_db import init_student_db
+        from pathlib import Path
+        if STUDENT_DB_PATH:
+            # Ensure directory exists
+            Path(STUDENT_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+            # Initialize student database
+            init_student_db(STUDENT_DB_PATH)
+            print(f"Student database initialized at: {STUDENT_DB_PATH}")
+        else:
+            print("Warning: STUDENT_DB_PATH not configured, student database features disabled")
+    except Exception as e:
+        print(f"Warning: Could not initialize student database: {e}")
+        STUDENT_DB_PATH = None
 
-# Initialize agent with student database
-agent = AIAgent(DB_PATH, STUDENT_DB_PATH)
+    # Initialize agent with student database
+    agent = AIAgent(DB_PATH, STUDENT_DB_PATH)
 
 # Create app
 app = FastAPI(title="AI Teacher Agent")
@@ -88,7 +99,7 @@ def explain_topic(request: TopicRequest):
                 f.write(json.dumps({"location":"src/app.py:97","message":"API: Received explain request","data":{"topicName":request.topic_name[:150]},"timestamp":int(time.time()*1000),"sessionId":"debug-session","runId":"run1","hypothesisId":"A"}) + '\n')
         except: pass
         # #endregion
-        result = agent.explain_topic(request.topic_name)
+        result = agent.explain_topic(request.topic_name, request.length)
         
         # Validate with Pydantic
         validated = TopicResponse(**result)
@@ -127,9 +138,14 @@ def generate_quiz(request: QuizRequest):
                 detail=f"Quiz generation is only available for AI-related topics. '{request.topic}' is not recognized as an AI topic. Please enter an AI-related topic such as Machine Learning, Deep Learning, Neural Networks, Natural Language Processing, etc."
             )
         
+        # No difficulty chosen - use the level recommended from the student's ability
+        difficulty = request.difficulty
+        if difficulty is None:
+            difficulty = agent.recommend_difficulty(request.user_id or "default", request.topic)["recommended_difficulty"]
+        
         result = agent.generate_quiz(
             request.topic, request.num_questions, 
-            request.difficulty, request.marks_per_question
+            difficulty, request.marks_per_question
         )
         
         # Validate with Pydantic
@@ -141,8 +157,8 @@ def generate_quiz(request: QuizRequest):
             """INSERT INTO quiz_generations 
                (topic, difficulty, num_questions, total_marks, timestamp, student_id) 
                VALUES (?, ?, ?, ?, ?, ?)""",
-            (request.topic, request.difficulty, request.num_questions,
-             validated.total_marks, datetime.now().isoformat(), "default")
+            (request.topic, validated.difficulty.value, request.num_questions,
+             validated.total_marks, datetime.now().isoformat(), request.user_id or "default")
         )
         # Log agent decision
         conn.execute(
@@ -159,6 +175,41 @@ def generate_quiz(request: QuizRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/quiz/bank/stats")
+def get_question_bank_stats():
+    """Get question bank pool sizes and usage"""
+    try:
+        pools = agent.question_bank.get_stats()
+        return {"pools": pools, "count": len(pools)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/llm/stats")
+def get_llm_stats():
+    """Get LLM request coalescing counts, per-task model usage and parse failure rates"""
+    models = agent.models.get_stats()
+    recent_calls = agent.models.get_recent_calls()
+    # The YouTube RAG service has its own router (and API key) - include its rag_answer usage
+    try:
+        from src.services.youtube_rag import get_youtube_rag_models
+        rag_models = get_youtube_rag_models()
+    except ImportError:
+        rag_models = None
+    if rag_models is not None:
+        models.update(rag_models.get_stats())
+        recent_calls = sorted(recent_calls + rag_models.get_recent_calls(), key=lambda c: c["at"], reverse=True)[:20]
+    return {
+        "single_flight": agent.llm_flight.get_stats(),
+        "models": models,
+        "recent_calls": recent_calls,
+        "parsing": get_parse_stats()
+    }
+
+@app.get("/api/resources/stats")
+def get_resource_link_stats():
+    """Get resource link index size and hit rates"""
+    return agent.resource_links.get_stats()
+
 @app.post("/api/quiz/generate-from-pdf", response_model=QuizResponse)
 async def generate_quiz_from_pdf(
     pdf_file: UploadFile = File(...),
@@ -175,26 +226,54 @@ async def generate_quiz_from_pdf(
         
         # Read PDF file content
         pdf_content = await pdf_file.read()
-        
-        # Extract text from PDF
-        try:
-            import PyPDF2
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-            pdf_text = ""
-            for page in pdf_reader.pages:
-                pdf_text += page.extract_text() + "\n"
-            
-            if not pdf_text.strip():
-                raise HTTPException(status_code=400, detail="Could not extract text from PDF. The PDF might be image-based or encrypted.")
-        except ImportError:
-            raise HTTPException(status_code=500, detail="PDF processing library not installed. Please install PyPDF2.")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
-        
-        # Generate quiz from PDF content using agent
-        result = agent.generate_quiz_from_pdf(
-            pdf_text, num_questions, difficulty, marks_per_question
-        )
+
+        # Same bytes uploaded before - reuse extracted text and generated questions
+        from src.services.pdf_cache import get_pdf_quiz_cache
+        pdf_cache = get_pdf_quiz_cache()
+        pdf_key = pdf_cache.digest(pdf_content)
+        cached_document = pdf_cache.get_document(pdf_key)
+
+        if cached_document:
+            pdf_text = cached_document["text"]
+        else:
+            # Extract text from PDF
+            try:
+                import PyPDF2
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+                pdf_text, sections = pdf_cache.build_section_index(
+                    [page.extract_text() for page in pdf_reader.pages]
+                )
+
+                if not pdf_text.strip():
+                    raise HTTPException(status_code=400, detail="Could not extract text from PDF. The PDF might be image-based or encrypted.")
+            except ImportError:
+                raise HTTPException(status_code=500, detail="PDF processing library not installed. Please install PyPDF2.")
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
+            pdf_cache.put_document(pdf_key, pdf_text, sections)
+
+        cached_questions = pdf_cache.get_questions(pdf_key, difficulty, num_questions)
+        if cached_questions:
+            print(f"[PDF Cache] Reusing {len(cached_questions)} questions for {pdf_file.filename}")
+            for q in cached_questions:
+                q["marks"] = marks_per_question
+            result = {
+                "quiz_id": f"quiz_pdf_{datetime.now().timestamp()}",
+                "topic": "PDF Document",
+                "difficulty": difficulty,
+                "questions": cached_questions,
+                "total_marks": len(cached_questions) * marks_per_question,
+                "completeness_score": round(min(len(cached_questions) / (num_questions * 2), 1.0), 2),
+                "confidence_score": round(0.9 if agent.llm else 0.7, 2)
+            }
+        else:
+            # Generate quiz from PDF content using agent
+            result = agent.generate_quiz_from_pdf(
+                pdf_text, num_questions, difficulty, marks_per_question
+            )
+            pdf_cache.put_questions(pdf_key, difficulty, num_questions, result["questions"])
         
         # Validate with Pydantic
         validated = QuizResponse(**result)
@@ -263,23 +342,23 @@ def get_dataset_stats():
     """Get dataset statistics"""
     try:
         data_service = agent.data_service
-        all_data = data_service.get_all()
-        source_info = data_service.get_source_info()
-        
-        stats = {
-            "data_source": source_info,
-            "total_items": len(all_data),
-            "categories": {},
-            "difficulties": {}
+        return {
+            "data_source": data_service.get_source_info(),
+            **data_service.get_stats(),
+            "retrieval": agent.topic_retriever.get_stats()
         }
-        
-        for item in all_data:
-            cat = item.get("category", "uncategorized")
-            diff = item.get("difficulty", "unknown")
-            stats["categories"][cat] = stats["categories"].get(cat, 0) + 1
-            stats["difficulties"][diff] = stats["difficulties"].get(diff, 0) + 1
-        
-        return stats
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/dataset/items")
+def get_dataset_items(ids: str):
+    """Get dataset items by comma-separated IDs, in the order given"""
+    try:
+        item_ids = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    try:
+        return {"items": agent.data_service.get_many(item_ids)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -306,6 +385,13 @@ def get_data_sources():
                     "query_types": ["search", "filter", "categorize"],
                     "active": source_info["source_type"] == "csv"
                 },
+                {
+                    "type": "SQLite Topics Database",
+                    "file": "data/topics_dataset.db",
+                    "description": "Topics dataset in SQLite with an FTS5 full-text index (ranked search)",
+                    "query_types": ["search", "filter", "categorize"],
+                    "active": source_info["source_type"] == "database"
+                },
                 {
                     "type": "SQLite Database",
                     "file": "database/ai_teacher.db",
@@ -315,7 +401,7 @@ def get_data_sources():
                 }
             ],
             "current_source": source_info,
-            "supported_formats": ["JSON", "CSV", "Database"]
+            "supported_formats": ["JSON", "JSONL", "CSV", "Database"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -393,7 +479,7 @@ def classify(request: dict):
         if not content:
             raise HTTPException(status_code=400, detail="Content required")
         
-        result = agent.classify(content, categories)
+        result = agent.classify(content, categories, request.get("keywords"))
         
         # Validate with Pydantic
         validated = ClassificationResponse(**result)
@@ -402,6 +488,33 @@ def classify(request: dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _check_batch_size(documents: List[str]):
+    if len(documents) > REASONING_BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {REASONING_BATCH_MAX_DOCUMENTS} documents per batch (got {len(documents)})"
+        )
+
+@app.post("/api/reasoning/summarize/batch", response_model=BatchSummaryResponse)
+def summarize_batch(request: BatchSummaryRequest):
+    """Summarize many documents in one call - results in request order"""
+    _check_batch_size(request.documents)
+    try:
+        results = agent.summarize_many(request.documents, request.max_length)
+        return BatchSummaryResponse(results=[SummaryResponse(**r) for r in results], count=len(results))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/reasoning/classify/batch", response_model=BatchClassificationResponse)
+def classify_batch(request: BatchClassificationRequest):
+    """Classify many documents in one call - results in request order"""
+    _check_batch_size(request.documents)
+    try:
+        results = agent.classify_many(request.documents, request.categories, request.keywords)
+        return BatchClassificationResponse(results=[ClassificationResponse(**r) for r in results], count=len(results))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Authentication API Endpoints
 def hash_password(password: str) -> str:
     """Hash password using SHA-256 with salt"""
@@ -558,6 +671,14 @@ def get_student_stats(student_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/students/{student_id}/recommended-difficulty", response_model=DifficultyRecommendationResponse)
+def get_recommended_difficulty(student_id: str, topic: str):
+    """Get the quiz difficulty recommended from the student's ability on a topic"""
+    try:
+        return DifficultyRecommendationResponse(**agent.recommend_difficulty(student_id, topic))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/students")
 def create_student(name: str, student_id: str, email: str = None):
     """Create or update a student"""
@@ -3,6 +3,7 @@ Configuration - Database Settings
 Change DB_FILE to your database filename
 """
 
+import os
 from pathlib import Path
 
 # Database Configuration
@@ -14,3 +15,49 @@ DB_PATH = str(BASE_DIR / "database" / DB_FILE)
 STUDENT_DB_FILE = "students.db"  # CHANGE THIS to your student database filename (e.g., "my_students.db")
 STUDENT_DB_PATH = str(BASE_DIR / "database" / STUDENT_DB_FILE)
 
+
+# PDF quiz cache - total size of cached PDF text and question pools
+PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+# LLM model tiers - each task type is routed to a model and output-token cap
+# (quiz generation passes a cap sized to the question count, see get_quiz_output_tokens)
+LLM_MODEL_ROUTES = {
+    "title": {"model": "gemini-1.5-flash", "max_output_tokens": 48, "temperature": 0.3},
+    "grading": {"model": "gemini-1.5-flash", "max_output_tokens": 128, "temperature": 0.0},
+    "quiz_generation": {"model": "gemini-1.5-flash", "max_output_tokens": 1024, "temperature": 0.7},
+    "summary": {"model": "gemini-1.5-flash", "max_output_tokens": 400, "temperature": 0.3},
+    "chat": {"model": "gemini-1.5-flash", "max_output_tokens": 768, "temperature": 0.7},
+    "rag_answer": {"model": "gemini-1.5-flash", "max_output_tokens": 512, "temperature": 0.2},
+    "explanation": {"model": "gemini-1.5-pro", "max_output_tokens": 2560, "temperature": 0.7},
+}
+# Tried in order when a route's model cannot be initialized
+LLM_FALLBACK_MODELS = ["gemini-2.0-flash-exp", "gemini-1.5-flash", "gemini-pro"]
+
+# Resource links (YouTube video ids / Wikipedia slugs per topic) - seed file and refresh policy
+RESOURCE_LINKS_FILE = str(BASE_DIR / "data" / "resource_links.json")
+RESOURCE_LINKS_TTL_SECONDS = 7 * 24 * 3600  # serve cached links, refresh in background after a week
+
+# Outbound HTTP - shared keep-alive pool, retries and per-host concurrency
+HTTP_POOL_MAXSIZE = 20
+HTTP_MAX_CONCURRENCY_PER_HOST = 4
+HTTP_RETRIES = 2
+HTTP_TIMEOUT_SECONDS = 5
+
+# Topics dataset hot reload - how often the dataset file's mtime/size is checked (0 disables)
+DATASET_WATCH_INTERVAL_SECONDS = 5
+# Larger JSON/JSONL/CSV datasets are streamed into SQLite (next to the file) instead of indexed in memory
+DATASET_SPILL_BYTES = 256 * 1024 * 1024  # 256 MB, 0 disables
+DATASET_LOAD_PROGRESS_EVERY = 50000  # items between load progress reports
+
+# Batch summarize/classify - size cap, and when to fan out across worker processes
+REASONING_BATCH_MAX_DOCUMENTS = 10000
+REASONING_POOL_MIN_CHARS = 1_000_000  # batches with less text run in-process
+REASONING_POOL_WORKERS = min(4, os.cpu_count() or 1)  # 1 = never use worker processes
+
+# Hybrid topic retrieval (chat grounding / fallback explanations) - persisted item embeddings and fusion
+TOPIC_INDEX_DIR = str(BASE_DIR / "models" / "topic_index")
+RETRIEVAL_CANDIDATES = 20  # per ranker, before fusion
+RETRIEVAL_RRF_K = 60  # reciprocal rank fusion constant
+RETRIEVAL_MIN_SIMILARITY = 0.3  # cosine floor for semantic candidates
+RETRIEVAL_MIN_TERM_COVERAGE = 0.5  # share of query words a keyword candidate must contain
+RETRIEVAL_RETRY_SECONDS = 300  # wait before retrying a failed index build
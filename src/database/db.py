@@ -11,6 +11,31 @@ def get_db_connection(db_path):
     conn.row_factory = sqlite3.Row
     return conn
 
+def ensure_agent_memory_schema(conn):
+    """Create or migrate agent_memory - the single definition used by init_db and AgentMemory"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS agent_memory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            user_message TEXT NOT NULL,
+            ai_response TEXT NOT NULL,
+            context TEXT,
+            timestamp TEXT NOT NULL,
+            session_id TEXT
+        )
+    ''')
+    # Tables created by older AgentMemory versions lack session_id
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(agent_memory)").fetchall()]
+    if "session_id" not in columns:
+        conn.execute("ALTER TABLE agent_memory ADD COLUMN session_id TEXT")
+    # Covering index: recent turns per user are a pure index range scan (no table lookups, no sort)
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_agent_memory_user_recent
+        ON agent_memory(user_id, id DESC, user_message, ai_response, context, timestamp)
+    ''')
+    # Superseded by idx_agent_memory_user_recent
+    conn.execute("DROP INDEX IF EXISTS idx_user_timestamp")
+
 def init_db(db_path):
     """Initialize database with all required tables"""
     conn = get_db_connection(db_path)
@@ -134,24 +159,9 @@ def init_db(db_path):
     ''')
     
     # Agent memory table (for conversation memory - mandatory feature)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS agent_memory (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT NOT NULL,
-            user_message TEXT NOT NULL,
-            ai_response TEXT NOT NULL,
-            context TEXT,
-            timestamp TEXT NOT NULL,
-            session_id TEXT
-        )
-    ''')
+    ensure_agent_memory_schema(conn)
     
     # Create indexes for better performance
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_user_timestamp 
-        ON agent_memory(user_id, timestamp DESC)
-    ''')
-    
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_topic_queries_timestamp 
         ON topic_queries(timestamp DESC)
@@ -114,6 +114,18 @@ def init_student_db(db_path: str):
         )
     ''')
     
+    # Student ability table - Elo rating per student and topic (adaptive difficulty)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS student_ability (
+            student_id TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            rating REAL NOT NULL,
+            answers_seen INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (student_id, topic)
+        ) WITHOUT ROWID
+    ''')
+    
     # Create indexes for better performance
     cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_student_quiz_attempts 
@@ -369,3 +381,28 @@ def get_all_students(db_path: str) -> List[Dict]:
     conn.close()
     return students
 
+def get_student_ability(db_path: str, student_id: str, topic: str) -> Optional[Dict]:
+    """Get a student's ability rating for a topic (None if not rated yet)"""
+    conn = get_student_db_connection(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT rating, answers_seen, updated_at FROM student_ability
+        WHERE student_id = ? AND topic = ?
+    ''', (student_id, topic))
+    row = cursor.fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+def save_student_ability(db_path: str, student_id: str, topic: str, rating: float, answers_seen: int):
+    """Insert or update a student's ability rating for a topic"""
+    conn = get_student_db_connection(db_path)
+    conn.execute('''
+        INSERT INTO student_ability (student_id, topic, rating, answers_seen, updated_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(student_id, topic) DO UPDATE SET
+            rating = excluded.rating,
+            answers_seen = excluded.answers_seen,
+            updated_at = excluded.updated_at
+    ''', (student_id, topic, rating, answers_seen, datetime.now().isoformat()))
+    conn.commit()
+    conn.close()
@@ -0,0 +1,218 @@
+"""
+Topics Database - SQLite source for the topics dataset
+Items are stored as JSON rows with indexed category/difficulty/tag columns
+and an FTS5 index over topic, description, tags and key concepts, so
+search/filter/categorize run as indexed queries without loading the dataset
+"""
+
+import json
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+IMPORT_BATCH_SIZE = 1000
+IDS_PER_QUERY = 500
+
+
+def get_topics_db_connection(db_path: str):
+    """Get connection to topics database"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def init_topics_db(db_path: str):
+    """Create topics tables and indexes"""
+    conn = get_topics_db_connection(db_path)
+    # pos keeps dataset order; item_id is the item's own "id" field
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS topics (
+            pos INTEGER PRIMARY KEY,
+            item_id INTEGER,
+            category TEXT,
+            category_lower TEXT,
+            difficulty TEXT,
+            difficulty_lower TEXT,
+            data TEXT NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_topics_item_id ON topics(item_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_topics_category ON topics(category_lower, pos)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_topics_difficulty ON topics(difficulty_lower, pos)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS topic_tags (
+            tag TEXT NOT NULL,
+            pos INTEGER NOT NULL,
+            PRIMARY KEY (tag, pos)
+        ) WITHOUT ROWID
+    ''')
+    # Contentless: only rowids (= topics.pos) and the full-text index are stored
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS topics_fts USING fts5(
+            topic, description, tags, key_concepts, content=''
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def _item_id(item: Dict) -> Optional[int]:
+    try:
+        return int(item.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def import_topics(db_path: str, items: Iterable[Dict], replace: bool = True) -> int:
+    """Load items into the topics database in batches; returns the number imported"""
+    init_topics_db(db_path)
+    conn = get_topics_db_connection(db_path)
+    if replace:
+        conn.execute("DELETE FROM topics")
+        conn.execute("DELETE FROM topic_tags")
+        conn.execute("INSERT INTO topics_fts(topics_fts) VALUES('delete-all')")
+    start = conn.execute("SELECT COALESCE(MAX(pos), -1) + 1 FROM topics").fetchone()[0]
+    count = 0
+    rows, tag_rows, fts_rows = [], [], []
+    for item in items:
+        pos = start + count
+        count += 1
+        category = item.get("category")
+        difficulty = item.get("difficulty")
+        tags = item.get("tags", []) or []
+        concepts = item.get("key_concepts", []) or []
+        rows.append((
+            pos, _item_id(item), category, (category or "").lower(),
+            difficulty, (difficulty or "").lower(), json.dumps(item, ensure_ascii=False)
+        ))
+        tag_rows.extend((tag, pos) for tag in set(t.lower() for t in tags))
+        fts_rows.append((pos, item.get("topic", ""), item.get("description", ""), " ".join(tags), " ".join(concepts)))
+        if len(rows) >= IMPORT_BATCH_SIZE:
+            _write_batch(conn, rows, tag_rows, fts_rows)
+            rows, tag_rows, fts_rows = [], [], []
+    _write_batch(conn, rows, tag_rows, fts_rows)
+    conn.commit()
+    conn.close()
+    return count
+
+
+def _write_batch(conn, rows, tag_rows, fts_rows):
+    if rows:
+        conn.executemany("INSERT INTO topics VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT OR IGNORE INTO topic_tags VALUES (?, ?)", tag_rows)
+        conn.executemany(
+            "INSERT INTO topics_fts(rowid, topic, description, tags, key_concepts) VALUES (?, ?, ?, ?, ?)",
+            fts_rows
+        )
+
+
+def _fts_query(query: str) -> str:
+    """FTS5 MATCH expression: every word of the query, each as a prefix"""
+    return " ".join(f'"{token}"*' for token in TOKEN_PATTERN.findall(query.lower()))
+
+
+def search_topics(db_path: str, query: str, limit: int = 20) -> List[Dict]:
+    """Full-text search ranked by BM25 (topic matches weigh most)"""
+    match = _fts_query(query)
+    if not match:
+        return []
+    conn = get_topics_db_connection(db_path)
+    rows = conn.execute('''
+        SELECT t.data FROM topics_fts f JOIN topics t ON t.pos = f.rowid
+        WHERE topics_fts MATCH ?
+        ORDER BY bm25(topics_fts, 10.0, 2.0, 5.0, 3.0)
+        LIMIT ?
+    ''', (match, limit)).fetchall()
+    conn.close()
+    return [json.loads(r["data"]) for r in rows]
+
+
+def filter_topics(db_path: str, filters: Dict, limit: int = 20) -> List[Dict]:
+    """Items matching category, difficulty and any of the given tags, in dataset order"""
+    clauses, params = [], []
+    if "category" in filters:
+        clauses.append("category_lower = ?")
+        params.append(filters["category"].lower())
+    if "difficulty" in filters:
+        clauses.append("difficulty_lower = ?")
+        params.append(filters["difficulty"].lower())
+    if "tags" in filters:
+        tags = [t.lower() for t in filters["tags"]]
+        clauses.append(f"pos IN (SELECT pos FROM topic_tags WHERE tag IN ({','.join('?' * len(tags)) or 'NULL'}))")
+        params.extend(tags)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    conn = get_topics_db_connection(db_path)
+    rows = conn.execute(f"SELECT data FROM topics {where} ORDER BY pos LIMIT ?", (*params, limit)).fetchall()
+    conn.close()
+    return [json.loads(r["data"]) for r in rows]
+
+
+def categorize_topics(db_path: str, limit: int = 20) -> Dict[str, List[Dict]]:
+    """Up to `limit` items per category, categories in first-seen order"""
+    conn = get_topics_db_connection(db_path)
+    rows = conn.execute('''
+        SELECT category, data FROM (
+            SELECT COALESCE(category, 'uncategorized') AS category, data, pos,
+                   ROW_NUMBER() OVER (PARTITION BY COALESCE(category, 'uncategorized') ORDER BY pos) AS rank,
+                   MIN(pos) OVER (PARTITION BY COALESCE(category, 'uncategorized')) AS first_pos
+            FROM topics
+        ) WHERE rank <= ? ORDER BY first_pos, pos
+    ''', (limit,)).fetchall()
+    conn.close()
+    categories: Dict[str, List[Dict]] = {}
+    for r in rows:
+        categories.setdefault(r["category"], []).append(json.loads(r["data"]))
+    return categories
+
+
+def get_topic_by_id(db_path: str, item_id: int) -> Dict:
+    """Item with the given id ({} if none)"""
+    conn = get_topics_db_connection(db_path)
+    row = conn.execute("SELECT data FROM topics WHERE item_id = ? ORDER BY pos LIMIT 1", (item_id,)).fetchone()
+    conn.close()
+    return json.loads(row["data"]) if row else {}
+
+
+def get_topics_by_ids(db_path: str, item_ids: List[int]) -> List[Dict]:
+    """Items for several ids, in the order given ({} for an unknown id)"""
+    found: Dict[int, Dict] = {}
+    wanted = list(dict.fromkeys(item_ids))
+    conn = get_topics_db_connection(db_path)
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(wanted), IDS_PER_QUERY):
+        chunk = wanted[start:start + IDS_PER_QUERY]
+        rows = conn.execute(
+            f"SELECT item_id, data FROM topics WHERE item_id IN ({','.join('?' * len(chunk))}) ORDER BY pos",
+            chunk
+        ).fetchall()
+        for r in rows:
+            found.setdefault(r["item_id"], r["data"])
+    conn.close()
+    return [json.loads(found[i]) if i in found else {} for i in item_ids]
+
+
+def get_topics(db_path: str, limit: Optional[int] = None) -> List[Dict]:
+    """Items in dataset order"""
+    conn = get_topics_db_connection(db_path)
+    rows = conn.execute("SELECT data FROM topics ORDER BY pos LIMIT ?", (limit if limit else -1,)).fetchall()
+    conn.close()
+    return [json.loads(r["data"]) for r in rows]
+
+
+def get_topic_stats(db_path: str) -> Dict:
+    """Item counts by category and difficulty"""
+    conn = get_topics_db_connection(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+    categories = {
+        r[0]: r[1] for r in conn.execute(
+            "SELECT COALESCE(category, 'uncategorized'), COUNT(*) FROM topics GROUP BY 1 ORDER BY MIN(pos)"
+        )
+    }
+    difficulties = {
+        r[0]: r[1] for r in conn.execute(
+            "SELECT COALESCE(difficulty, 'unknown'), COUNT(*) FROM topics GROUP BY 1 ORDER BY MIN(pos)"
+        )
+    }
+    conn.close()
+    return {"total_items": total, "categories": categories, "difficulties": difficulties}
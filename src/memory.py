@@ -1,62 +1,420 @@
 """
 Agent Memory - Mandatory Feature
-Simple conversation memory
+Simple conversation memory with semantic retrieval of relevant past turns
 """
 
 import sys
+import threading
+from collections import OrderedDict, deque
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from src.database.db import get_db_connection
+from src.database.db import get_db_connection, ensure_agent_memory_schema
+from src.services.embeddings import get_text_embedder, to_blob, from_blob
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Callable
+
+import numpy as np
+
+# Users whose turn vectors are kept in memory at once
+MAX_INDEXED_USERS = 256
+
+# Hot cache: recent turns kept per active user, and how many users are cached
+RECENT_TURNS_CACHED = 20
+MAX_CACHED_USERS = 1000
+
+# Past turns below this cosine similarity to the message are not worth the prompt space
+MIN_RELEVANCE = 0.25
+
+# Rolling summary: once unsummarized turns older than the latest few pass this
+# many tokens, they are compacted into the stored summary (the latest stay raw)
+SUMMARY_TRIGGER_TOKENS = 1500
+SUMMARY_KEEP_RECENT_TURNS = 3
+SUMMARY_MAX_TOKENS = 300
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token)"""
+    return max(1, len(text or "") // 4)
+
+
+class _CachedUser:
+    """Recent turns (oldest to newest) and summary of one user, mirrored from SQLite"""
+
+    __slots__ = ("turns", "complete", "summary")
+
+    def __init__(self, turns: List[Dict], complete: bool, summary: Optional[str] = None):
+        self.turns = deque(turns, maxlen=RECENT_TURNS_CACHED)
+        # True when the user has no older turns in SQLite than those in the ring buffer
+        self.complete = complete
+        self.summary = summary
+
+
+def _end_load(loads: Dict[str, List[int]], user_id: str, load: List[int]):
+    """Unregister one running SQLite load (caller holds the lock guarding `loads`)"""
+    load[1] -= 1
+    if load[1] == 0:
+        del loads[user_id]
+
 
 class AgentMemory:
     """Simple agent memory"""
-    
+
     def __init__(self, db_path: str):
         self.db_path = db_path
+        # user_id -> (memory ids, unit vectors) for semantic retrieval
+        self._vector_index: "OrderedDict[str, tuple]" = OrderedDict()
+        self._index_lock = threading.Lock()
+        # user_id -> [vectors stored since, loads running] while a load reads SQLite
+        self._vector_loads: Dict[str, List[int]] = {}
+        # user_id -> _CachedUser, bounded by LRU; writes go through to SQLite
+        self._hot_cache: "OrderedDict[str, _CachedUser]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # user_id -> [turns stored since, cache fills running] while a fill reads SQLite
+        self._fills: Dict[str, List[int]] = {}
+        # summarizer(previous_summary, turns_text) -> new summary; set by the agent when an LLM is available
+        self.summarizer: Optional[Callable[[str, str], str]] = None
+        self._summaries_in_flight = set()
+        self._summary_lock = threading.Lock()
+        # Bumped (under _cache_lock) whenever a new summary is saved
+        self._summary_writes = 0
         self._init_table()
-    
+
     def _init_table(self):
         """Initialize memory table"""
         conn = get_db_connection(self.db_path)
+        ensure_agent_memory_schema(conn)
+        # One embedding per stored turn, written once when the turn is stored
         conn.execute('''
-            CREATE TABLE IF NOT EXISTS agent_memory (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+            CREATE TABLE IF NOT EXISTS agent_memory_embeddings (
+                memory_id INTEGER PRIMARY KEY,
                 user_id TEXT NOT NULL,
-                user_message TEXT NOT NULL,
-                ai_response TEXT NOT NULL,
-                context TEXT,
-                timestamp TEXT NOT NULL
+                embedding BLOB NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_memory_embeddings_user
+            ON agent_memory_embeddings(user_id, memory_id)
+        ''')
+        # Rolling summary of each user's older turns
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS agent_memory_summaries (
+                user_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                summarized_through_id INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
             )
         ''')
         conn.commit()
         conn.close()
-    
+
     def store_conversation(self, user_id: str, user_message: str, ai_response: str, context: str = None):
         """Store conversation"""
+        timestamp = datetime.now().isoformat()
         conn = get_db_connection(self.db_path)
-        conn.execute(
+        cursor = conn.execute(
             "INSERT INTO agent_memory (user_id, user_message, ai_response, context, timestamp) VALUES (?, ?, ?, ?, ?)",
-            (user_id, user_message, ai_response, context, datetime.now().isoformat())
+            (user_id, user_message, ai_response, context, timestamp)
         )
+        memory_id = cursor.lastrowid
+
+        # Embed the turn once on write so retrieval never re-embeds history
+        vector = None
+        try:
+            vector = get_text_embedder().embed_one(self._turn_text(user_message, ai_response))
+            conn.execute(
+                "INSERT INTO agent_memory_embeddings (memory_id, user_id, embedding) VALUES (?, ?, ?)",
+                (memory_id, user_id, to_blob(vector))
+            )
+        except Exception as e:
+            print(f"Warning: Could not embed conversation turn: {e}")
         conn.commit()
+        try:
+            summarize = self._needs_summary(conn, user_id)
+        except Exception as e:
+            print(f"Warning: Could not check conversation length: {e}")
+            summarize = False
         conn.close()
-    
+
+        # Write-through: keep the hot cache in step with SQLite
+        with self._cache_lock:
+            fill = self._fills.get(user_id)
+            if fill is not None:
+                fill[0] += 1  # a fill reading SQLite now may have missed this turn
+            cached = self._hot_cache.get(user_id)
+            if cached is not None:
+                if len(cached.turns) == cached.turns.maxlen:
+                    cached.complete = False
+                cached.turns.append({
+                    "user_message": user_message, "ai_response": ai_response,
+                    "context": context, "timestamp": timestamp, "id": memory_id
+                })
+                self._hot_cache.move_to_end(user_id)
+
+        if vector is not None:
+            with self._index_lock:
+                load = self._vector_loads.get(user_id)
+                if load is not None:
+                    load[0] += 1  # a load reading SQLite now may have missed this vector
+                entry = self._vector_index.get(user_id)
+                if entry is not None:
+                    ids, matrix = entry
+                    if len(ids) == 0:
+                        self._vector_index[user_id] = (np.array([memory_id], dtype=np.int64), vector[None, :])
+                    elif matrix.shape[1] == vector.shape[0]:
+                        self._vector_index[user_id] = (np.append(ids, memory_id), np.vstack([matrix, vector]))
+                    else:
+                        # Embedding backend changed - reload from SQLite on next read
+                        del self._vector_index[user_id]
+
+        if summarize:
+            self._start_summary(user_id)
+
     def get_memory(self, user_id: str, limit: int = 50) -> List[Dict]:
-        """Get memory"""
-        conn = get_db_connection(self.db_path)
-        cursor = conn.execute(
-            "SELECT user_message, ai_response, context, timestamp FROM agent_memory WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
-            (user_id, limit)
-        )
-        rows = cursor.fetchall()
-        conn.close()
-        return [
-            {"user_message": r[0], "ai_response": r[1], "context": r[2], "timestamp": r[3]}
+        """Get memory (newest first) - served from the hot cache when it holds enough turns"""
+        with self._cache_lock:
+            cached = self._hot_cache.get(user_id)
+            if cached is not None and (cached.complete or limit <= len(cached.turns)):
+                self._hot_cache.move_to_end(user_id)
+                recent = list(cached.turns)[-limit:] if limit > 0 else []
+                return [dict(m) for m in reversed(recent)]
+            fill = self._fills.setdefault(user_id, [0, 0])
+            fill[1] += 1
+            writes_before = fill[0]
+
+        fetch = max(limit, RECENT_TURNS_CACHED)
+        try:
+            conn = get_db_connection(self.db_path)
+            cursor = conn.execute(
+                "SELECT user_message, ai_response, context, timestamp, id FROM agent_memory WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+                (user_id, fetch)
+            )
+            rows = cursor.fetchall()
+            conn.close()
+        except Exception:
+            with self._cache_lock:
+                _end_load(self._fills, user_id, fill)
+            raise
+        memories = [
+            {"user_message": r[0], "ai_response": r[1], "context": r[2], "timestamp": r[3], "id": r[4]}
             for r in rows
         ]
-    
+
+        with self._cache_lock:
+            # Still registered until here, so a store that committed after the SELECT has counted itself
+            _end_load(self._fills, user_id, fill)
+            if fill[0] != writes_before:
+                # A turn was stored while reading - the rows may lack it, so don't cache them
+                return [dict(m) for m in memories[:limit]]
+            existing = self._hot_cache.get(user_id)
+            self._hot_cache[user_id] = _CachedUser(
+                list(reversed(memories[:RECENT_TURNS_CACHED])),
+                complete=len(memories) < fetch,
+                summary=existing.summary if existing is not None else None
+            )
+            self._hot_cache.move_to_end(user_id)
+            while len(self._hot_cache) > MAX_CACHED_USERS:
+                self._hot_cache.popitem(last=False)
+        return [dict(m) for m in memories[:limit]]
+
+    def get_relevant_memory(self, user_id: str, query: str, k: int = 3, token_budget: int = 600,
+                            exclude_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+        """Get up to k past turns most similar to the query, within a token budget (oldest first)"""
+        ids, matrix = self._get_user_vectors(user_id)
+        if len(ids) == 0:
+            return []
+        query_vector = get_text_embedder().embed_one(query)
+        if matrix.shape[1] != query_vector.shape[0]:
+            return []
+        scores = matrix @ query_vector
+        excluded = set(exclude_ids or [])
+        ranked = [
+            int(ids[i]) for i in np.argsort(-scores)
+            if scores[i] >= MIN_RELEVANCE and int(ids[i]) not in excluded
+        ]
+
+        # Fetch a few extra candidates in case some do not fit the budget
+        candidate_ids = ranked[:k * 3]
+        if not candidate_ids:
+            return []
+        conn = get_db_connection(self.db_path)
+        placeholders = ",".join("?" * len(candidate_ids))
+        rows = conn.execute(
+            f"SELECT id, user_message, ai_response, context, timestamp FROM agent_memory WHERE id IN ({placeholders})",
+            candidate_ids
+        ).fetchall()
+        conn.close()
+        by_id = {r[0]: r for r in rows}
+
+        selected = []
+        tokens_used = 0
+        for memory_id in candidate_ids:
+            row = by_id.get(memory_id)
+            if row is None:
+                continue
+            tokens = estimate_tokens(row[1]) + estimate_tokens(row[2])
+            if tokens_used + tokens > token_budget:
+                continue
+            tokens_used += tokens
+            selected.append(
+                {"user_message": row[1], "ai_response": row[2], "context": row[3], "timestamp": row[4], "id": row[0]}
+            )
+            if len(selected) >= k:
+                break
+        selected.sort(key=lambda m: m["id"])
+        return selected
+
+    def _get_user_vectors(self, user_id: str):
+        """Per-user vector store, loaded from SQLite on first use and kept in an LRU"""
+        with self._index_lock:
+            entry = self._vector_index.get(user_id)
+            if entry is not None:
+                self._vector_index.move_to_end(user_id)
+                return entry
+            load = self._vector_loads.setdefault(user_id, [0, 0])
+            load[1] += 1
+            writes_before = load[0]
+
+        try:
+            conn = get_db_connection(self.db_path)
+            rows = conn.execute(
+                "SELECT memory_id, embedding FROM agent_memory_embeddings WHERE user_id = ? ORDER BY memory_id",
+                (user_id,)
+            ).fetchall()
+            conn.close()
+        except Exception:
+            with self._index_lock:
+                _end_load(self._vector_loads, user_id, load)
+            raise
+        if rows:
+            vectors = [from_blob(r[1]) for r in rows]
+            dim = vectors[-1].shape[0]
+            keep = [i for i, v in enumerate(vectors) if v.shape[0] == dim]
+            entry = (np.array([rows[i][0] for i in keep], dtype=np.int64), np.vstack([vectors[i] for i in keep]))
+        else:
+            entry = (np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32))
+
+        with self._index_lock:
+            _end_load(self._vector_loads, user_id, load)
+            if load[0] != writes_before:
+                # A turn was stored while reading - serve these rows but load again next time
+                return entry
+            self._vector_index[user_id] = entry
+            while len(self._vector_index) > MAX_INDEXED_USERS:
+                self._vector_index.popitem(last=False)
+        return entry
+
+    def get_summary(self, user_id: str) -> str:
+        """Get the rolling summary of the user's older turns ("" if none yet)"""
+        with self._cache_lock:
+            cached = self._hot_cache.get(user_id)
+            if cached is not None and cached.summary is not None:
+                return cached.summary
+            writes_before = self._summary_writes
+        conn = get_db_connection(self.db_path)
+        row = conn.execute(
+            "SELECT summary FROM agent_memory_summaries WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        conn.close()
+        summary = row[0] if row else ""
+        with self._cache_lock:
+            cached = self._hot_cache.get(user_id)
+            # A summary saved while reading is newer than this row - leave it (or the next read) to fill the cache
+            if cached is not None and cached.summary is None and self._summary_writes == writes_before:
+                cached.summary = summary
+        return summary
+
+    def _needs_summary(self, conn, user_id: str) -> bool:
+        """Whether the unsummarized turns that would be folded (all but the latest) are too long"""
+        with self._summary_lock:
+            if user_id in self._summaries_in_flight:
+                return False
+        # Only turns outside the kept window count - long recent turns alone can't trigger
+        # a summary that would fold next to nothing
+        row = conn.execute(
+            """SELECT COALESCE(SUM(LENGTH(user_message) + LENGTH(ai_response)), 0) FROM (
+                SELECT user_message, ai_response FROM agent_memory
+                WHERE user_id = ? AND id > COALESCE(
+                    (SELECT summarized_through_id FROM agent_memory_summaries WHERE user_id = ?), 0)
+                ORDER BY id DESC LIMIT -1 OFFSET ?
+            )""",
+            (user_id, user_id, SUMMARY_KEEP_RECENT_TURNS)
+        ).fetchone()
+        return row[0] // 4 >= SUMMARY_TRIGGER_TOKENS
+
+    def _start_summary(self, user_id: str):
+        """Compact older turns on a background thread (one summary per user at a time)"""
+        with self._summary_lock:
+            if user_id in self._summaries_in_flight:
+                return
+            self._summaries_in_flight.add(user_id)
+        threading.Thread(target=self._summarize_older_turns, args=(user_id,), daemon=True).start()
+
+    def _summarize_older_turns(self, user_id: str):
+        """Fold all but the latest turns into the stored summary"""
+        try:
+            conn = get_db_connection(self.db_path)
+            row = conn.execute(
+                "SELECT summary, summarized_through_id FROM agent_memory_summaries WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            previous_summary, through_id = (row[0], row[1]) if row else ("", 0)
+            turns = conn.execute(
+                "SELECT id, user_message, ai_response FROM agent_memory WHERE user_id = ? AND id > ? ORDER BY id",
+                (user_id, through_id)
+            ).fetchall()
+            conn.close()
+            turns = turns[:-SUMMARY_KEEP_RECENT_TURNS]
+            if not turns:
+                return
+
+            turns_text = "\n".join(f"Student: {t[1]}\nAssistant: {t[2]}" for t in turns)
+            summary = None
+            if self.summarizer:
+                try:
+                    summary = self.summarizer(previous_summary, turns_text)
+                except Exception as e:
+                    print(f"Warning: Conversation summarizer failed, using compact fallback: {e}")
+            if not summary:
+                summary = self._compact_summary(previous_summary, turns)
+            summary = summary.strip()[:SUMMARY_MAX_TOKENS * 4]
+
+            conn = get_db_connection(self.db_path)
+            conn.execute(
+                """INSERT INTO agent_memory_summaries (user_id, summary, summarized_through_id, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    summarized_through_id = excluded.summarized_through_id,
+                    updated_at = excluded.updated_at""",
+                (user_id, summary, turns[-1][0], datetime.now().isoformat())
+            )
+            conn.commit()
+            conn.close()
+            with self._cache_lock:
+                self._summary_writes += 1
+                cached = self._hot_cache.get(user_id)
+                if cached is not None:
+                    cached.summary = summary
+            print(f"[Memory] Summarized {len(turns)} older turns for {user_id}")
+        except Exception as e:
+            print(f"Warning: Could not summarize conversation for {user_id}: {e}")
+        finally:
+            with self._summary_lock:
+                self._summaries_in_flight.discard(user_id)
+
+    @staticmethod
+    def _compact_summary(previous_summary: str, turns) -> str:
+        """Summary without an LLM - the topics the student asked about, newest kept when too long"""
+        asked = "; ".join(t[1].strip().replace("\n", " ")[:120] for t in turns)
+        summary = f"{previous_summary} Student also asked about: {asked}." if previous_summary \
+            else f"Student asked about: {asked}."
+        limit = SUMMARY_MAX_TOKENS * 4
+        return summary if len(summary) <= limit else "..." + summary[-(limit - 3):]
+
+    @staticmethod
+    def _turn_text(user_message: str, ai_response: str) -> str:
+        """Text embedded for a turn - the question plus the start of the answer"""
+        return f"{user_message}\n{(ai_response or '')[:500]}"
+
     def get_context(self, user_id: str, limit: int = 5) -> str:
         """Get context string"""
         memory = self.get_memory(user_id, limit)
@@ -65,4 +423,3 @@ class AgentMemory:
             parts.append(f"User: {m['user_message']}")
             parts.append(f"Assistant: {m['ai_response']}")
         return "\n".join(parts)
-
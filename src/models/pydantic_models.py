@@ -11,8 +11,14 @@ class DifficultyLevel(str, Enum):
     INTERMEDIATE = "Intermediate"
     ADVANCED = "Advanced"
 
+class ExplanationLength(str, Enum):
+    SHORT = "short"
+    MEDIUM = "medium"
+    LONG = "long"
+
 class TopicRequest(BaseModel):
     topic_name: str = Field(..., min_length=1)
+    length: Optional[ExplanationLength] = Field(default=None, description="Explanation length (default long)")
 
 class TopicResponse(BaseModel):
     topic: str
@@ -24,10 +30,19 @@ class TopicResponse(BaseModel):
 
 class QuizRequest(BaseModel):
     topic: str
-    difficulty: DifficultyLevel
+    difficulty: Optional[DifficultyLevel] = Field(default=None, description="Omit to use the student's recommended difficulty")
     num_questions: int = Field(..., ge=1, le=50)
     total_marks: int
     marks_per_question: int
+    user_id: Optional[str] = "default"
+
+class DifficultyRecommendationResponse(BaseModel):
+    student_id: str
+    topic: str
+    recommended_difficulty: DifficultyLevel
+    rating: float
+    answers_seen: int
+    expected_scores: Dict[str, float] = Field(default_factory=dict, description="Expected score (0-1) at each level")
 
 class QuestionResponse(BaseModel):
     id: int
@@ -92,6 +107,23 @@ class ClassificationResponse(BaseModel):
     scores: Dict[str, float]
     completeness_score: float = Field(default=0.0, ge=0.0, le=1.0, description="Completeness of classification (0-1)")
 
+class BatchSummaryRequest(BaseModel):
+    documents: List[str] = Field(..., min_length=1, description="Documents to summarize, in order")
+    max_length: int = Field(default=200, ge=20, description="Maximum summary length per document")
+
+class BatchSummaryResponse(BaseModel):
+    results: List[SummaryResponse]
+    count: int
+
+class BatchClassificationRequest(BaseModel):
+    documents: List[str] = Field(..., min_length=1, description="Documents to classify, in order")
+    categories: List[str] = Field(default=["academic", "technical", "general"], min_length=1)
+    keywords: Optional[Dict[str, List[str]]] = Field(default=None, description="Category -> keywords (replaces the defaults)")
+
+class BatchClassificationResponse(BaseModel):
+    results: List[ClassificationResponse]
+    count: int
+
 class YouTubeProcessRequest(BaseModel):
     video_url: str = Field(..., min_length=1, description="YouTube video URL or video ID")
 
@@ -3,7 +3,94 @@ Reasoning Service - AI Reasoning Features
 Simple implementation: Summarization, Classification, LLM Explanation
 """
 
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Dict, Optional
+from pathlib import Path
+import threading
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from src.config import REASONING_POOL_MIN_CHARS, REASONING_POOL_WORKERS
+from src.utils.text_rank import extractive_summary
+from src.utils.keyword_matcher import KeywordClassifier, get_keyword_classifier
+
+# Default keywords per category for classify()
+CLASSIFY_KEYWORDS = {
+    "academic": ["study", "learn", "education", "course"],
+    "technical": ["code", "programming", "algorithm", "function"],
+    "general": ["hello", "help", "question", "explain"]
+}
+# classify_topics() categories, checked in this order
+TOPIC_CATEGORY_KEYWORDS = {
+    "programming": ["python", "java", "code"],
+    "mathematics": ["math", "algebra"],
+    "science": ["physics", "chemistry"]
+}
+
+# Worker processes for large batches, started on first use. Always spawned (never
+# forked) - the server process has watcher and executor threads running. Spawned
+# workers re-import the main module as __mp_main__, so app.py skips its setup there.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REASONING_POOL_WORKERS, mp_context=get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Shut down a broken pool (its processes exit) so the next large batch starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _summarize_chunk(contents: List[str], max_length: int) -> List[str]:
+    return [extractive_summary(content, max_length) for content in contents]
+
+
+def _classify_chunk(contents: List[str], categories: List[str],
+                    keywords: Optional[Dict[str, List[str]]]) -> List[Dict]:
+    # One cache lookup (and dictionary hash) per chunk, not per document
+    classifier = get_keyword_classifier(keywords or CLASSIFY_KEYWORDS)
+    return [_classify_with(classifier, content, categories) for content in contents]
+
+
+def _classify_with(classifier: KeywordClassifier, content: str, categories: List[str]) -> Dict:
+    """Category with the most keyword matches, confidence and per-category scores"""
+    keyword_scores = classifier.scores(content)
+    scores = {cat: keyword_scores.get(cat, 0) for cat in categories}
+    
+    best = max(scores, key=scores.get)
+    confidence = min(scores[best] / max(len(content.split()), 1), 1.0)
+    return {"category": best, "confidence": round(confidence, 2), "scores": scores}
+
+
+def _run_batch(worker, contents: List[str], *args) -> List:
+    """worker(chunk, *args) over the contents, in order - across processes for large batches"""
+    if (REASONING_POOL_WORKERS < 2 or len(contents) < 2
+            or sum(len(c) for c in contents) < REASONING_POOL_MIN_CHARS):
+        return worker(contents, *args)
+    # A few chunks per worker evens out documents of different sizes
+    chunk_size = max(1, -(-len(contents) // (REASONING_POOL_WORKERS * 4)))
+    chunks = [contents[i:i + chunk_size] for i in range(0, len(contents), chunk_size)]
+    pool = None
+    try:
+        pool = _get_pool()
+        mapped = pool.map(worker, chunks, *([arg] * len(chunks) for arg in args))
+        return [result for chunk_results in mapped for result in chunk_results]
+    except Exception as e:
+        print(f"Warning: Reasoning worker pool failed, running batch in-process: {e}")
+        if pool is not None:
+            _discard_pool(pool)
+        return worker(contents, *args)
 
 class ReasoningService:
     """Simple reasoning service"""
@@ -12,46 +99,30 @@ class ReasoningService:
         self.db_path = db_path
     
     def summarize(self, content: str, max_length: int = 200) -> str:
-        """Summarize content"""
-        sentences = [s.strip() for s in content.split('.') if len(s.strip()) > 20]
-        if not sentences:
-            return content[:max_length] + "..."
-        summary = '. '.join(sentences[:3])
-        return summary[:max_length] + "..." if len(summary) > max_length else summary
+        """Summarize content - most central sentences (TextRank) within max_length"""
+        return extractive_summary(content, max_length)
     
-    def classify(self, content: str, categories: List[str]) -> Dict:
-        """Classify content"""
-        content_lower = content.lower()
-        scores = {}
-        keywords = {
-            "academic": ["study", "learn", "education", "course"],
-            "technical": ["code", "programming", "algorithm", "function"],
-            "general": ["hello", "help", "question", "explain"]
-        }
-        
-        for cat in categories:
-            score = sum(1 for kw in keywords.get(cat, []) if kw in content_lower)
-            scores[cat] = score
-        
-        best = max(scores, key=scores.get)
-        confidence = min(scores[best] / max(len(content.split()), 1), 1.0)
-        return {"category": best, "confidence": round(confidence, 2), "scores": scores}
+    def summarize_many(self, contents: List[str], max_length: int = 200) -> List[str]:
+        """Summaries for several documents, in order"""
+        return _run_batch(_summarize_chunk, list(contents), max_length)
+    
+    def classify_many(self, contents: List[str], categories: List[str],
+                      keywords: Optional[Dict[str, List[str]]] = None) -> List[Dict]:
+        """Classifications for several documents, in order"""
+        return _run_batch(_classify_chunk, list(contents), list(categories), keywords)
+    
+    def classify(self, content: str, categories: List[str],
+                 keywords: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """
+        Classify content by how many of each category's keywords it contains
+        keywords: category -> keyword list to use instead of CLASSIFY_KEYWORDS
+        """
+        return _classify_with(get_keyword_classifier(keywords or CLASSIFY_KEYWORDS), content, categories)
     
     def classify_topics(self, topics: List[str]) -> List[Dict]:
         """Classify topics"""
-        result = []
-        for topic in topics:
-            topic_lower = topic.lower()
-            if any(kw in topic_lower for kw in ["python", "java", "code"]):
-                cat = "programming"
-            elif any(kw in topic_lower for kw in ["math", "algebra"]):
-                cat = "mathematics"
-            elif any(kw in topic_lower for kw in ["physics", "chemistry"]):
-                cat = "science"
-            else:
-                cat = "general"
-            result.append({"topic": topic, "category": cat})
-        return result
+        classifier = get_keyword_classifier(TOPIC_CATEGORY_KEYWORDS)
+        return [{"topic": topic, "category": classifier.first_category(topic, "general")} for topic in topics]
     
     def explain_with_llm(self, topic: str) -> str:
         """Generate explanation - fallback when LLM is not available"""
@@ -0,0 +1,107 @@
+"""
+Adaptive Difficulty Engine - Per-student, per-topic ability estimates (Elo)
+Each evaluated quiz updates the student's rating in O(1) per question and
+the recommended difficulty is read from a single row, without scanning
+attempt history
+"""
+
+import re
+from typing import Dict, List, Optional
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.database.student_db import get_student_ability, save_student_ability
+
+INITIAL_RATING = 1000.0
+
+# Elo rating of a question at each difficulty level
+LEVEL_RATINGS = {
+    "Beginner": 800.0,
+    "Intermediate": 1000.0,
+    "Advanced": 1200.0,
+}
+
+# Recommend the level where the student is expected to score closest to this
+TARGET_SUCCESS_RATE = 0.7
+
+# Larger steps while the estimate is still uncertain
+K_FACTOR_NEW = 40.0
+K_FACTOR_SETTLED = 16.0
+SETTLED_AFTER_ANSWERS = 30
+
+
+def normalize_topic(topic: str) -> str:
+    """Ability key for a topic - lower-case with collapsed whitespace"""
+    return re.sub(r"\s+", " ", (topic or "").strip().lower())
+
+
+def expected_score(student_rating: float, question_rating: float) -> float:
+    """Probability the student answers a question of the given rating correctly"""
+    return 1.0 / (1.0 + 10 ** ((question_rating - student_rating) / 400.0))
+
+
+def level_rating(difficulty) -> float:
+    """Question rating for a difficulty level (DifficultyLevel or string)"""
+    name = str(getattr(difficulty, "value", difficulty) or "").strip().capitalize()
+    return LEVEL_RATINGS.get(name, LEVEL_RATINGS["Intermediate"])
+
+
+def update_rating(rating: float, answers_seen: int, difficulty, outcomes: List[float]) -> float:
+    """Apply one Elo step per answer; outcomes are fractions of marks obtained (0-1)"""
+    question_rating = level_rating(difficulty)
+    for outcome in outcomes:
+        k = K_FACTOR_SETTLED if answers_seen >= SETTLED_AFTER_ANSWERS else K_FACTOR_NEW
+        rating += k * (min(max(outcome, 0.0), 1.0) - expected_score(rating, question_rating))
+        answers_seen += 1
+    return rating
+
+
+def recommend_level(rating: float) -> str:
+    """Difficulty level whose expected score is closest to the target success rate"""
+    return min(
+        LEVEL_RATINGS,
+        key=lambda level: abs(expected_score(rating, LEVEL_RATINGS[level]) - TARGET_SUCCESS_RATE)
+    )
+
+
+class AdaptiveDifficultyEngine:
+    """Tracks student ability per topic in the student database"""
+
+    def __init__(self, student_db_path: str):
+        self.student_db_path = student_db_path
+
+    def record_quiz(self, student_id: str, topic: str, difficulty, feedback: List[Dict]) -> Optional[Dict]:
+        """Update the student's ability from evaluate_quiz feedback items"""
+        topic_key = normalize_topic(topic)
+        if not topic_key or not feedback:
+            return None
+        outcomes = [
+            (f.get("marks_awarded", 0) or 0) / f["max_marks"]
+            for f in feedback if f.get("max_marks")
+        ]
+        if not outcomes:
+            return None
+        current = get_student_ability(self.student_db_path, student_id, topic_key)
+        rating = current["rating"] if current else INITIAL_RATING
+        answers_seen = current["answers_seen"] if current else 0
+        rating = update_rating(rating, answers_seen, difficulty, outcomes)
+        save_student_ability(self.student_db_path, student_id, topic_key, rating, answers_seen + len(outcomes))
+        return {"rating": round(rating, 1), "answers_seen": answers_seen + len(outcomes)}
+
+    def recommend(self, student_id: str, topic: str) -> Dict:
+        """Recommended difficulty level for a student on a topic"""
+        topic_key = normalize_topic(topic)
+        current = get_student_ability(self.student_db_path, student_id, topic_key)
+        rating = current["rating"] if current else INITIAL_RATING
+        return {
+            "student_id": student_id,
+            "topic": topic_key,
+            "recommended_difficulty": recommend_level(rating),
+            "rating": round(rating, 1),
+            "answers_seen": current["answers_seen"] if current else 0,
+            "expected_scores": {
+                level: round(expected_score(rating, question_rating), 2)
+                for level, question_rating in LEVEL_RATINGS.items()
+            }
+        }
@@ -1,35 +1,358 @@
 """
 Data Service - Handles dataset operations (search, filter, categorize)
-Supports multiple data sources: JSON, CSV, Database
+Supports multiple data sources: JSON, JSON Lines, CSV, Database
+JSON/JSONL/CSV files are streamed item by item into the index
 """
 
 import json
 import csv
+import heapq
 import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from datetime import datetime
 
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.config import DATASET_WATCH_INTERVAL_SECONDS, DATASET_SPILL_BYTES, DATASET_LOAD_PROGRESS_EVERY
+from src.database.topics_db import (
+    import_topics, search_topics, filter_topics, categorize_topics,
+    get_topic_by_id, get_topics_by_ids, get_topics, get_topic_stats
+)
+
+
+# Fields every topic record has a slot for, in output order; anything else goes to `extra`
+RECORD_FIELDS = ("id", "topic", "description", "category", "difficulty", "tags", "key_concepts")
+# Separates items in the lower-cased text columns; never part of a query
+COLUMN_SEPARATOR = "\x00"
+
+
+class Vocabulary:
+    """Shared term table - tags and key concepts are stored as integer ids into it"""
+    
+    def __init__(self):
+        self.terms: List[str] = []
+        self._ids: Dict[str, int] = {}
+    
+    def add(self, term: str) -> int:
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._ids[term] = term_id
+            self.terms.append(sys.intern(term))
+        return term_id
+    
+    def __len__(self):
+        return len(self.terms)
+
+
+class TopicRecord:
+    """One dataset item with interned labels and tags/key concepts as vocabulary ids"""
+    
+    __slots__ = ("id", "topic", "description", "category", "difficulty", "tags", "key_concepts", "extra")
+    
+    def __init__(self, item: Dict, vocab: Vocabulary):
+        # None marks a field the item didn't have
+        self.id = item.get("id")
+        self.topic = item.get("topic")
+        self.description = item.get("description")
+        self.category = _intern(item.get("category"))
+        self.difficulty = _intern(item.get("difficulty"))
+        tags = item.get("tags")
+        concepts = item.get("key_concepts")
+        self.tags = tuple(vocab.add(t) for t in tags) if tags is not None else None
+        self.key_concepts = tuple(vocab.add(c) for c in concepts) if concepts is not None else None
+        extra = {key: value for key, value in item.items() if key not in RECORD_FIELDS}
+        self.extra = extra or None
+    
+    def to_dict(self, vocab: Vocabulary) -> Dict:
+        """The item as a fresh dict (callers may modify it)"""
+        item = {}
+        for field in ("id", "topic", "description", "category", "difficulty"):
+            value = getattr(self, field)
+            if value is not None:
+                item[field] = value
+        if self.tags is not None:
+            item["tags"] = [vocab.terms[t] for t in self.tags]
+        if self.key_concepts is not None:
+            item["key_concepts"] = [vocab.terms[c] for c in self.key_concepts]
+        if self.extra:
+            item.update(self.extra)
+        return item
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class TextColumn:
+    """Lower-cased text of one field for every item, joined into a single string"""
+    
+    def __init__(self, values: List[str]):
+        self.text = COLUMN_SEPARATOR.join(values)
+        # starts[p] = offset of item p's text
+        self.starts = array("Q")
+        offset = 0
+        for value in values:
+            self.starts.append(offset)
+            offset += len(value) + 1
+    
+    def positions_containing(self, text_lower: str) -> Iterator[int]:
+        """Positions of items whose text contains the (lower-cased) text, ascending"""
+        text, starts = self.text, self.starts
+        found = text.find(text_lower)
+        while found != -1:
+            position = bisect_right(starts, found) - 1
+            yield position
+            if position + 1 >= len(starts):
+                break
+            # Skip the rest of this item
+            found = text.find(text_lower, starts[position + 1])
+
+
+class DatasetIndex:
+    """Dataset items as compact records plus lookup structures built once at load time"""
+    
+    def __init__(self, data: Iterable[Dict], version: int = 1):
+        self.version = version
+        self.loaded_at = time.time()
+        self.vocab = Vocabulary()
+        self.records: List[TopicRecord] = []
+        # Lower-cased category / difficulty / tag / key concept -> positions of matching items (ascending)
+        self.by_category: Dict[str, array] = {}
+        self.by_difficulty: Dict[str, array] = {}
+        self.by_tag: Dict[str, array] = {}
+        self.by_concept: Dict[str, array] = {}
+        # Original-case category -> positions, in first-seen order (for categorize)
+        self.category_groups: Dict[str, array] = {}
+        # Item "id" -> position of the first item with that id
+        self.by_id: Dict[Any, int] = {}
+        category_counts: Dict[str, int] = {}
+        difficulty_counts: Dict[str, int] = {}
+        topics_lower: List[str] = []
+        descriptions_lower: List[str] = []
+        terms_lower: List[str] = []
+        
+        for position, item in enumerate(data):
+            record = TopicRecord(item, self.vocab)
+            self.records.append(record)
+            if record.id is not None:
+                try:
+                    self.by_id.setdefault(record.id, position)
+                except TypeError:
+                    pass  # unhashable id - can't be looked up
+            # Lower-case each new vocabulary term once
+            terms_lower.extend(t.lower() for t in self.vocab.terms[len(terms_lower):])
+            topics_lower.append((record.topic or "").lower())
+            descriptions_lower.append((record.description or "").lower())
+            _add_position(self.by_category, (record.category or "").lower(), position)
+            _add_position(self.by_difficulty, (record.difficulty or "").lower(), position)
+            for tag in set(terms_lower[t] for t in record.tags or ()):
+                _add_position(self.by_tag, tag, position)
+            for concept in set(terms_lower[c] for c in record.key_concepts or ()):
+                _add_position(self.by_concept, concept, position)
+            stats_category = record.category if record.category is not None else "uncategorized"
+            stats_difficulty = record.difficulty if record.difficulty is not None else "unknown"
+            _add_position(self.category_groups, stats_category, position)
+            category_counts[stats_category] = category_counts.get(stats_category, 0) + 1
+            difficulty_counts[stats_difficulty] = difficulty_counts.get(stats_difficulty, 0) + 1
+        
+        self.topic_column = TextColumn(topics_lower)
+        self.description_column = TextColumn(descriptions_lower)
+        self.stats = {
+            "total_items": len(self.records),
+            "categories": category_counts,
+            "difficulties": difficulty_counts
+        }
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def item(self, position: int) -> Dict:
+        """Item at a position as a dict"""
+        return self.records[position].to_dict(self.vocab)
+    
+    def items(self, positions: Iterable[int]) -> List[Dict]:
+        return [self.records[p].to_dict(self.vocab) for p in positions]
+    
+    def search_positions(self, query: str, limit: int) -> List[int]:
+        """Positions of items whose topic, description, a tag or a key concept contains the query"""
+        query_lower = query.lower().replace(COLUMN_SEPARATOR, "")
+        sources = [
+            self.topic_column.positions_containing(query_lower),
+            self.description_column.positions_containing(query_lower),
+        ]
+        # Tags / concepts: check each distinct term once, then take its postings
+        for terms in (self.by_tag, self.by_concept):
+            sources.extend(postings for term, postings in terms.items() if query_lower in term)
+        # Every source is ascending, so merging lazily stops after `limit` distinct items
+        positions = []
+        for position in heapq.merge(*sources):
+            if positions and positions[-1] == position:
+                continue
+            if len(positions) >= limit:
+                break
+            positions.append(position)
+        return positions
+    
+    def filter_positions(self, filters: Dict[str, Any]) -> List[int]:
+        """Positions of items matching every given criterion, by set intersection"""
+        candidates = None
+        if "category" in filters:
+            candidates = set(self.by_category.get(filters["category"].lower(), ()))
+        if "difficulty" in filters:
+            matches = set(self.by_difficulty.get(filters["difficulty"].lower(), ()))
+            candidates = matches if candidates is None else candidates & matches
+        if "tags" in filters:
+            # Any of the requested tags
+            matches = set()
+            for tag in filters["tags"]:
+                matches.update(self.by_tag.get(tag.lower(), ()))
+            candidates = matches if candidates is None else candidates & matches
+        if candidates is None:
+            return list(range(len(self.records)))
+        return sorted(candidates)
+    
+    def categorize(self, limit: int) -> Dict[str, List[Dict]]:
+        """Items grouped by category (at most `limit` per category)"""
+        return {
+            category: self.items(positions[:limit])
+            for category, positions in self.category_groups.items()
+        }
+
+
+def _add_position(index: Dict[str, array], key: str, position: int):
+    postings = index.get(key)
+    if postings is None:
+        postings = index[key] = array("I")
+    postings.append(position)
+
+
+JSON_CHUNK_SIZE = 1 << 20  # characters read per step when streaming a JSON array
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_DELIMITERS = (" ", "\t", "\n", "\r", ",", "]")
+
+
+def iter_json_array(f, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Any]:
+    """Items of a top-level JSON array, decoded one at a time from chunks of the file"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while True:
+        chunk = f.read(chunk_size)
+        buffer = buffer.lstrip(" \t\n\r") + chunk
+        if not chunk or buffer.strip(" \t\n\r"):
+            break
+    eof = not chunk
+    pos = _JSON_WHITESPACE.match(buffer).end()
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("Dataset JSON must be an array of topics")
+    pos += 1
+    expect_item, seen_item = True, False
+    while True:
+        pos = _JSON_WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if not expect_item:
+                if char == "]":
+                    return
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in dataset JSON array, got {char!r}")
+                pos += 1
+                expect_item = True
+                continue
+            if char == "]" and not seen_item:
+                return
+            if char in "],":
+                raise ValueError(f"Unexpected {char!r} in dataset JSON array")
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise
+                end = None
+            # A number may continue in the next chunk unless a delimiter follows it
+            if end is not None and (eof or char in '{["' or buffer[end:end + 1] in _JSON_DELIMITERS):
+                yield item
+                pos = end
+                expect_item, seen_item = False, True
+                continue
+        if eof:
+            raise ValueError("Unterminated dataset JSON array")
+        # Need more input: drop what has been consumed and read the next chunk
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def iter_json_lines(f) -> Iterator[Any]:
+    """Items of a JSON Lines file (blank lines skipped)"""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {e}")
+
+
+def iter_csv_rows(f) -> Iterator[Dict]:
+    """Items of a CSV file - tags and key_concepts are semicolon-separated"""
+    reader = csv.DictReader(f)
+    for row in reader:
+        # Parse key_concepts and tags (semicolon-separated)
+        row['key_concepts'] = row.get('key_concepts', '').split(';') if row.get('key_concepts') else []
+        row['tags'] = row.get('tags', '').split(';') if row.get('tags') else []
+        # Convert id to int
+        if 'id' in row:
+            try:
+                row['id'] = int(row['id'])
+            except:
+                pass
+        yield row
+
+
+STREAM_READERS = {"json": iter_json_array, "jsonl": iter_json_lines, "csv": iter_csv_rows}
+
+
 class DataService:
     """Service for dataset operations - supports JSON, CSV, and Database"""
     
-    def __init__(self, dataset_path: str = None, source_type: str = "auto"):
+    def __init__(self, dataset_path: str = None, source_type: str = "auto",
+                 watch_interval: float = DATASET_WATCH_INTERVAL_SECONDS,
+                 spill_bytes: int = DATASET_SPILL_BYTES):
         """
         Initialize data service
         Args:
-            dataset_path: Path to dataset file (JSON or CSV)
-            source_type: "json", "csv", "database", or "auto" (auto-detect)
+            dataset_path: Path to dataset file (JSON, JSONL, CSV or SQLite .db)
+            source_type: "json", "jsonl", "csv", "database", or "auto" (auto-detect)
+            watch_interval: Seconds between checks for a changed dataset file (0 = no watcher)
+            spill_bytes: Files larger than this are imported into SQLite and served from there (0 = never)
         """
         base_dir = Path(__file__).parent.parent.parent
         
         if dataset_path is None:
-            # Try JSON first, then CSV
+            # Try the database first, then JSON, JSON Lines, CSV
+            db_path = base_dir / "data" / "topics_dataset.db"
             json_path = base_dir / "data" / "topics_dataset.json"
+            jsonl_path = base_dir / "data" / "topics_dataset.jsonl"
             csv_path = base_dir / "data" / "topics_dataset.csv"
             
-            if json_path.exists():
+            if db_path.exists():
+                dataset_path = db_path
+                source_type = "database"
+            elif json_path.exists():
                 dataset_path = json_path
                 source_type = "json"
+            elif jsonl_path.exists():
+                dataset_path = jsonl_path
+                source_type = "jsonl"
             elif csv_path.exists():
                 dataset_path = csv_path
                 source_type = "csv"
@@ -38,151 +361,249 @@ class DataService:
         
         self.dataset_path = Path(dataset_path)
         self.source_type = source_type if source_type != "auto" else self._detect_source_type()
-        self.data = self._load_dataset()
+        self.spilled_from = None
+        self._spilled_type = None
+        self._signature = self._file_signature()
+        self._load_progress = None
+        if spill_bytes and self._signature and self._signature[1] > spill_bytes and self.source_type in STREAM_READERS:
+            self._spill_to_database()
+        self._index = self._load_dataset()
+        self._reload_lock = threading.Lock()
+        self._stop_watching = threading.Event()
+        self._watcher = None
+        if watch_interval and (self.source_type != "database" or self.spilled_from):
+            self.start_watching(watch_interval)
+    
+    @property
+    def data(self) -> List[Dict]:
+        """All dataset items as dicts (built on each access from the record store)"""
+        if self.source_type == "database":
+            return get_topics(str(self.dataset_path))
+        index = self._index
+        return index.items(range(len(index)))
+    
+    @property
+    def version(self) -> int:
+        """Dataset version - bumped on every reload (no database query)"""
+        return self._index.version
     
     def _detect_source_type(self) -> str:
         """Auto-detect source type from file extension"""
         ext = self.dataset_path.suffix.lower()
         if ext == ".json":
             return "json"
+        elif ext in (".jsonl", ".ndjson"):
+            return "jsonl"
         elif ext == ".csv":
             return "csv"
+        elif ext in (".db", ".sqlite", ".sqlite3"):
+            return "database"
         else:
             return "json"  # Default
     
-    def _load_dataset(self) -> List[Dict]:
-        """Load dataset from JSON, CSV, or Database"""
+    def _load_dataset(self) -> DatasetIndex:
+        """Load dataset from JSON, JSONL, CSV, or Database"""
         if not self.dataset_path.exists():
             print(f"Dataset file not found: {self.dataset_path}")
-            return []
+            return DatasetIndex([])
         
         try:
-            if self.source_type == "json":
-                return self._load_json()
-            elif self.source_type == "csv":
-                return self._load_csv()
-            else:
-                return []
+            return DatasetIndex(self._read_dataset())
         except Exception as e:
             print(f"Error loading dataset: {e}")
-            return []
-    
-    def _load_json(self) -> List[Dict]:
-        """Load dataset from JSON file"""
-        with open(self.dataset_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def _load_csv(self) -> List[Dict]:
-        """Load dataset from CSV file"""
-        data = []
-        with open(self.dataset_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Parse key_concepts and tags (semicolon-separated)
-                row['key_concepts'] = row.get('key_concepts', '').split(';') if row.get('key_concepts') else []
-                row['tags'] = row.get('tags', '').split(';') if row.get('tags') else []
-                # Convert id to int
-                if 'id' in row:
-                    try:
-                        row['id'] = int(row['id'])
-                    except:
-                        pass
-                data.append(row)
-        return data
+            return DatasetIndex([])
+    
+    def _read_dataset(self, path: Path = None, source_type: str = None) -> Iterator[Dict]:
+        """Stream items from the dataset file (or the given one); raises on a missing or malformed file"""
+        path = path or self.dataset_path
+        reader = STREAM_READERS.get(source_type or self.source_type)
+        if reader is None:
+            # Database source is queried in place - nothing held in memory
+            return
+        total_bytes = path.stat().st_size
+        count = 0
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for count, item in enumerate(reader(f), 1):
+                yield item
+                if count % DATASET_LOAD_PROGRESS_EVERY == 0:
+                    self._report_progress(path, count, f.buffer.tell(), total_bytes)
+        if count % DATASET_LOAD_PROGRESS_EVERY or not count:
+            self._report_progress(path, count, total_bytes, total_bytes)
+    
+    def _report_progress(self, path: Path, items: int, bytes_read: int, total_bytes: int):
+        self._load_progress = {"items": items, "bytes_read": bytes_read, "total_bytes": total_bytes}
+        percent = 100 * bytes_read // total_bytes if total_bytes else 100
+        print(f"[DataService] Loading {path.name}: {items:,} items ({percent}%)")
+    
+    def _spill_to_database(self):
+        """Stream a dataset too large to index in memory into SQLite next to it and serve from there"""
+        # A name of its own, so auto-detection never serves it in place of the source file
+        db_path = self.dataset_path.with_suffix(".spill.db")
+        # Re-import only when the source file is newer than the database built from it
+        if not db_path.exists() or db_path.stat().st_mtime_ns < self._signature[0]:
+            try:
+                self._import_spill(self.dataset_path, self.source_type, db_path)
+            except Exception as e:
+                print(f"Error importing dataset into SQLite, indexing in memory instead: {e}")
+                return
+        self.spilled_from = str(self.dataset_path)
+        self._spilled_type = self.source_type
+        self.dataset_path = db_path
+        self.source_type = "database"
+        # self._signature stays the source file's - the watcher re-imports it when it changes
+    
+    def _import_spill(self, source_path: Path, source_type: str, db_path: Path):
+        """Import a JSON/JSONL/CSV file into a spill database, replacing it atomically"""
+        size_mb = source_path.stat().st_size / 1e6
+        print(f"[DataService] {source_path.name} is {size_mb:.0f} MB - importing into {db_path.name}")
+        tmp_path = db_path.with_suffix(".tmp")
+        import_topics(str(tmp_path), self._read_dataset(source_path, source_type))
+        os.replace(tmp_path, db_path)
+    
+    def _file_signature(self):
+        """(mtime, size) of the dataset file (the source file when spilled), or None if it doesn't exist"""
+        try:
+            stat = Path(self.spilled_from or self.dataset_path).stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the dataset if the file changed (or always with force)
+        The new index is built off to the side and swapped in with a single
+        assignment, so requests keep using the old snapshot until it is ready.
+        A file that fails to load leaves the current index in place.
+        Returns True if a new index was swapped in.
+        """
+        with self._reload_lock:
+            signature = self._file_signature()
+            if signature is None or (signature == self._signature and not force):
+                return False
+            self._signature = signature
+            if self.spilled_from:
+                return self._reload_spill()
+            try:
+                index = DatasetIndex(self._read_dataset(), version=self._index.version + 1)
+            except Exception as e:
+                # Often a file caught mid-write - the finished write changes the signature again
+                print(f"[DataService] Reload of {self.dataset_path} failed, keeping version {self._index.version}: {e}")
+                return False
+            self._index = index
+            print(f"[DataService] Reloaded {len(index)} items from {self.dataset_path} (version {index.version})")
+            return True
+    
+    def _reload_spill(self) -> bool:
+        """Re-import a changed source file into its spill database (called under the reload lock)"""
+        version = self._index.version
+        try:
+            self._import_spill(Path(self.spilled_from), self._spilled_type, self.dataset_path)
+        except Exception as e:
+            print(f"[DataService] Re-import of {self.spilled_from} failed, keeping version {version}: {e}")
+            return False
+        # Database sources keep no items in memory - the empty index only carries the version
+        self._index = DatasetIndex([], version=version + 1)
+        print(f"[DataService] Re-imported {self.spilled_from} into {self.dataset_path.name} (version {version + 1})")
+        return True
+    
+    def start_watching(self, interval: float = DATASET_WATCH_INTERVAL_SECONDS):
+        """Poll the dataset file on a background thread and reload it when it changes"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="dataset-watcher", daemon=True
+        )
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the background watcher"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+    
+    def _watch(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[DataService] Dataset watcher error: {e}")
     
     def search(self, query: str, limit: int = 20) -> List[Dict]:
         """Search dataset by topic name, description, or tags"""
-        query_lower = query.lower()
-        results = []
-        
-        for item in self.data:
-            # Search in topic name
-            if query_lower in item.get("topic", "").lower():
-                results.append(item)
-                continue
-            
-            # Search in description
-            if query_lower in item.get("description", "").lower():
-                results.append(item)
-                continue
-            
-            # Search in tags
-            tags = item.get("tags", [])
-            if any(query_lower in tag.lower() for tag in tags):
-                results.append(item)
-                continue
-            
-            # Search in key concepts
-            concepts = item.get("key_concepts", [])
-            if any(query_lower in concept.lower() for concept in concepts):
-                results.append(item)
-        
-        return results[:limit]
+        if self.source_type == "database":
+            return search_topics(str(self.dataset_path), query, limit)
+        index = self._index
+        return index.items(index.search_positions(query, limit))
     
     def filter(self, filters: Dict[str, Any], limit: int = 20) -> List[Dict]:
         """Filter dataset by category, difficulty, or other attributes"""
-        results = []
-        
-        for item in self.data:
-            match = True
-            
-            # Filter by category
-            if "category" in filters:
-                if item.get("category", "").lower() != filters["category"].lower():
-                    match = False
-            
-            # Filter by difficulty
-            if "difficulty" in filters:
-                if item.get("difficulty", "").lower() != filters["difficulty"].lower():
-                    match = False
-            
-            # Filter by tags
-            if "tags" in filters:
-                item_tags = [t.lower() for t in item.get("tags", [])]
-                filter_tags = [t.lower() for t in filters["tags"]]
-                if not any(tag in item_tags for tag in filter_tags):
-                    match = False
-            
-            if match:
-                results.append(item)
-        
-        return results[:limit]
+        if self.source_type == "database":
+            return filter_topics(str(self.dataset_path), filters, limit)
+        index = self._index
+        positions = index.filter_positions(filters)
+        return index.items(positions[:limit])
     
     def categorize(self, limit: int = 20) -> Dict[str, List[Dict]]:
         """Categorize dataset items by category"""
-        categories = {}
-        
-        for item in self.data:
-            category = item.get("category", "uncategorized")
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(item)
-        
-        # Limit items per category
-        for category in categories:
-            categories[category] = categories[category][:limit]
-        
-        return categories
+        if self.source_type == "database":
+            return categorize_topics(str(self.dataset_path), limit)
+        return self._index.categorize(limit)
     
     def get_by_id(self, item_id: int) -> Dict:
         """Get item by ID"""
-        for item in self.data:
-            if item.get("id") == item_id:
-                return item
-        return {}
+        if self.source_type == "database":
+            return get_topic_by_id(str(self.dataset_path), item_id)
+        index = self._index
+        position = index.by_id.get(item_id)
+        return index.item(position) if position is not None else {}
+    
+    def get_many(self, item_ids: List[int]) -> List[Dict]:
+        """Items for several IDs, in the order given ({} for an unknown ID)"""
+        if self.source_type == "database":
+            return get_topics_by_ids(str(self.dataset_path), item_ids)
+        index = self._index
+        return [
+            index.item(position) if position is not None else {}
+            for position in map(index.by_id.get, item_ids)
+        ]
     
     def get_all(self, limit: int = None) -> List[Dict]:
         """Get all items"""
-        if limit:
-            return self.data[:limit]
-        return self.data
+        if self.source_type == "database":
+            return get_topics(str(self.dataset_path), limit)
+        index = self._index
+        return index.items(range(min(limit, len(index)) if limit else len(index)))
+    
+    def get_stats(self) -> Dict:
+        """Item counts by category and difficulty (computed at load time)"""
+        if self.source_type == "database":
+            return get_topic_stats(str(self.dataset_path))
+        stats = self._index.stats
+        return {
+            "total_items": stats["total_items"],
+            "categories": dict(stats["categories"]),
+            "difficulties": dict(stats["difficulties"])
+        }
+    
+    def export_to_database(self, db_path: str) -> int:
+        """Import the loaded JSON/CSV items into a SQLite topics database"""
+        index = self._index
+        return import_topics(db_path, (index.item(p) for p in range(len(index))))
     
     def get_source_info(self) -> Dict:
         """Get information about the data source"""
+        index = self._index
         return {
             "source_type": self.source_type,
             "source_path": str(self.dataset_path),
-            "total_items": len(self.data),
-            "supported_formats": ["JSON", "CSV", "Database"]
+            "total_items": self.get_stats()["total_items"],
+            "version": index.version,
+            "loaded_at": datetime.fromtimestamp(index.loaded_at).isoformat(),
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+            "load_progress": self._load_progress,
+            "spilled_from": self.spilled_from,
+            "supported_formats": ["JSON", "JSONL", "CSV", "Database"]
         }
 
@@ -0,0 +1,120 @@
+"""
+Text Embeddings - Shared sentence embedder for questions, memory and search
+Uses the local HuggingFace sentence-transformers model when installed,
+otherwise a hashed bag-of-words vector so features keep working offline
+"""
+
+import re
+import threading
+import zlib
+from typing import List
+
+import numpy as np
+
+try:
+    from langchain_huggingface import HuggingFaceEmbeddings
+    HF_EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    HF_EMBEDDINGS_AVAILABLE = False
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+HASHING_DIM = 512
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class TextEmbedder:
+    """Embeds batches of texts into L2-normalized float32 vectors"""
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self._model = None
+        self._model_failed = not HF_EMBEDDINGS_AVAILABLE
+        self._dim = None
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> str:
+        """Name of the backend that produced the vectors ("hf" or "hashing")"""
+        self._load_model()
+        return "hf" if self._model is not None else "hashing"
+
+    def _load_model(self):
+        """Load the sentence-transformers model once, on first use"""
+        if self._model is not None or self._model_failed:
+            return
+        with self._lock:
+            if self._model is not None or self._model_failed:
+                return
+            try:
+                self._model = HuggingFaceEmbeddings(model_name=self.model_name)
+                print(f"✓ Text embedder using {self.model_name}")
+            except Exception as e:
+                print(f"Warning: Could not load embedding model, using hashing embeddings: {e}")
+                self._model_failed = True
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in one batch - returns an (N, dim) float32 matrix with unit rows"""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        self._load_model()
+        if self._model is not None:
+            try:
+                vectors = np.asarray(self._model.embed_documents(list(texts)), dtype=np.float32)
+                return _normalize(vectors)
+            except Exception as e:
+                print(f"Warning: Embedding model failed, using hashing embeddings: {e}")
+        return _normalize(_hashing_vectors(texts))
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text - returns a (dim,) vector"""
+        return self.embed([text])[0]
+
+    @property
+    def dim(self) -> int:
+        """Dimension of the vectors returned by embed()"""
+        if self._dim is None:
+            self._load_model()
+            if self._model is not None:
+                self._dim = len(self._model.embed_query("dimension probe"))
+            else:
+                self._dim = HASHING_DIM
+        return self._dim
+
+
+def _hashing_vectors(texts: List[str]) -> np.ndarray:
+    """Hashed unigram + bigram counts (crc32 keeps buckets stable across processes)"""
+    matrix = np.zeros((len(texts), HASHING_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = tokens + [a + " " + b for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            matrix[row, zlib.crc32(feature.encode("utf-8")) % HASHING_DIM] += 1.0
+    return matrix
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+def to_blob(vector: np.ndarray) -> bytes:
+    """Serialize a vector for a SQLite BLOB column"""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    """Deserialize a vector stored with to_blob()"""
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+# Global instance
+_text_embedder = None
+
+def get_text_embedder() -> TextEmbedder:
+    """Get or create the shared text embedder"""
+    global _text_embedder
+    if _text_embedder is None:
+        _text_embedder = TextEmbedder()
+    return _text_embedder
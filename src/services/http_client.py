@@ -0,0 +1,90 @@
+"""
+HTTP Client - Shared pooled session for outbound requests
+One keep-alive connection pool for the whole process, with a retry/backoff
+policy for transient errors and a cap on concurrent requests per host
+"""
+
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.config import HTTP_POOL_MAXSIZE, HTTP_MAX_CONCURRENCY_PER_HOST, HTTP_RETRIES, HTTP_TIMEOUT_SECONDS
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+
+if REQUESTS_AVAILABLE:
+    class PooledSession(requests.Session):
+        """requests.Session that limits concurrent requests per host and applies a default timeout"""
+
+        def __init__(self, max_per_host: int = HTTP_MAX_CONCURRENCY_PER_HOST):
+            super().__init__()
+            self.max_per_host = max_per_host
+            self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+            self._host_lock = threading.Lock()
+
+        def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+            host = urlsplit(url).netloc.lower()
+            with self._host_lock:
+                limit = self._host_limits.get(host)
+                if limit is None:
+                    limit = self._host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+                return limit
+
+        def request(self, method, url, *args, **kwargs):
+            kwargs.setdefault("timeout", HTTP_TIMEOUT_SECONDS)
+            with self._host_limit(url):
+                return super().request(method, url, *args, **kwargs)
+
+
+def _build_session():
+    """Session with a bounded keep-alive pool and retries on transient failures"""
+    session = PooledSession()
+    retry = Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+# Global instance
+_http_session = None
+_session_lock = threading.Lock()
+
+def get_http_session():
+    """Get or create the shared HTTP session (None if requests is not installed)"""
+    global _http_session
+    if not REQUESTS_AVAILABLE:
+        return None
+    if _http_session is None:
+        with _session_lock:
+            if _http_session is None:
+                _http_session = _build_session()
+    return _http_session
+
+
+def http_get(url: str, **kwargs):
+    """GET through the shared session"""
+    session = get_http_session()
+    if session is None:
+        raise RuntimeError("requests package not installed")
+    return session.get(url, **kwargs)
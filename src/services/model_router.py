@@ -0,0 +1,135 @@
+"""
+Model Router - Routes each LLM task type to a configured model tier
+Short tasks (titles, grading) go to a fast model with a small output cap;
+long-form explanations go to the large model. Latency and tokens are
+recorded per task
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.config import LLM_MODEL_ROUTES, LLM_FALLBACK_MODELS
+
+try:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    LANGCHAIN_AVAILABLE = True
+except ImportError:
+    LANGCHAIN_AVAILABLE = False
+
+DEFAULT_TASK = "chat"
+# Per-call usage records kept for inspection
+RECENT_CALLS_KEPT = 100
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return len(text or "") // 4
+
+
+class ModelRouter:
+    """Builds one LLM client per route and records per-task usage"""
+
+    def __init__(self, api_key: str, routes: Dict[str, Dict] = None):
+        self.api_key = api_key
+        self.routes = routes or LLM_MODEL_ROUTES
+        self._clients: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+        self._recent_calls = deque(maxlen=RECENT_CALLS_KEPT)
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key) and LANGCHAIN_AVAILABLE
+
+    def route(self, task: str) -> Dict:
+        """Route config for a task (falls back to the chat route)"""
+        return self.routes.get(task) or self.routes[DEFAULT_TASK]
+
+    def get_llm(self, task: str = DEFAULT_TASK, max_output_tokens: Optional[int] = None):
+        """LLM client for a task, created once per (model, temperature, token cap)"""
+        if not self.available:
+            return None
+        route = self.route(task)
+        cap = max_output_tokens or route["max_output_tokens"]
+        key = (route["model"], route.get("temperature", 0.7), cap)
+        with self._lock:
+            if key in self._clients:
+                return self._clients[key]
+        llm = None
+        for model_name in [route["model"]] + [m for m in LLM_FALLBACK_MODELS if m != route["model"]]:
+            try:
+                llm = ChatGoogleGenerativeAI(
+                    model=model_name,
+                    temperature=route.get("temperature", 0.7),
+                    max_output_tokens=cap,
+                    google_api_key=self.api_key
+                )
+                break
+            except Exception as e:
+                print(f"Warning: Could not initialize {model_name} for '{task}': {e}")
+        with self._lock:
+            self._clients[key] = llm
+        return llm
+
+    def invoke(self, task: str, prompt: str, max_output_tokens: Optional[int] = None, label: Optional[str] = None):
+        """Invoke the routed model for a task and record latency and tokens"""
+        llm = self.get_llm(task, max_output_tokens)
+        if llm is None:
+            raise RuntimeError(f"No LLM available for task '{task}'")
+        started = time.perf_counter()
+        response = llm.invoke(prompt)
+        self.record(task, time.perf_counter() - started, prompt, getattr(response, "content", response),
+                    getattr(response, "usage_metadata", None), label=label,
+                    max_output_tokens=max_output_tokens or self.route(task)["max_output_tokens"])
+        return response
+
+    def record(self, task: str, seconds: float, prompt: str = "", output: str = "", usage: Optional[Dict] = None,
+               label: Optional[str] = None, max_output_tokens: Optional[int] = None):
+        """Add one call to a task's stats (usage metadata preferred over estimates)"""
+        usage = usage or {}
+        input_tokens = usage.get("input_tokens") or estimate_tokens(prompt)
+        output_tokens = usage.get("output_tokens") or estimate_tokens(output if isinstance(output, str) else str(output))
+        cap = max_output_tokens or self.route(task)["max_output_tokens"]
+        key = f"{task}:{label}" if label else task
+        with self._lock:
+            stats = self._stats.setdefault(key, {
+                "task": task, "calls": 0, "total_seconds": 0.0, "input_tokens": 0, "output_tokens": 0,
+                "max_output_tokens_seen": 0, "cap_tokens": 0
+            })
+            stats["calls"] += 1
+            stats["total_seconds"] += seconds
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["cap_tokens"] += cap
+            stats["max_output_tokens_seen"] = max(stats["max_output_tokens_seen"], output_tokens)
+            self._recent_calls.append({
+                "task": key, "latency_ms": round(seconds * 1000, 1), "input_tokens": input_tokens,
+                "output_tokens": output_tokens, "max_output_tokens": cap, "at": time.time()
+            })
+
+    def get_stats(self) -> Dict:
+        """Per-task (and per-budget label) model, latency and token usage"""
+        with self._lock:
+            return {
+                key: {
+                    "model": self.route(s["task"])["model"],
+                    "calls": s["calls"],
+                    "avg_latency_ms": round(s["total_seconds"] * 1000 / s["calls"], 1),
+                    "avg_input_tokens": round(s["input_tokens"] / s["calls"], 1),
+                    "avg_output_tokens": round(s["output_tokens"] / s["calls"], 1),
+                    "avg_max_output_tokens": round(s["cap_tokens"] / s["calls"], 1),
+                    "budget_used": round(s["output_tokens"] / s["cap_tokens"], 3) if s["cap_tokens"] else 0.0,
+                    "max_output_tokens_seen": s["max_output_tokens_seen"]
+                }
+                for key, s in self._stats.items() if s["calls"]
+            }
+
+    def get_recent_calls(self, limit: int = 20) -> list:
+        """Token usage of the most recent calls, newest first"""
+        with self._lock:
+            return list(self._recent_calls)[-limit:][::-1]
@@ -0,0 +1,149 @@
+"""
+PDF Quiz Cache - Content-hash cache for PDF quiz generation
+Repeat uploads of the same PDF skip text extraction and question generation
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+try:
+    from src.config import PDF_CACHE_MAX_BYTES
+except ImportError:
+    PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class _CacheEntry:
+    """Cached data for one uploaded PDF"""
+
+    __slots__ = ("text", "sections", "question_pools", "size")
+
+    def __init__(self, text: str, sections: List[Dict]):
+        self.text = text
+        self.sections = sections
+        # (difficulty, num_questions) -> list of question dicts
+        self.question_pools: Dict[Tuple[str, int], List[Dict]] = {}
+        self.size = len(text.encode("utf-8")) + 64 * len(sections)
+
+
+class PDFQuizCache:
+    """LRU cache keyed by the SHA-256 of the uploaded PDF bytes, evicted by total size"""
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(pdf_bytes: bytes) -> str:
+        """SHA-256 hex digest of the uploaded file"""
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    @staticmethod
+    def build_section_index(page_texts: List[str]) -> Tuple[str, List[Dict]]:
+        """Join page texts and record where each page starts and ends in the joined text"""
+        parts = []
+        sections = []
+        offset = 0
+        for page_number, page_text in enumerate(page_texts, start=1):
+            chunk = (page_text or "") + "\n"
+            sections.append({"page": page_number, "start": offset, "end": offset + len(chunk)})
+            parts.append(chunk)
+            offset += len(chunk)
+        return "".join(parts), sections
+
+    def get_document(self, key: str) -> Optional[Dict]:
+        """Get cached text and section index for a PDF"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {"text": entry.text, "sections": entry.sections}
+
+    def put_document(self, key: str, text: str, sections: List[Dict]):
+        """Store extracted text and section index for a PDF"""
+        with self._lock:
+            existing = self._entries.pop(key, None)
+            if existing is not None:
+                self.current_bytes -= existing.size
+            entry = _CacheEntry(text, sections)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.current_bytes += entry.size
+            self._evict()
+
+    def get_questions(self, key: str, difficulty: str, num_questions: int) -> Optional[List[Dict]]:
+        """Get a cached question pool for (difficulty, num_questions), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            pool = entry.question_pools.get((difficulty.lower(), num_questions))
+            if pool is None:
+                return None
+            self._entries.move_to_end(key)
+            return [dict(q) for q in pool]
+
+    def put_questions(self, key: str, difficulty: str, num_questions: int, questions: List[Dict]):
+        """Store a generated question pool for an already cached PDF"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            pool_key = (difficulty.lower(), num_questions)
+            old_pool = entry.question_pools.get(pool_key)
+            if old_pool is not None:
+                delta = -self._pool_size(old_pool)
+            else:
+                delta = 0
+            pool = [dict(q) for q in questions]
+            delta += self._pool_size(pool)
+            entry.question_pools[pool_key] = pool
+            entry.size += delta
+            self.current_bytes += delta
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_stats(self) -> Dict:
+        """Cache statistics"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    @staticmethod
+    def _pool_size(pool: List[Dict]) -> int:
+        return sum(len(q.get("question", "").encode("utf-8")) + 64 for q in pool)
+
+    def _evict(self):
+        """Drop least recently used PDFs until the cache fits in max_bytes (lock held)"""
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry.size
+
+
+# Global instance
+_pdf_quiz_cache = None
+
+def get_pdf_quiz_cache() -> PDFQuizCache:
+    """Get or create PDF quiz cache instance"""
+    global _pdf_quiz_cache
+    if _pdf_quiz_cache is None:
+        _pdf_quiz_cache = PDFQuizCache()
+    return _pdf_quiz_cache
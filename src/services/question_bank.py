@@ -0,0 +1,188 @@
+"""
+Question Bank - Persistent store of generated quiz questions
+Quiz requests are served from the bank when enough fresh questions exist;
+depleted pools are topped up with the LLM on a background thread
+"""
+
+import re
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.database.db import get_db_connection
+from src.services.embeddings import get_text_embedder, to_blob, from_blob
+from src.utils.question_dedup import distinct_indices
+
+# A question is retired after being served this many times
+MAX_TIMES_SERVED = 3
+
+
+def normalize_topic(topic: str) -> str:
+    """Bank key for a topic - lower-case with collapsed whitespace"""
+    return re.sub(r"\s+", " ", topic.strip().lower())
+
+
+def normalize_difficulty(difficulty) -> str:
+    """Bank key for a difficulty (accepts DifficultyLevel or plain strings)"""
+    return str(getattr(difficulty, "value", difficulty)).strip().lower()
+
+
+class QuestionBank:
+    """Persistent question bank with usage stats"""
+
+    def __init__(self, db_path: str, max_times_served: int = MAX_TIMES_SERVED):
+        self.db_path = db_path
+        self.max_times_served = max_times_served
+        self._top_ups_in_flight = set()
+        self._lock = threading.Lock()
+        self._init_table()
+
+    def _init_table(self):
+        """Initialize question bank table"""
+        conn = get_db_connection(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS question_bank (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic_key TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                question TEXT NOT NULL,
+                embedding BLOB,
+                times_served INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                last_served_at TEXT,
+                UNIQUE(topic_key, difficulty, question)
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_question_bank_pool
+            ON question_bank(topic_key, difficulty, times_served)
+        ''')
+        conn.commit()
+        conn.close()
+
+    def add_questions(self, topic: str, difficulty, questions: List[str], times_served: int = 0,
+                      embeddings: Optional[np.ndarray] = None) -> int:
+        """Store parsed questions with their embeddings (embedded here unless passed in) - returns number of new rows"""
+        rows = [i for i, q in enumerate(questions) if q and q.strip()]
+        questions = [questions[i].strip() for i in rows]
+        if not questions:
+            return 0
+        embeddings = get_text_embedder().embed(questions) if embeddings is None else np.asarray(embeddings)[rows]
+        now = datetime.now().isoformat()
+        topic_key = normalize_topic(topic)
+        difficulty_key = normalize_difficulty(difficulty)
+        conn = get_db_connection(self.db_path)
+
+        # Skip paraphrases of questions the pool already holds
+        stored = [
+            from_blob(row[0]) for row in conn.execute(
+                "SELECT embedding FROM question_bank WHERE topic_key = ? AND difficulty = ? AND embedding IS NOT NULL",
+                (topic_key, difficulty_key)
+            )
+        ]
+        stored = [vec for vec in stored if vec.shape[0] == embeddings.shape[1]]
+        keep = distinct_indices(embeddings, existing=np.vstack(stored) if stored else None)
+        questions = [questions[i] for i in keep]
+        embeddings = embeddings[keep]
+
+        before = conn.total_changes
+        conn.executemany(
+            """INSERT OR IGNORE INTO question_bank
+            (topic_key, topic, difficulty, question, embedding, times_served, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [(topic_key, topic.strip(), difficulty_key, q, to_blob(vec), times_served, now)
+             for q, vec in zip(questions, embeddings)]
+        )
+        added = conn.total_changes - before
+        conn.commit()
+        conn.close()
+        return added
+
+    def available_count(self, topic: str, difficulty) -> int:
+        """Number of questions in the pool that have not been retired"""
+        conn = get_db_connection(self.db_path)
+        row = conn.execute(
+            "SELECT COUNT(*) FROM question_bank WHERE topic_key = ? AND difficulty = ? AND times_served < ?",
+            (normalize_topic(topic), normalize_difficulty(difficulty), self.max_times_served)
+        ).fetchone()
+        conn.close()
+        return row[0]
+
+    def draw(self, topic: str, difficulty, count: int) -> Optional[List[str]]:
+        """Take `count` least-served questions from the pool, or None if the pool is too small"""
+        conn = get_db_connection(self.db_path)
+        try:
+            # Take the write lock before reading, so concurrent draws can't pick the same
+            # questions or serve one past max_times_served
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """SELECT id, question FROM question_bank
+                WHERE topic_key = ? AND difficulty = ? AND times_served < ?
+                ORDER BY times_served, RANDOM()
+                LIMIT ?""",
+                (normalize_topic(topic), normalize_difficulty(difficulty), self.max_times_served, count)
+            ).fetchall()
+            if len(rows) < count:
+                conn.rollback()
+                return None
+            now = datetime.now().isoformat()
+            conn.executemany(
+                "UPDATE question_bank SET times_served = times_served + 1, last_served_at = ? WHERE id = ?",
+                [(now, row[0]) for row in rows]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return [row[1] for row in rows]
+
+    def top_up_async(self, topic: str, difficulty, target: int,
+                     generate: Callable[[str, str, int], Tuple[List[str], np.ndarray]]) -> bool:
+        """Refill a pool in the background if it holds fewer than `target` questions.
+        generate returns the new questions and their embeddings.
+        Returns True if a top-up was started."""
+        pool_key = (normalize_topic(topic), normalize_difficulty(difficulty))
+        with self._lock:
+            if pool_key in self._top_ups_in_flight:
+                return False
+            self._top_ups_in_flight.add(pool_key)
+        try:
+            missing = target - self.available_count(topic, difficulty)
+        except Exception:
+            missing = 0
+        if missing <= 0:
+            with self._lock:
+                self._top_ups_in_flight.discard(pool_key)
+            return False
+
+        def run():
+            try:
+                questions, embeddings = generate(topic, normalize_difficulty(difficulty).capitalize(), missing)
+                added = self.add_questions(topic, difficulty, questions, embeddings=embeddings)
+                print(f"[QuestionBank] Topped up '{topic}' ({pool_key[1]}) with {added} questions")
+            except Exception as e:
+                print(f"[QuestionBank] Top-up failed for '{topic}': {e}")
+            finally:
+                with self._lock:
+                    self._top_ups_in_flight.discard(pool_key)
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def get_stats(self) -> List[Dict]:
+        """Per-pool question counts and usage"""
+        conn = get_db_connection(self.db_path)
+        rows = conn.execute(
+            """SELECT topic_key, difficulty, COUNT(*) AS total_questions,
+                      SUM(CASE WHEN times_served < ? THEN 1 ELSE 0 END) AS available_questions,
+                      SUM(times_served) AS total_served
+            FROM question_bank GROUP BY topic_key, difficulty""",
+            (self.max_times_served,)
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
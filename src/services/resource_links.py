@@ -0,0 +1,203 @@
+"""
+Resource Links - In-memory index of topic -> YouTube video ids and Wikipedia slugs
+Explanations read links from memory; YouTube search scraping runs on a
+background thread (stale-while-revalidate with a TTL) and results are saved
+to a JSON file, which can also be hand-seeded for offline use:
+
+    {"machine learning": {"video_ids": ["<id1>", "<id2>"], "wiki_slug": "Machine_learning"}}
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.config import RESOURCE_LINKS_FILE, RESOURCE_LINKS_TTL_SECONDS
+from src.services.http_client import REQUESTS_AVAILABLE, http_get
+
+VIDEO_ID_PATTERN = re.compile(r'"videoId":"([^"]{11})"')
+# Failed lookups are retried sooner than the normal TTL
+RETRY_AFTER_FAILURE_SECONDS = 15 * 60
+
+
+def topic_key(topic: str) -> str:
+    """Index key for a topic - lower-case with collapsed whitespace"""
+    return re.sub(r"\s+", " ", (topic or "").strip().lower())
+
+
+def wiki_slug(topic: str) -> str:
+    """Wikipedia page slug for the exact topic (spaces -> underscores, keep letters, digits, _ and -)"""
+    return ''.join(c if c.isalnum() or c in ['_', '-'] else '' for c in topic.replace(' ', '_'))
+
+
+def youtube_search_url(topic: str) -> str:
+    """YouTube search results URL for a topic tutorial"""
+    search_query = f"{topic} tutorial"
+    return f"https://www.youtube.com/results?search_query={search_query.replace(' ', '+')}&sp=EgIQAQ%3D%3D"
+
+
+class ResourceLinkIndex:
+    """Topic -> resource link index served from memory, refreshed in the background"""
+
+    def __init__(self, index_path: str = RESOURCE_LINKS_FILE, ttl_seconds: int = RESOURCE_LINKS_TTL_SECONDS):
+        self.index_path = Path(index_path)
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Both refresh workers can save at once; they share the .tmp file
+        self._save_lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="resource-links")
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._load()
+
+    def _load(self):
+        """Seed the index from the JSON file, if present"""
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for key, entry in data.items():
+                self._entries[topic_key(key)] = {
+                    "video_ids": list(entry.get("video_ids", [])),
+                    "wiki_slug": entry.get("wiki_slug"),
+                    # Hand-seeded entries without a timestamp count as fresh until the first TTL passes
+                    "fetched_at": float(entry.get("fetched_at", time.time())),
+                }
+            print(f"[ResourceLinks] Loaded {len(self._entries)} topics from {self.index_path}")
+        except Exception as e:
+            print(f"Warning: Could not load resource link index: {e}")
+
+    def _save(self):
+        """Write the index to disk atomically (one save at a time, newest snapshot last)"""
+        with self._save_lock:
+            with self._lock:
+                data = {key: dict(entry) for key, entry in self._entries.items()}
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.index_path.with_suffix(".tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=1, sort_keys=True)
+                os.replace(tmp_path, self.index_path)
+            except Exception as e:
+                print(f"Warning: Could not save resource link index: {e}")
+
+    def get_links(self, topic: str, wiki_topic: Optional[str] = None,
+                  video_title: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+        """
+        YouTube and Wikipedia links for a topic, from memory
+
+        Returns (youtube_links, website_references). A missing or stale entry
+        is refreshed in the background; until then the YouTube search URL is used.
+        """
+        wiki_topic = wiki_topic or topic
+        key = topic_key(topic)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            elif now - entry["fetched_at"] > self.ttl_seconds:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            video_ids = list(entry["video_ids"]) if entry else []
+            slug = entry.get("wiki_slug") if entry and topic_key(wiki_topic) == key else None
+
+        if entry is None or now - entry["fetched_at"] > self.ttl_seconds:
+            self.refresh_async(topic)
+
+        # The 2nd search result tends to be a focused tutorial rather than a compilation
+        if len(video_ids) >= 2:
+            youtube_url = f"https://www.youtube.com/watch?v={video_ids[1]}"
+            title = video_title or f"{topic} - Tutorial"
+        else:
+            youtube_url = youtube_search_url(topic)
+            title = video_title or f"{topic} - Complete Tutorial"
+
+        wiki_url = f"https://en.wikipedia.org/wiki/{slug or wiki_slug(wiki_topic)}"
+        return (
+            [{"title": title, "url": youtube_url}],
+            [{"title": f"{wiki_topic} - Wikipedia", "url": wiki_url}]
+        )
+
+    def refresh_async(self, topic: str):
+        """Schedule a background lookup for a topic (at most one in flight per topic)"""
+        key = topic_key(topic)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, topic, key)
+
+    def _refresh(self, topic: str, key: str):
+        """Scrape YouTube search results for a topic and store the video ids"""
+        try:
+            video_ids = self._fetch_video_ids(topic)
+            with self._lock:
+                previous = self._entries.get(key, {})
+                if video_ids:
+                    self._entries[key] = {
+                        "video_ids": video_ids, "wiki_slug": previous.get("wiki_slug"),
+                        "fetched_at": time.time()
+                    }
+                else:
+                    # Keep old ids (if any) and try again later rather than on every request
+                    self._entries[key] = {
+                        "video_ids": previous.get("video_ids", []), "wiki_slug": previous.get("wiki_slug"),
+                        "fetched_at": time.time() - self.ttl_seconds + RETRY_AFTER_FAILURE_SECONDS
+                    }
+            if video_ids:
+                self._save()
+        except Exception as e:
+            print(f"[ResourceLinks] Refresh failed for '{topic}': {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _fetch_video_ids(self, topic: str) -> List[str]:
+        """Video ids from the YouTube search results page, in result order"""
+        if not REQUESTS_AVAILABLE:
+            return []
+        response = http_get(youtube_search_url(topic))
+        if response.status_code != 200:
+            return []
+        # Keep the first few distinct ids
+        video_ids = []
+        for video_id in VIDEO_ID_PATTERN.findall(response.text):
+            if video_id not in video_ids:
+                video_ids.append(video_id)
+            if len(video_ids) == 5:
+                break
+        return video_ids
+
+    def get_stats(self) -> Dict:
+        """Index size and hit/miss counts"""
+        with self._lock:
+            return {
+                "topics": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshing": len(self._refreshing),
+            }
+
+
+# Global instance
+_resource_link_index = None
+
+def get_resource_link_index() -> ResourceLinkIndex:
+    """Get or create the resource link index"""
+    global _resource_link_index
+    if _resource_link_index is None:
+        _resource_link_index = ResourceLinkIndex()
+    return _resource_link_index
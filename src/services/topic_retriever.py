@@ -0,0 +1,290 @@
+"""
+Topic Retriever - Hybrid semantic + keyword search over the topics dataset
+Item embeddings are computed once and persisted under models/topic_index, then
+loaded into a FAISS flat inner-product index (NumPy when FAISS is not
+installed). BM25 keyword ranking is fused with the semantic ranking by
+reciprocal rank fusion. The index is rebuilt in the background when the
+dataset is reloaded; until it is ready, searches use DataService.search.
+Datasets spilled to SQLite (too large for memory) are searched there only
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.config import (
+    TOPIC_INDEX_DIR, RETRIEVAL_CANDIDATES, RETRIEVAL_RRF_K,
+    RETRIEVAL_MIN_SIMILARITY, RETRIEVAL_MIN_TERM_COVERAGE, RETRIEVAL_RETRY_SECONDS
+)
+from src.services.embeddings import get_text_embedder
+from src.utils.text_rank import STOPWORDS
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+EMBED_BATCH_SIZE = 256
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def item_text(item: Dict) -> str:
+    """Text embedded for an item - topic, description, tags and key concepts"""
+    parts = [item.get("topic") or "", item.get("description") or ""]
+    if item.get("tags"):
+        parts.append("Tags: " + ", ".join(item["tags"]))
+    if item.get("key_concepts"):
+        parts.append("Key concepts: " + ", ".join(item["key_concepts"]))
+    return ". ".join(p for p in parts if p)
+
+
+def query_terms(text: str) -> List[str]:
+    """Distinct lower-case words of a text, without stopwords"""
+    return list(dict.fromkeys(t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS))
+
+
+class TopicIndex:
+    """Semantic and BM25 indexes over one snapshot of the dataset"""
+
+    def __init__(self, ids: List, texts: List[str], topics: List[str], vectors: np.ndarray):
+        self.ids = ids
+        self.vectors = vectors
+        self.faiss_index = None
+        if FAISS_AVAILABLE and len(ids):
+            self.faiss_index = faiss.IndexFlatIP(vectors.shape[1])
+            self.faiss_index.add(vectors)
+
+        # BM25 postings: term -> (positions, term frequencies); the topic name counts twice
+        n = len(ids)
+        positions: Dict[str, List[int]] = {}
+        frequencies: Dict[str, List[int]] = {}
+        self.doc_lengths = np.zeros(n, dtype=np.float32)
+        for position, (text, topic) in enumerate(zip(texts, topics)):
+            counts = Counter(t for t in _TOKEN.findall(f"{topic} {text}".lower()) if t not in STOPWORDS)
+            self.doc_lengths[position] = sum(counts.values())
+            for term, count in counts.items():
+                positions.setdefault(term, []).append(position)
+                frequencies.setdefault(term, []).append(count)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.asarray(positions[term], dtype=np.int64), np.asarray(frequencies[term], dtype=np.float32))
+            for term in positions
+        }
+        self.average_length = float(self.doc_lengths.mean()) if n else 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def semantic(self, query_vector: np.ndarray, k: int, min_similarity: float) -> List[int]:
+        """Positions of the k nearest items by cosine similarity, best first"""
+        k = min(k, len(self.ids))
+        if k == 0 or query_vector.shape[0] != self.vectors.shape[1]:
+            return []
+        if self.faiss_index is not None:
+            scores, positions = self.faiss_index.search(query_vector.reshape(1, -1).astype(np.float32), k)
+            scores, positions = scores[0], positions[0]
+        else:
+            similarities = self.vectors @ query_vector
+            positions = np.argpartition(-similarities, k - 1)[:k]
+            positions = positions[np.argsort(-similarities[positions], kind="stable")]
+            scores = similarities[positions]
+        return [int(p) for p, s in zip(positions, scores) if p >= 0 and s >= min_similarity]
+
+    def lexical(self, terms: List[str], k: int, min_coverage: float) -> List[int]:
+        """Positions of the k best BM25 matches containing enough of the query terms, best first"""
+        n = len(self.ids)
+        if not terms or n == 0:
+            return []
+        scores = np.zeros(n, dtype=np.float32)
+        matched = np.zeros(n, dtype=np.int32)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            positions, frequencies = posting
+            idf = np.log(1.0 + (n - len(positions) + 0.5) / (len(positions) + 0.5))
+            length_norm = 1.0 - BM25_B + BM25_B * self.doc_lengths[positions] / max(self.average_length, 1e-9)
+            scores[positions] += idf * frequencies * (BM25_K1 + 1.0) / (frequencies + BM25_K1 * length_norm)
+            matched[positions] += 1
+        eligible = np.flatnonzero(matched >= max(1, int(np.ceil(min_coverage * len(terms)))))
+        if len(eligible) == 0:
+            return []
+        order = eligible[np.argsort(-scores[eligible], kind="stable")][:k]
+        return [int(p) for p in order]
+
+
+class TopicRetriever:
+    """Hybrid retriever over a DataService, with the embedding index persisted to disk"""
+
+    def __init__(self, data_service, index_dir: str = TOPIC_INDEX_DIR):
+        self.data_service = data_service
+        self.index_dir = Path(index_dir)
+        self._index: Optional[TopicIndex] = None
+        self._index_key = None
+        self._building = False
+        # (key, time) of the last failed build - not retried for that key until RETRIEVAL_RETRY_SECONDS
+        self._failed = None
+        self._lock = threading.Lock()
+        # One build at a time - builds share the files in index_dir
+        self._build_lock = threading.Lock()
+        self.searches = 0
+        self.fallback_searches = 0
+        self.last_build_seconds = None
+
+    def _source_key(self) -> str:
+        # Checked on every search - attributes only, no database queries
+        return f"{self.data_service.dataset_path}:{self.data_service.version}"
+
+    @property
+    def enabled(self) -> bool:
+        """False for datasets spilled to SQLite - indexing them would load them into memory"""
+        return not getattr(self.data_service, "spilled_from", None)
+
+    def ensure_index_async(self):
+        """Start a background build if there is no index for the current dataset version"""
+        if not self.enabled:
+            return
+        key = self._source_key()
+        with self._lock:
+            if self._building or self._index_key == key:
+                return
+            if self._failed and self._failed[0] == key and time.time() - self._failed[1] < RETRIEVAL_RETRY_SECONDS:
+                return
+            self._building = True
+        threading.Thread(target=self._build, args=(key,), name="topic-retriever", daemon=True).start()
+
+    def build(self):
+        """Build (or load) the index for the current dataset on this thread, after any running build"""
+        if not self.enabled:
+            return
+        key = self._source_key()
+        with self._build_lock:
+            if self._index_key != key:
+                self._build_index(key)
+
+    def _build(self, key: str):
+        """Background build started by ensure_index_async"""
+        try:
+            with self._build_lock:
+                if self._index_key != key:
+                    self._build_index(key)
+        finally:
+            with self._lock:
+                self._building = False
+
+    def _build_index(self, key: str):
+        """Load or embed the item vectors and swap in a new index (caller holds the build lock)"""
+        try:
+            started = time.time()
+            items = [item for item in self.data_service.get_all() if item.get("id") is not None]
+            texts = [item_text(item) for item in items]
+            topics = [item.get("topic") or "" for item in items]
+            vectors = self._load_or_embed(texts)
+            index = TopicIndex([item["id"] for item in items], texts, topics, vectors)
+            # Atomic swap - searches keep using the previous index until here
+            self._index, self._index_key = index, key
+            self.last_build_seconds = round(time.time() - started, 3)
+            self._failed = None
+            print(f"[TopicRetriever] Indexed {len(index)} topics in {self.last_build_seconds}s "
+                  f"({'faiss' if index.faiss_index is not None else 'numpy'})")
+        except Exception as e:
+            self._failed = (key, time.time())
+            print(f"Warning: Could not build topic retrieval index (retrying in {RETRIEVAL_RETRY_SECONDS}s): {e}")
+
+    def _load_or_embed(self, texts: List[str]) -> np.ndarray:
+        """Item vectors from disk when the texts and embedder match, otherwise embed and save them"""
+        embedder = get_text_embedder()
+        digest = hashlib.sha256(f"{embedder.model_name}|{embedder.backend}".encode("utf-8"))
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        fingerprint = digest.hexdigest()
+
+        meta_path = self.index_dir / "meta.json"
+        vectors_path = self.index_dir / "vectors.npy"
+        try:
+            if meta_path.exists() and vectors_path.exists():
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("fingerprint") == fingerprint and meta.get("dim") == embedder.dim:
+                    vectors = np.load(vectors_path)
+                    if vectors.shape == (len(texts), embedder.dim):
+                        return vectors
+        except Exception as e:
+            print(f"Warning: Could not load topic index, re-embedding: {e}")
+
+        batches = [embedder.embed(texts[i:i + EMBED_BATCH_SIZE]) for i in range(0, len(texts), EMBED_BATCH_SIZE)]
+        # embed() falls back to hashing vectors for a batch the model fails on - those
+        # don't match the model's query vectors, so the build fails (and is retried later)
+        widths = {batch.shape[1] for batch in batches}
+        if widths - {embedder.dim}:
+            raise RuntimeError(f"embedding width {sorted(widths)} does not match the {embedder.backend} "
+                               f"embedder's {embedder.dim} - model unavailable, not saving")
+        vectors = np.vstack(batches) if batches else np.zeros((0, embedder.dim), dtype=np.float32)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._save(vectors, fingerprint, embedder.backend)
+        return vectors
+
+    def _save(self, vectors: np.ndarray, fingerprint: str, backend: str):
+        """Write the vectors and their metadata (meta.json last, so a partial save is never used)"""
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_dir / "vectors.tmp.npy", "wb") as f:
+                np.save(f, vectors)
+            os.replace(self.index_dir / "vectors.tmp.npy", self.index_dir / "vectors.npy")
+            meta = {"fingerprint": fingerprint, "count": int(vectors.shape[0]),
+                    "dim": int(vectors.shape[1]), "backend": backend}
+            tmp_path = self.index_dir / "meta.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self.index_dir / "meta.json")
+        except Exception as e:
+            print(f"Warning: Could not save topic index: {e}")
+
+    def search(self, query: str, limit: int = 3) -> List[Dict]:
+        """Dataset items most relevant to a query (semantic and keyword rankings fused)"""
+        self.ensure_index_async()
+        index = self._index if self.enabled else None
+        self.searches += 1
+        if index is None:
+            # Not built yet (or spilled to SQLite) - the data service's own search
+            self.fallback_searches += 1
+            return self.data_service.search(query, limit)
+
+        semantic = index.semantic(get_text_embedder().embed_one(query), RETRIEVAL_CANDIDATES, RETRIEVAL_MIN_SIMILARITY)
+        lexical = index.lexical(query_terms(query), RETRIEVAL_CANDIDATES, RETRIEVAL_MIN_TERM_COVERAGE)
+        # Reciprocal rank fusion: items ranked well by both lists come first
+        fused: Dict[int, float] = {}
+        for ranking in (semantic, lexical):
+            for rank, position in enumerate(ranking):
+                fused[position] = fused.get(position, 0.0) + 1.0 / (RETRIEVAL_RRF_K + rank + 1)
+        best = sorted(fused, key=lambda p: -fused[p])[:limit]
+        items = self.data_service.get_many([index.ids[p] for p in best])
+        return [item for item in items if item]
+
+    def get_stats(self) -> Dict:
+        """Index size, backend and search counts"""
+        index = self._index
+        return {
+            "enabled": self.enabled,
+            "ready": index is not None,
+            "building": self._building,
+            "topics": len(index) if index is not None else 0,
+            "backend": ("faiss" if index.faiss_index is not None else "numpy") if index is not None else None,
+            "embedder": get_text_embedder().backend,
+            "last_build_seconds": self.last_build_seconds,
+            "searches": self.searches,
+            "fallback_searches": self.fallback_searches,
+        }
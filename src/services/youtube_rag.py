@@ -5,6 +5,7 @@ Handles YouTube transcript fetching, embedding, and RAG-based Q&A
 
 import re
 import os
+import time
 from typing import Dict, Optional, List
 from pathlib import Path
 import sys
@@ -25,6 +26,9 @@ except ImportError:
     YOUTUBE_TRANSCRIPT_AVAILABLE = False
     print("Warning: youtube-transcript-api not installed")
 
+from src.services.model_router import ModelRouter
+from src.services.http_client import get_http_session
+
 try:
     # Try to login to HuggingFace first using huggingface_hub
     try:
@@ -81,6 +85,7 @@ class YouTubeRAGService:
         self.rag_chains = {}  # Store RAG chains per video_id
         self.embeddings = None
         self.llm = None
+        self.models = ModelRouter(GEMINI_API_KEY)
         self._initialize_components()
     
     def _initialize_components(self):
@@ -133,21 +138,9 @@ class YouTubeRAGService:
         if api_key and LANGCHAIN_AVAILABLE:
             try:
                 print("Initializing Gemini LLM...")
-                # Try different model names for compatibility
-                model_names = ["gemini-2.0-flash-exp", "gemini-1.5-flash", "gemini-pro"]
-                self.llm = None
-                for model_name in model_names:
-                    try:
-                        self.llm = ChatGoogleGenerativeAI(
-                            model=model_name,
-                            temperature=0.2,
-                            google_api_key=api_key
-                        )
-                        print(f"✓ Gemini LLM initialized with model: {model_name}")
-                        break
-                    except Exception as model_error:
-                        print(f"  Failed to initialize {model_name}: {model_error}")
-                        continue
+                self.llm = self.models.get_llm("rag_answer")
+                if self.llm:
+                    print(f"✓ Gemini LLM initialized with model: {self.models.route('rag_answer')['model']}")
                 
                 if not self.llm:
                     print("✗ Could not initialize any Gemini model")
@@ -167,7 +160,7 @@ class YouTubeRAGService:
             raise Exception("youtube-transcript-api package not installed")
         
         try:
-            api = YouTubeTranscriptApi()
+            api = YouTubeTranscriptApi(http_client=get_http_session())
             transcript_list = api.fetch(video_id=video_id, languages=["en"])
             
             # Convert list of objects → single long string
@@ -211,19 +204,7 @@ class YouTubeRAGService:
             if api_key and LANGCHAIN_AVAILABLE:
                 try:
                     print("Attempting to initialize Gemini LLM...")
-                    model_names = ["gemini-2.0-flash-exp", "gemini-1.5-flash", "gemini-pro"]
-                    for model_name in model_names:
-                        try:
-                            self.llm = ChatGoogleGenerativeAI(
-                                model=model_name,
-                                temperature=0.2,
-                                google_api_key=api_key
-                            )
-                            print(f"✓ Gemini LLM initialized with model: {model_name}")
-                            break
-                        except Exception as model_error:
-                            print(f"  Failed to initialize {model_name}: {model_error}")
-                            continue
+                    self.llm = self.models.get_llm("rag_answer")
                 except Exception as e:
                     print(f"Error initializing LLM: {e}")
         
@@ -324,8 +305,9 @@ Answer:""",
                 }
             )
             
-            parser = StrOutputParser()
-            rag_chain = parallel_chain | prompt | self.llm | parser
+            # The chain stops at the filled-in prompt; ask_question sends it to the LLM
+            # so usage is recorded against the full prompt (context included)
+            rag_chain = parallel_chain | prompt
             
             # Store for later use
             self.vector_stores[video_id] = vector_store
@@ -361,8 +343,12 @@ Answer:""",
             }
         
         try:
-            rag_chain = self.rag_chains[video_id]
-            response = rag_chain.invoke(question)
+            prompt_value = self.rag_chains[video_id].invoke(question)
+            started = time.perf_counter()
+            message = self.llm.invoke(prompt_value)
+            response = StrOutputParser().invoke(message)
+            self.models.record("rag_answer", time.perf_counter() - started, prompt_value.to_string(),
+                               response, getattr(message, "usage_metadata", None))
             
             return {
                 "success": True,
@@ -391,3 +377,8 @@ def get_youtube_rag_service() -> YouTubeRAGService:
         _youtube_rag_service = YouTubeRAGService()
     return _youtube_rag_service
 
+
+def get_youtube_rag_models() -> Optional[ModelRouter]:
+    """Model router of the YouTube RAG service, or None if it hasn't been created yet"""
+    return _youtube_rag_service.models if _youtube_rag_service is not None else None
+
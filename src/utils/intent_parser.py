@@ -0,0 +1,319 @@
+"""
+Intent Parser - Content-type detection and prompt templates for topic queries
+A precompiled rule table maps a query to (content_type, base_topic) in a
+single keyword scan; explanation prompt templates are compiled once at import
+"""
+
+import re
+import string
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.utils.token_budget import get_explanation_budget
+
+# Every keyword any rule looks at; the lookahead finds overlapping occurrences in one pass
+# (longer keywords first so "research papers" wins over "research" at the same position)
+KEYWORDS = (
+    "research papers", "detailed explanation", "comprehensive explanation",
+    "research", "papers", "advanced", "problems", "concepts", "practice", "exercises",
+    "applications", "examples", "definition", "introduction", "explanation",
+)
+_KEYWORD_SCAN = re.compile("(?=(" + "|".join(re.escape(k) for k in KEYWORDS) + "))")
+# Keywords implied by a longer keyword that starts at the same position
+_IMPLIED = {"research papers": ("research",)}
+
+# (content_type, alternatives - each a set of keywords that must all occur,
+#  markers tried in order to find the base topic, take only the first word after the marker)
+# Order matters: the most specific rules come first
+RULES = (
+    ("research_papers", ({"research papers"}, {"research", "papers"}), ("related to ",), False),
+    ("advanced_problems", ({"advanced", "problems"},), ("related to ",), False),
+    ("advanced_concepts", ({"advanced", "concepts"},), ("for ",), False),
+    ("problems", ({"problems", "practice"}, {"problems", "exercises"}), ("related to ", "of "), False),
+    ("applications", ({"applications"},), ("of ",), False),
+    ("examples", ({"examples"},), ("of ",), False),
+    ("definition", ({"definition"},), ("of ",), False),
+    ("introduction", ({"introduction"},), ("for ",), False),
+    ("explanation", ({"detailed explanation"}, {"comprehensive explanation"}), ("of ",), True),
+    # Any other mention of "explanation" - content type only, base topic left as is
+    ("explanation", ({"explanation"},), (), False),
+)
+# Markers are searched in the original query, case-insensitively: str.lower() can
+# change the length of a string ('İ' -> 'i̇'), so offsets into query.lower() don't fit query
+_COMPILED_RULES = tuple(
+    (content_type, tuple(frozenset(group) for group in groups),
+     tuple(re.compile(re.escape(marker), re.IGNORECASE) for marker in markers), first_word)
+    for content_type, groups, markers, first_word in RULES
+)
+
+# Trailing instructions that sometimes follow the topic name in a query
+TRAILING_PHRASES = (" focus on", " do not", " include", " explain", " provide")
+_PUNCTUATION = ".,;:!?"
+
+
+def _keywords_in(query_lower: str) -> FrozenSet[str]:
+    """All rule keywords occurring in the query"""
+    found = set()
+    for match in _KEYWORD_SCAN.finditer(query_lower):
+        keyword = match.group(1)
+        found.add(keyword)
+        found.update(_IMPLIED.get(keyword, ()))
+    return frozenset(found)
+
+
+def _clean_base_topic(base_topic: str) -> str:
+    """Strip punctuation, trailing instructions and concept suffixes from a topic"""
+    base_topic = base_topic.strip(_PUNCTUATION)
+    if base_topic:
+        for phrase in TRAILING_PHRASES:
+            if phrase in base_topic.lower():
+                base_topic = base_topic.split(phrase, 1)[0].strip()
+        # Topic names are usually 1-3 words; more means extra text was captured
+        words = base_topic.split()
+        if len(words) > 3:
+            base_topic = " ".join(words[:3]).strip()
+    if " - " in base_topic:
+        base_topic = base_topic.split(" - ", 1)[0].strip()
+    return base_topic.strip(_PUNCTUATION).strip()
+
+
+def parse_query(query: str) -> Tuple[Optional[str], str]:
+    """Detect (content_type, base_topic) for a topic query; content_type is None for a plain topic"""
+    query_lower = query.lower()
+    keywords = _keywords_in(query_lower)
+    content_type, base_topic = None, query.strip()
+    if keywords:
+        for rule_type, groups, markers, first_word in _COMPILED_RULES:
+            if not any(group <= keywords for group in groups):
+                continue
+            content_type = rule_type
+            for marker in markers:
+                match = marker.search(query)
+                if match is None:
+                    continue
+                after = query[match.end():]
+                if first_word:
+                    parts = after.split()
+                    base_topic = parts[0].strip() if parts else query.strip()
+                else:
+                    base_topic = after.split(".")[0].strip()
+                break
+            break
+    return content_type, _clean_base_topic(base_topic)
+
+
+class CompiledPrompt:
+    """A str.format-style template parsed once into literal text and field names"""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, template: str):
+        self.parts = tuple(
+            (literal, field) for literal, field, _, _ in string.Formatter().parse(template)
+        )
+
+    def render(self, **fields) -> str:
+        return "".join(literal + (str(fields[field]) if field is not None else "") for literal, field in self.parts)
+
+
+_PROMPTS = {
+    "introduction": """Provide ONLY an introduction and background context for {topic}. 
+
+Focus on:
+- What {topic} is and its purpose
+- Historical development and origins
+- Why it was created or developed
+- Its significance and importance
+- Context and background information
+
+Do NOT include definitions, examples, applications, or detailed explanations. ONLY provide introduction and background context.
+
+{length_instruction}""",
+    "definition": """Provide ONLY a clear, precise definition of {topic}.
+
+Focus on:
+- What {topic} means exactly
+- Core meaning and fundamental characteristics
+- Essential properties and key attributes
+- What distinguishes {topic} from similar concepts
+
+Do NOT include examples, applications, explanations, or background. ONLY provide the definition.
+
+{length_instruction}""",
+    "examples": """Provide ONLY specific examples and use cases of {topic}.
+
+Focus on:
+- Concrete examples of {topic}
+- Real-world use cases
+- Code snippets if applicable
+- Practical illustrations
+- Specific scenarios where {topic} is used
+
+Do NOT include definitions, explanations, or applications. ONLY provide examples.
+
+{length_instruction}""",
+    "applications": """Provide ONLY real-world applications and practical uses of {topic}.
+
+Focus on:
+- Where {topic} is used in industry
+- Applications in research and academia
+- Practical uses in daily life
+- Various domains and fields where it's applied
+- Real-world impact and benefits
+
+Do NOT include examples, definitions, or explanations. ONLY provide applications.
+
+{length_instruction}""",
+    "problems": """Provide ONLY practice problems, exercises, and questions related to {topic}.
+
+Focus on:
+- Problem statements and exercises
+- Practice questions for students
+- Hands-on exercises
+- Problems to solve and practice
+
+Do NOT include solutions, definitions, or explanations. ONLY provide problems and exercises.
+
+{length_instruction}""",
+    "advanced_concepts": """Provide ONLY advanced related concepts, theories, and topics connected to {topic}.
+
+Focus on:
+- Cutting-edge developments in {topic}
+- Advanced theories and concepts
+- Related research areas
+- Complex and advanced topics
+- State-of-the-art developments
+
+Do NOT include basic explanations. ONLY provide advanced concepts.
+
+{length_instruction}""",
+    "advanced_problems": """Provide ONLY advanced problems, challenges, and complex exercises related to {topic}.
+
+Focus on:
+- Difficult and challenging problems
+- Research-level questions
+- Complex scenarios and exercises
+- Advanced problem-solving challenges
+
+Do NOT include solutions or basic problems. ONLY provide advanced problems.
+
+{length_instruction}""",
+    "research_papers": """Provide ONLY information about research papers, academic resources, and scholarly work related to {topic}.
+
+Focus on:
+- Important research papers on {topic}
+- Key researchers and their contributions
+- Academic journals and publications
+- Research directions and trends
+- Scholarly resources and references
+
+Do NOT include explanations or definitions. ONLY provide research paper information and academic resources.
+
+{length_instruction}""",
+    "explanation_5": """Provide a detailed explanation of {topic} with EXACTLY 5 comprehensive paragraphs.
+
+Each paragraph should be 8-12 sentences and cover:
+1) How {topic} works - mechanisms and processes
+2) Key principles and fundamental mechanisms
+3) Important concepts and relationships
+4) Technical details and processes
+5) Why understanding {topic} matters
+
+Do NOT include examples or applications. ONLY provide explanation.
+
+{length_instruction}""",
+    "explanation": """Provide a comprehensive explanation of {topic} covering how it works.
+
+Focus on:
+- How {topic} functions and operates
+- Key principles and mechanisms
+- Technical details and processes
+- Important concepts and relationships
+
+Do NOT include examples, applications, or definitions. ONLY provide explanation of how {topic} works.
+
+{length_instruction}""",
+    # Short/medium overview - the long-form formatting rules below would override the budget
+    "overview": """Explain {topic} for students: a clear definition, the core ideas, one real-world application, and why it matters.
+
+{length_instruction}""",
+    "comprehensive": """Explain {topic} comprehensively for students. Provide a detailed explanation that includes:
+
+
+
+1. A clear definition and overview of {topic}
+
+2. Fundamental principles and basic concepts
+
+3. Core concepts and key ideas
+
+4. Real-world applications and examples
+
+5. Why {topic} is important
+
+
+
+IMPORTANT FORMATTING REQUIREMENTS:
+
+- Write EXACTLY 6-10 well-structured paragraphs
+
+- Each paragraph should be 8-12 sentences long (significantly longer and more detailed)
+
+- Separate each paragraph with a blank line (double newline)
+
+- Each paragraph should cover a distinct aspect of {topic} in depth
+
+- Make the explanation comprehensive, educational, and clear with substantial detail
+
+- Use proper paragraph breaks - do NOT write as one continuous block of text
+
+- Each paragraph should be substantial (at least 150-200 words per paragraph)
+
+
+
+Format your response with clear paragraph breaks like this:
+
+[First paragraph about definition - 8-12 sentences, 150-200 words]
+
+
+
+[Second paragraph about principles - 8-12 sentences, 150-200 words]
+
+
+
+[Third paragraph about core concepts - 8-12 sentences, 150-200 words]
+
+
+
+[Continue with 3-7 more paragraphs covering applications, importance, etc. - each 8-12 sentences long]
+
+
+
+{length_instruction}""",
+}
+PROMPT_TEMPLATES: Dict[str, CompiledPrompt] = {key: CompiledPrompt(text) for key, text in _PROMPTS.items()}
+_FIVE_PARAGRAPHS = re.compile(r"exactly 5|5 comprehensive paragraphs")
+
+
+def prompt_key(content_type: Optional[str], query: str) -> str:
+    """Budget/template key for a parsed query"""
+    if content_type == "explanation" and _FIVE_PARAGRAPHS.search(query.lower()):
+        return "explanation_5"
+    return content_type or "comprehensive"
+
+
+def build_explanation_prompt(content_type: Optional[str], base_topic: str, query: str, length=None) -> Tuple[str, Dict]:
+    """Prompt text and output budget for a parsed query at the requested length"""
+    key = prompt_key(content_type, query)
+    budget = get_explanation_budget(key, length)
+    template_key = key
+    if budget["length"] != "long":
+        if key == "explanation_5":
+            template_key = "explanation"
+        elif key == "comprehensive":
+            template_key = "overview"
+    instruction = budget["instruction"].format(topic=base_topic)
+    prompt = PROMPT_TEMPLATES[template_key].render(topic=base_topic, length_instruction=instruction)
+    return prompt, budget
@@ -0,0 +1,139 @@
+"""
+Keyword Matcher - Category keyword sets compiled once for single-pass matching
+A keyword matches where a word starts ("learn" matches "learning" but "code"
+does not match "decode"). Single-word keywords are checked against the text's
+distinct words; phrases are compiled into one trie-shaped regex. Compiled
+matchers are cached by a hash of their keyword dictionary
+"""
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Set
+
+MAX_CACHED_MATCHERS = 64
+_WORD = re.compile(r"\w+")
+
+
+def normalize_keyword(keyword: str) -> str:
+    """Lower-case with single spaces between words"""
+    return " ".join(keyword.lower().split())
+
+
+def _trie_pattern(node: Dict) -> str:
+    """Regex for a character trie - shared prefixes are matched once, longest keyword wins"""
+    alternatives = []
+    for char, child in sorted(node.items()):
+        if char == "":
+            continue
+        # A space in a keyword matches any run of whitespace
+        alternatives.append((r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child))
+    if not alternatives:
+        return ""
+    group = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    # A keyword ends here but longer ones continue - the greedy optional tries them first
+    return f"(?:{group})?" if "" in node else group
+
+
+class KeywordClassifier:
+    """Matches the keywords of several categories in a single pass over a text"""
+
+    def __init__(self, category_keywords: Dict[str, List[str]]):
+        self.category_keywords = {
+            category: [normalize_keyword(k) for k in keywords if k and k.strip()]
+            for category, keywords in category_keywords.items()
+        }
+        # keyword -> categories listing it
+        self._categories: Dict[str, List[str]] = {}
+        for category, keywords in self.category_keywords.items():
+            for keyword in dict.fromkeys(keywords):
+                self._categories.setdefault(keyword, []).append(category)
+        # Single words are looked up against the text's distinct words; phrases and
+        # keywords with symbols ("c++", "node.js") go through the trie regex
+        self._words: Set[str] = {k for k in self._categories if _WORD.fullmatch(k)}
+        self._word_lengths = sorted({len(k) for k in self._words})
+        phrases = [k for k in self._categories if k not in self._words]
+        trie: Dict = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        # phrase -> itself plus every shorter phrase it starts with (all match at the same position)
+        self._phrase_prefixes: Dict[str, List[str]] = {}
+        for phrase in phrases:
+            node, prefixes = trie, []
+            for length, char in enumerate(phrase, 1):
+                node = node[char]
+                if "" in node:
+                    prefixes.append(phrase[:length])
+            self._phrase_prefixes[phrase] = prefixes
+        # Zero-width lookahead at each word start so overlapping phrases are all seen
+        self._phrase_pattern = re.compile(r"(?<!\w)(?=(" + _trie_pattern(trie) + "))") if trie else None
+
+    def matches(self, text: str) -> Set[str]:
+        """Distinct keywords found in the text"""
+        found: Set[str] = set()
+        text_lower = text.lower()
+        if self._words:
+            words, lengths = self._words, self._word_lengths
+            for token in set(_WORD.findall(text_lower)):
+                for length in lengths:
+                    if length > len(token):
+                        break
+                    if token[:length] in words:
+                        found.add(token[:length])
+        if self._phrase_pattern is not None:
+            for match in self._phrase_pattern.finditer(text_lower):
+                longest = match.group(1)
+                if not longest:
+                    continue
+                if " " in longest or "\t" in longest or "\n" in longest:
+                    longest = " ".join(longest.split())
+                found.update(self._phrase_prefixes[longest])
+        return found
+
+    def scores(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each category found in the text"""
+        counts = {category: 0 for category in self.category_keywords}
+        for keyword in self.matches(text):
+            for category in self._categories[keyword]:
+                counts[category] += 1
+        return counts
+
+    def first_category(self, text: str, default: str) -> str:
+        """First category (in dictionary order) with any keyword in the text"""
+        found = self.matches(text)
+        if found:
+            for category, keywords in self.category_keywords.items():
+                if any(keyword in found for keyword in keywords):
+                    return category
+        return default
+
+
+def dictionary_hash(category_keywords: Dict[str, List[str]]) -> str:
+    """Stable hash of a category -> keywords dictionary (category order matters)"""
+    canonical = json.dumps([[category, list(keywords)] for category, keywords in category_keywords.items()])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+_matchers: "OrderedDict[str, KeywordClassifier]" = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def get_keyword_classifier(category_keywords: Dict[str, List[str]]) -> KeywordClassifier:
+    """Compiled classifier for a keyword dictionary, cached by its hash (LRU)"""
+    key = dictionary_hash(category_keywords)
+    with _matchers_lock:
+        classifier = _matchers.get(key)
+        if classifier is not None:
+            _matchers.move_to_end(key)
+            return classifier
+    classifier = KeywordClassifier(category_keywords)
+    with _matchers_lock:
+        _matchers[key] = classifier
+        while len(_matchers) > MAX_CACHED_MATCHERS:
+            _matchers.popitem(last=False)
+    return classifier
@@ -0,0 +1,104 @@
+"""
+LLM Output Parsing - Shared precompiled parsers for model responses
+Numbered question lists, "Marks: / Feedback:" grading blocks and JSON in
+markdown fences; each parser counts calls and failures for monitoring
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# One match per line: optional numbering prefix ("1.", "2)", "Q3:", "Question 4 -") then the text.
+# [^\S\n] is \s without newlines, so a prefix never runs into the next line
+_QUESTION_LINE = re.compile(
+    r'^[^\S\n]*(?:\d+(?:[.)\-]|[^\S\n])+|Q\d+(?:[.)\-:]|[^\S\n])+|Question[^\S\n]+\d+(?:[.)\-:]|[^\S\n])+)?([^\n]*)',
+    re.IGNORECASE | re.MULTILINE
+)
+_MARKS = re.compile(r'marks:\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+_FEEDBACK = re.compile(r'feedback:\s*(.+?)(?:\n|$)', re.IGNORECASE | re.DOTALL)
+_JSON_FENCE = re.compile(r'```(?:json)?\s*\n?(.*?)```', re.IGNORECASE | re.DOTALL)
+_JSON_START = re.compile(r'[\[{]')
+_JSON_DECODER = json.JSONDecoder()
+
+MIN_QUESTION_LENGTH = 20
+
+
+class ParseStats:
+    """Thread-safe call/failure counters per parser"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, List[int]] = {}
+
+    def record(self, parser: str, ok: bool):
+        with self._lock:
+            counts = self._counts.setdefault(parser, [0, 0])
+            counts[0] += 1
+            if not ok:
+                counts[1] += 1
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                parser: {
+                    "calls": calls,
+                    "failures": failures,
+                    "failure_rate": round(failures / calls, 3) if calls else 0.0
+                }
+                for parser, (calls, failures) in self._counts.items()
+            }
+
+
+parse_stats = ParseStats()
+
+
+def parse_numbered_questions(text: str, limit: Optional[int] = None,
+                             min_length: int = MIN_QUESTION_LENGTH) -> List[str]:
+    """Questions from a numbered list - lines containing '?' with the numbering removed"""
+    questions = []
+    for match in _QUESTION_LINE.finditer(text or ""):
+        cleaned = match.group(1).strip()
+        # Must contain a question mark and be substantial
+        if '?' not in cleaned or len(cleaned) <= min_length:
+            continue
+        if cleaned.startswith(':'):
+            cleaned = cleaned[1:].strip()
+        questions.append(cleaned)
+        if limit is not None and len(questions) >= limit:
+            break
+    parse_stats.record("numbered_questions", bool(questions))
+    return questions
+
+
+def parse_marks_feedback(text: str) -> Optional[Tuple[float, Optional[str]]]:
+    """(marks, feedback) from a 'Marks: N / Feedback: ...' block; None if no marks line"""
+    marks_match = _MARKS.search(text or "")
+    parse_stats.record("marks_feedback", marks_match is not None)
+    if marks_match is None:
+        return None
+    feedback_match = _FEEDBACK.search(text)
+    return float(marks_match.group(1)), (feedback_match.group(1).strip() if feedback_match else None)
+
+
+def extract_json(text: str) -> Optional[Any]:
+    """First JSON object/array in a response, inside a ```json fence or inline"""
+    text = text or ""
+    fence = _JSON_FENCE.search(text)
+    candidates = [fence.group(1)] if fence else []
+    candidates.append(text)
+    for candidate in candidates:
+        for start in _JSON_START.finditer(candidate):
+            try:
+                value, _ = _JSON_DECODER.raw_decode(candidate, start.start())
+            except ValueError:
+                continue
+            parse_stats.record("json", True)
+            return value
+    parse_stats.record("json", False)
+    return None
+
+
+def get_parse_stats() -> Dict[str, Dict]:
+    """Call and failure counts for each parser"""
+    return parse_stats.get_stats()
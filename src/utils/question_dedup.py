@@ -0,0 +1,68 @@
+"""
+Question Dedup - Embedding-based near-duplicate elimination for quiz questions
+All candidates are embedded in one batch and compared with a single
+cosine-similarity matrix, so no extra LLM round trips are needed
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.services.embeddings import get_text_embedder
+
+# Pairs at or above this cosine similarity count as the same question
+SIMILARITY_THRESHOLD = 0.9
+
+
+def distinct_indices(embeddings: np.ndarray, threshold: float = SIMILARITY_THRESHOLD,
+                     existing: Optional[np.ndarray] = None) -> List[int]:
+    """
+    Indices of rows to keep so that no two kept rows are near-duplicates
+
+    Args:
+        embeddings: (N, dim) unit vectors for the candidates, in priority order
+        threshold: cosine similarity at which a later candidate is dropped
+        existing: optional (M, dim) unit vectors that candidates must also differ from
+    """
+    n = len(embeddings)
+    if n == 0:
+        return []
+    similarity = embeddings @ embeddings.T
+    # Only earlier candidates can knock out later ones
+    similarity[np.tril_indices(n)] = -1.0
+    duplicate_of_existing = np.zeros(n, dtype=bool)
+    if existing is not None and len(existing):
+        duplicate_of_existing = (embeddings @ existing.T).max(axis=1) >= threshold
+
+    is_close = similarity >= threshold
+    kept = np.zeros(n, dtype=bool)
+    for i in range(n):
+        if duplicate_of_existing[i]:
+            continue
+        # Drop i if any kept earlier candidate is too close
+        if kept[:i].any() and is_close[:i, i][kept[:i]].any():
+            continue
+        kept[i] = True
+    return np.flatnonzero(kept).tolist()
+
+
+def dedupe_questions_with_embeddings(questions: List[str], threshold: float = SIMILARITY_THRESHOLD,
+                                     existing: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """Kept questions and their embeddings (so callers storing them don't embed again)"""
+    embedder = get_text_embedder()
+    if not questions:
+        return [], np.zeros((0, embedder.dim), dtype=np.float32)
+    existing = existing or []
+    embeddings = embedder.embed(list(questions) + list(existing))
+    candidates, existing_embeddings = embeddings[:len(questions)], embeddings[len(questions):]
+    keep = distinct_indices(candidates, threshold, existing_embeddings)
+    return [questions[i] for i in keep], candidates[keep]
+
+
+def dedupe_questions(questions: List[str], threshold: float = SIMILARITY_THRESHOLD,
+                     existing: Optional[List[str]] = None) -> List[str]:
+    """Drop questions that paraphrase an earlier question (or one in `existing`)"""
+    return dedupe_questions_with_embeddings(questions, threshold, existing)[0]
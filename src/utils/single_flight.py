@@ -0,0 +1,68 @@
+"""
+Single Flight - Request coalescing for identical concurrent work
+The first caller for a key runs the function; callers arriving while it is
+in flight wait on the same future and share its result (or exception)
+"""
+
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+
+def fingerprint(*parts: str) -> str:
+    """Stable key for a prompt (plus e.g. model name)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8", errors="ignore"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable):
+        """Run fn() once per key at a time; concurrent callers share the result"""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            # Later callers start a fresh call - results are shared, not cached
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return future.result()
+
+    def get_stats(self) -> Dict:
+        """Call, execution and coalesced-hit counts"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream_calls": self.executions,
+                "coalesced_hits": self.coalesced,
+                "in_flight": len(self._in_flight),
+                "hit_rate": round(self.coalesced / self.calls, 3) if self.calls else 0.0
+            }
@@ -0,0 +1,110 @@
+"""
+TextRank - Extractive summaries ranked on a TF-IDF sentence-similarity graph
+The graph is never built as an N x N matrix: similarity products are done
+through the sparse TF-IDF entries with np.bincount, so each power-iteration
+step is linear in the number of words
+"""
+
+import re
+from typing import List
+
+import numpy as np
+
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+MIN_SENTENCE_LENGTH = 20
+
+# Sentence ends at . ! ? followed by whitespace (the mark is captured to keep it), or at a blank line
+_SENTENCE_SPLIT = re.compile(r'([.!?])\s+|\n[ \t]*\n\s*')
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from has have how if in into is it its "
+    "of on or so such that the their them then there these they this to was were what when "
+    "where which while who why will with would you your we our not no also more most than".split()
+)
+
+
+def split_sentences(text: str, min_length: int = MIN_SENTENCE_LENGTH) -> List[str]:
+    """Sentences of the text (whitespace-collapsed) longer than min_length characters"""
+    sentences = []
+    parts = _SENTENCE_SPLIT.split(text or "")
+    # split() alternates text and the captured end mark (None after a blank line)
+    marks = parts[1::2] + [None]
+    for part, mark in zip(parts[::2], marks):
+        sentence = (part + mark if mark else part).strip()
+        if "  " in sentence or "\n" in sentence or "\t" in sentence:
+            sentence = " ".join(sentence.split())
+        if len(sentence) > min_length:
+            sentences.append(sentence)
+    return sentences
+
+
+def rank_sentences(sentences: List[str]) -> np.ndarray:
+    """TextRank score per sentence (sums to 1) over cosine similarity of TF-IDF vectors"""
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+    vocab = {}
+    rows, cols = [], []
+    for i, sentence in enumerate(sentences):
+        for token in _TOKEN.findall(sentence.lower()):
+            if token not in STOPWORDS:
+                rows.append(i)
+                cols.append(vocab.setdefault(token, len(vocab)))
+    if not vocab:
+        return np.full(n, 1.0 / n)
+
+    # Term counts per (sentence, term) as sparse COO entries
+    v = len(vocab)
+    keys, counts = np.unique(np.asarray(rows, dtype=np.int64) * v + np.asarray(cols, dtype=np.int64),
+                             return_counts=True)
+    row, col = keys // v, keys % v
+    df = np.bincount(col, minlength=v)
+    weight = counts * (np.log(n / df) + 1.0)[col]
+    norms = np.sqrt(np.bincount(row, weight * weight, minlength=n))
+    weight = weight / norms[row]
+    self_similarity = np.bincount(row, weight * weight, minlength=n)
+
+    def similarity_times(vector: np.ndarray) -> np.ndarray:
+        """S @ vector where S = X X^T with a zero diagonal (X = unit TF-IDF rows)"""
+        term_totals = np.bincount(col, weight * vector[row], minlength=v)
+        return np.bincount(row, weight * term_totals[col], minlength=n) - self_similarity * vector
+
+    degree = similarity_times(np.ones(n))
+    connected = degree > 1e-12
+    inverse_degree = np.where(connected, 1.0 / np.where(connected, degree, 1.0), 0.0)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        # Sentences sharing no words with any other spread their score evenly
+        dangling = scores[~connected].sum()
+        updated = (1.0 - DAMPING) / n + DAMPING * (similarity_times(scores * inverse_degree) + dangling / n)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def extractive_summary(text: str, max_length: int = 200) -> str:
+    """
+    Highest-ranked sentences that fit in max_length characters, in original order
+    Falls back to truncating the text when it has no usable sentences.
+    """
+    sentences = split_sentences(text)
+    if not sentences:
+        return text[:max_length] + "..."
+    scores = rank_sentences(sentences)
+    chosen, used, seen = [], 0, set()
+    # Stable sort keeps earlier sentences first among equal scores
+    for i in np.argsort(-scores, kind="stable"):
+        key = sentences[i].lower()
+        cost = len(sentences[i]) + (1 if chosen else 0)
+        if key not in seen and used + cost <= max_length:
+            chosen.append(i)
+            used += cost
+            seen.add(key)
+    if not chosen:
+        best = sentences[int(np.argmax(scores))]
+        return best[:max_length] + "..."
+    return " ".join(sentences[i] for i in sorted(chosen))
@@ -0,0 +1,98 @@
+"""
+Token Budgets - Output-length caps for explanation and quiz prompts
+Each content type gets a paragraph spec and a max_output_tokens cap per
+requested length, so short concept cards don't pay for long-form generation.
+Quiz caps scale with the number of questions asked for
+"""
+
+from typing import Dict, Optional
+
+EXPLANATION_LENGTHS = ("short", "medium", "long")
+
+# Quiz generation - one numbered question per line, plus a little preamble
+QUIZ_TOKENS_PER_QUESTION = 48
+QUIZ_OVERHEAD_TOKENS = 64
+QUIZ_MAX_OUTPUT_TOKENS = 8192  # model output limit
+DEFAULT_LENGTH = "long"
+
+# Long-form spec per content type - the length line ending each prompt and its token cap
+LONG_BUDGETS = {
+    "introduction": {
+        "instruction": "Write 3-5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1600,
+    },
+    "definition": {
+        "instruction": "Write 2-4 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1200,
+    },
+    "examples": {
+        "instruction": "Write 3-5 well-structured paragraphs with examples, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1600,
+    },
+    "applications": {
+        "instruction": "Write 3-5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1600,
+    },
+    "problems": {
+        "instruction": "Write 3-5 well-structured paragraphs with problems, each containing multiple practice questions. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1400,
+    },
+    "advanced_concepts": {
+        "instruction": "Write 4-6 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1900,
+    },
+    "advanced_problems": {
+        "instruction": "Write 3-5 well-structured paragraphs with advanced problems, each containing challenging questions. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1400,
+    },
+    "research_papers": {
+        "instruction": "Write 3-5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1600,
+    },
+    "explanation": {
+        "instruction": "Write 4-6 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1900,
+    },
+    "explanation_5": {
+        "instruction": "Write EXACTLY 5 well-structured paragraphs, each 8-12 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 1700,
+    },
+    "comprehensive": {
+        "instruction": "Now provide a comprehensive explanation of {topic} with 6-10 well-separated paragraphs, each being 8-12 sentences long (150-200 words per paragraph).",
+        "max_output_tokens": 2800,
+    },
+}
+
+# Shorter lengths use one spec for every content type
+SHORT_BUDGETS = {
+    "short": {
+        "instruction": "Keep it brief: write 1-2 short paragraphs, each 3-5 sentences long (under 120 words in total). Separate paragraphs with blank lines.",
+        "max_output_tokens": 320,
+    },
+    "medium": {
+        "instruction": "Write 2-3 well-structured paragraphs, each 5-7 sentences long. Separate paragraphs with blank lines.",
+        "max_output_tokens": 900,
+    },
+}
+
+
+def normalize_length(length) -> str:
+    """'short' / 'medium' / 'long' from an ExplanationLength or string (default long)"""
+    value = str(getattr(length, "value", length) or "").strip().lower()
+    return value if value in EXPLANATION_LENGTHS else DEFAULT_LENGTH
+
+
+def get_explanation_budget(content_type: Optional[str], length=None) -> Dict:
+    """Length instruction and max_output_tokens for a content type at a length"""
+    length = normalize_length(length)
+    if length in SHORT_BUDGETS:
+        budget = SHORT_BUDGETS[length]
+    else:
+        budget = LONG_BUDGETS.get(content_type or "comprehensive", LONG_BUDGETS["comprehensive"])
+    return {"length": length, **budget}
+
+
+def get_quiz_output_tokens(num_questions: int) -> int:
+    """max_output_tokens for a numbered list of num_questions quiz questions"""
+    needed = QUIZ_OVERHEAD_TOKENS + QUIZ_TOKENS_PER_QUESTION * max(num_questions, 1)
+    return min(needed, QUIZ_MAX_OUTPUT_TOKENS)
@@ -0,0 +1,92 @@
+"""
+Golden tests for the topic query intent parser
+Expected values were recorded from the original if/elif detection in explain_topic
+Run: python test_intent_parser.py
+"""
+
+import sys
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from src.utils.intent_parser import parse_query, build_explanation_prompt
+
+def test_intent_parser():
+    print("="*60)
+    print("Intent Parser Golden Test")
+    print("="*60)
+    
+    # (query, expected content_type, expected base_topic)
+    golden = [
+        ('Machine Learning', None, 'Machine Learning'),
+        ('  Deep Learning  ', None, 'Deep Learning'),
+        ('Neural Networks - Backpropagation', None, 'Neural Networks -'),
+        ('Provide an introduction and background context for Machine Learning. Focus on history', 'introduction', 'Machine Learning'),
+        ('Provide a clear definition of Neural Networks. Do NOT include examples', 'examples', 'Neural Networks'),
+        ('Provide specific examples of Computer Vision. Include code snippets', 'examples', 'Computer Vision'),
+        ('Provide real-world applications of Natural Language Processing.', 'applications', 'Natural Language Processing'),
+        ('Provide practice problems and exercises related to Reinforcement Learning.', 'problems', 'Reinforcement Learning'),
+        ('Provide practice problems of Deep Learning', 'problems', 'Deep Learning'),
+        ('Provide advanced concepts for Transformers. Focus on cutting-edge developments', 'advanced_concepts', 'Transformers'),
+        ('Provide advanced problems related to Generative Adversarial Networks.', 'advanced_problems', 'Generative Adversarial Networks'),
+        ('Provide research papers related to Computer Vision. Include key researchers', 'research_papers', 'Computer Vision'),
+        ('Find research and papers related to Robotics.', 'research_papers', 'Robotics'),
+        ('Provide a detailed explanation of Python with exactly 5 comprehensive paragraphs', 'explanation', 'Python'),
+        ('Provide a comprehensive explanation of Reinforcement Learning', 'explanation', 'Reinforcement'),
+        ('Provide a detailed explanation of', 'explanation', 'Provide a detailed'),
+        ('Give an explanation of gradient descent', 'explanation', 'Give an explanation'),
+        ('Clear definition: Decision Trees', 'definition', 'Clear definition: Decision'),
+        ('counterexamples in Logic', 'examples', 'counterexamples in Logic'),
+        ('Machine Learning - definition', 'definition', 'Machine Learning -'),
+        # Characters whose lower-case form is longer must not shift the topic
+        ('İstanbul history - definition of Focus', 'definition', 'Focus'),
+        ('İİ Provide a clear definition of Deep Learning', 'definition', 'Deep Learning'),
+        ('Applications of AI in healthcare and medical imaging systems', 'applications', 'AI in healthcare'),
+        ('Provide examples of Support Vector Machines, explain kernels', 'examples', 'Support Vector Machines'),
+        ('Introduction for Large Language Models; provide context', 'introduction', 'Large Language Models'),
+        ('Advanced concepts', 'advanced_concepts', 'Advanced concepts'),
+        ('Practice exercises', None, 'Practice exercises'),
+        ('Problems in computer vision', None, 'Problems in computer'),
+        ('Research papers', 'research_papers', 'Research papers'),
+        ('Provide detailed explanation of Convolutional Neural Networks.', 'explanation', 'Convolutional'),
+        ('Explain Artificial Intelligence', None, 'Explain Artificial Intelligence'),
+        ('Provide a clear definition of Neural Networks', 'definition', 'Neural Networks'),
+    ]
+    
+    print("\nTesting content-type detection:")
+    print("-" * 60)
+    all_passed = True
+    for query, expected_type, expected_topic in golden:
+        result = parse_query(query)
+        passed = result == (expected_type, expected_topic)
+        if not passed:
+            all_passed = False
+        status = "[PASS]" if passed else "[FAIL]"
+        print(f"{status} | {query[:45]:45} | Expected: {(expected_type, expected_topic)} | Got: {result}")
+    
+    print("\nTesting prompt budgets:")
+    print("-" * 60)
+    for query, length, expected_tokens in [
+        ("Machine Learning", None, 2800),
+        ("Machine Learning", "short", 320),
+        ("Provide a clear definition of Neural Networks", "long", 1200),
+        ("Provide a detailed explanation of Python with exactly 5 comprehensive paragraphs", None, 1700),
+        ("Provide practice problems of Deep Learning", "medium", 900),
+    ]:
+        content_type, base_topic = parse_query(query)
+        prompt, budget = build_explanation_prompt(content_type, base_topic, query, length)
+        passed = budget["max_output_tokens"] == expected_tokens and base_topic in prompt and "{" not in prompt
+        if not passed:
+            all_passed = False
+        status = "[PASS]" if passed else "[FAIL]"
+        print(f"{status} | {query[:45]:45} | {budget['length']:6} | max_output_tokens: {budget['max_output_tokens']}")
+    
+    print("\n" + "="*60)
+    if all_passed:
+        print("All tests PASSED!")
+    else:
+        print("Some tests FAILED!")
+    
+    return 0 if all_passed else 1
+
+if __name__ == "__main__":
+    exit(test_intent_parser())
@@ -0,0 +1,175 @@
+"""
+Behaviour tests for the hybrid topic retriever (semantic + BM25, fused by rank)
+Uses a small in-memory dataset and a temporary index directory
+Run: python test_topic_retriever.py
+"""
+
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+sys.path.insert(0, str(Path(__file__).parent))
+from src.services.embeddings import get_text_embedder
+from src.services.topic_retriever import TopicIndex, TopicRetriever, item_text, query_terms
+
+ITEMS = [
+    {"id": 1, "topic": "Binary Search", "description": "Find an element in a sorted array by halving the interval",
+     "tags": ["algorithms", "searching"]},
+    {"id": 2, "topic": "Photosynthesis", "description": "Plants convert light energy into chemical energy",
+     "tags": ["biology"]},
+    {"id": 3, "topic": "Linked List", "description": "A linear data structure of nodes joined by pointers",
+     "tags": ["data structures"]},
+    {"id": 4, "topic": "Newton's Laws", "description": "Force equals mass times acceleration",
+     "key_concepts": ["inertia", "momentum"]},
+    {"id": 5, "topic": "Sorting Algorithms", "description": "Arrange array elements in order, e.g. merge sort",
+     "tags": ["algorithms"]},
+]
+
+
+class FakeDataService:
+    """The parts of DataService the retriever uses"""
+
+    def __init__(self, items, version=1):
+        self.items = items
+        self.version = version
+        self.dataset_path = "memory"
+        self.spilled_from = None
+        self.substring_searches = 0
+
+    def get_all(self, limit=None):
+        return list(self.items)
+
+    def search(self, query, limit=20):
+        self.substring_searches += 1
+        return [i for i in self.items if query.lower() in i["topic"].lower()][:limit]
+
+    def get_many(self, ids):
+        by_id = {i["id"]: i for i in self.items}
+        return [by_id.get(i, {}) for i in ids]
+
+
+class CountingEmbedder:
+    """Counts embed() calls on the shared embedder"""
+
+    def __init__(self):
+        self.embedder = get_text_embedder()
+        self.original = self.embedder.embed
+        self.calls = 0
+
+    def __enter__(self):
+        def embed(texts):
+            self.calls += 1
+            return self.original(texts)
+        self.embedder.embed = embed
+        return self
+
+    def __exit__(self, *exc):
+        self.embedder.embed = self.original
+
+
+def check(name, passed, detail=""):
+    status = "[PASS]" if passed else "[FAIL]"
+    print(f"{status} | {name:55} | {detail}")
+    return passed
+
+
+def test_topic_retriever():
+    print("=" * 60)
+    print("Topic Retriever Test")
+    print("=" * 60)
+    results = []
+    index_dir = tempfile.mkdtemp(prefix="topic_index_")
+
+    # Fused ranking: lexical ranks are combined with semantic ones
+    texts = [item_text(item) for item in ITEMS]
+    vectors = get_text_embedder().embed(texts)
+    index = TopicIndex([i["id"] for i in ITEMS], texts, [i["topic"] for i in ITEMS], vectors)
+    lexical = index.lexical(query_terms("sorted array search"), 5, 0.5)
+    results.append(check("BM25 ranks the item with all terms first", lexical[:1] == [0], f"positions {lexical}"))
+    results.append(check("BM25 drops items below term coverage",
+                         index.lexical(query_terms("light energy plants pointers"), 5, 1.0) == [], ""))
+
+    service = FakeDataService(ITEMS)
+    retriever = TopicRetriever(service, index_dir)
+    retriever._build_lock.acquire()  # hold builds back to observe the fallback
+    fallback = retriever.search("Photosynthesis", limit=1)
+    retriever._build_lock.release()
+    results.append(check("Substring search until the index is ready",
+                         service.substring_searches == 1 and [i["id"] for i in fallback] == [2], ""))
+
+    with CountingEmbedder() as counter:
+        retriever.build()
+        for query, expected in [
+            ("how do plants use light energy", 2),
+            ("searching a sorted array", 1),
+            ("nodes and pointers", 3),
+            ("inertia force", 4),
+        ]:
+            found = [i["id"] for i in retriever.search(query, limit=2)]
+            results.append(check(f"'{query}'", found[:1] == [expected], f"got {found}"))
+
+        # Items ranked by both lists come before items ranked by one
+        found = [i["id"] for i in retriever.search("array algorithms", limit=3)]
+        results.append(check("Fused ranking keeps both array algorithm topics on top",
+                             set(found[:2]) == {1, 5}, f"got {found}"))
+        embeds_after_build = counter.calls
+
+        # A new retriever over the same texts loads the saved vectors
+        reloaded = TopicRetriever(service, index_dir)
+        reloaded.build()
+        results.append(check("Persisted vectors reused (no re-embedding)",
+                             counter.calls == embeds_after_build, f"embed batches {counter.calls}"))
+
+        # Concurrent background and foreground builds run one after the other
+        service.items = ITEMS + [{"id": 6, "topic": "Mitochondria", "description": "Powerhouse of the cell"}]
+        service.version = 2
+        before = counter.calls
+        reloaded.ensure_index_async()
+        reloaded.build()
+        deadline = time.time() + 5
+        while reloaded.get_stats()["building"] and time.time() < deadline:
+            time.sleep(0.01)
+        rebuilds = counter.calls - before  # before the search, which embeds the query
+        found = [i["id"] for i in reloaded.search("powerhouse of the cell", limit=1)]
+        results.append(check("Rebuilt once after a dataset version change",
+                             found == [6] and rebuilds == 1, f"embed batches {rebuilds}"))
+        results.append(check("No build threads left running",
+                             not any(t.name == "topic-retriever" for t in threading.enumerate()), ""))
+
+    # A failed build is not retried on every search
+    failing = FakeDataService(ITEMS)
+    failing.get_all = lambda limit=None: 1 / 0
+    retriever = TopicRetriever(failing, index_dir)
+    retriever.build()
+    with CountingEmbedder() as counter:
+        retriever.search("Photosynthesis", limit=1)
+        started = any(t.name == "topic-retriever" for t in threading.enumerate())
+    results.append(check("Failed build backs off instead of rebuilding",
+                         not started and counter.calls == 0 and failing.substring_searches == 1, ""))
+
+    # Spilled datasets are searched in SQLite, never loaded to build an index
+    spilled = FakeDataService(ITEMS)
+    spilled.spilled_from = "large.json"
+    spilled.get_all = lambda limit=None: 1 / 0
+    retriever = TopicRetriever(spilled, index_dir)
+    found = [i["id"] for i in retriever.search("Photosynthesis", limit=1)]
+    results.append(check("Spilled dataset uses the data service search",
+                         found == [2] and not retriever.get_stats()["building"], f"got {found}"))
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    all_passed = all(results)
+    print("\n" + "=" * 60)
+    if all_passed:
+        print("All tests PASSED!")
+    else:
+        print("Some tests FAILED!")
+    return 0 if all_passed else 1
+
+
+if __name__ == "__main__":
+    exit(test_topic_retriever())